@@ -0,0 +1,286 @@
+"""
+Agent adım bütçesi, erken sonlandırma ve adım bazlı telemetri
+
+app.py, math_app.py ve streamlit_db_app.py'deki agent'lar varsayılan iterasyon sınırıyla çalışıyordu;
+kafası karışan bir model pahalı ReAct döngülerinde dönebiliyordu ve tek görünürlük StreamlitCallbackHandler idi.
+
+AgentTelemetry (callback handler) her çalıştırmada şunları kaydeder:
+    - her LLM çağrısının gecikmesi ve token sayısı (sağlayıcı bildirmezse tahmin)
+    - her aracın (tool) gecikmesi ve hataları
+    - iterasyon sayısı ve parse hataları (handle_parsing_errors'ın '_Exception' adımları)
+
+Bütçeler ortam değişkenleriyle ayarlanır:
+    AGENT_MAX_ITERATIONS, AGENT_MAX_SECONDS  -> AgentExecutor'ın kendi sınırları (executor_limits)
+    AGENT_MAX_TOKENS                         -> callback içinde kontrol edilir, aşılınca BudgetExceeded
+run_with_budget bütçe aşımında hata yerine o ana kadar toplanan bilgiyle kibar bir erken cevap döndürür.
+astream_with_budget aynısını async olarak yapar ve agent'ın token / araç olaylarını akış halinde verir (service.py).
+
+Dışa aktarma:
+    AGENT_METRICS_LOG        her çalıştırma için bir JSON satırı (yoksa agent_telemetry logger'ına DEBUG seviyesinde)
+    AGENT_METRICS_PROM_FILE  Prometheus text formatında toplam metrikler (node_exporter textfile collector için)
+"""
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import get_buffer_string
+
+from chunker import count_tokens
+
+logger = logging.getLogger(__name__)
+
+MAX_ITERATIONS = int(os.getenv("AGENT_MAX_ITERATIONS", "6"))
+MAX_SECONDS = float(os.getenv("AGENT_MAX_SECONDS", "60"))
+MAX_TOKENS = int(os.getenv("AGENT_MAX_TOKENS", "12000"))
+METRICS_LOG = os.getenv("AGENT_METRICS_LOG")
+PROM_FILE = os.getenv("AGENT_METRICS_PROM_FILE")
+
+# Output AgentExecutor returns when max_iterations / max_execution_time hit with early_stopping_method="force"
+_FORCED_STOP = "Agent stopped due to"
+
+_metrics = defaultdict(float)  # (metric name, sorted label items) -> value
+_metrics_lock = threading.Lock()
+
+
+class BudgetExceeded(Exception):
+    """Raised from a callback when an agent run goes over its token or time budget"""
+
+
+def executor_limits(early_stopping_method="generate"):
+    """AgentExecutor kwargs enforcing the iteration and wall-clock budgets.
+
+    "generate" lets legacy agents (initialize_agent) write a final answer when stopped;
+    runnable agents such as create_sql_agent only support "force".
+    """
+    return {
+        "max_iterations": MAX_ITERATIONS,
+        "max_execution_time": MAX_SECONDS,
+        "early_stopping_method": early_stopping_method,
+    }
+
+
+def _llm_tokens(response, prompt_tokens):
+    """(prompt, completion) tokens as reported by the provider, else estimated"""
+    usage = (response.llm_output or {}).get("token_usage") or {}
+    if usage.get("prompt_tokens") is not None:
+        return usage["prompt_tokens"], usage.get("completion_tokens", 0)
+    for generations in response.generations:
+        for generation in generations:
+            metadata = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if metadata:
+                return metadata["input_tokens"], metadata["output_tokens"]
+    text = "".join(generation.text for generations in response.generations for generation in generations)
+    return prompt_tokens, count_tokens(text) if text else 0
+
+
+class AgentTelemetry(BaseCallbackHandler):
+    """Per-run step recorder that also enforces the token and wall-clock budgets"""
+
+    # Let BudgetExceeded propagate out of the agent instead of being logged and ignored
+    raise_error = True
+
+    def __init__(self, agent_name, max_tokens=MAX_TOKENS, max_seconds=MAX_SECONDS):
+        self.agent_name = agent_name
+        self.max_tokens = max_tokens
+        self.max_seconds = max_seconds
+        self.started = time.perf_counter()
+        self.steps = []
+        self.iterations = 0
+        self.parse_failures = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.last_observation = None
+        self.stopped = None
+        self._pending = {}  # run_id -> (start time, name or estimated prompt tokens)
+
+    @property
+    def total_tokens(self):
+        return self.prompt_tokens + self.completion_tokens
+
+    def _check_budget(self):
+        if self.total_tokens > self.max_tokens:
+            raise BudgetExceeded(f"token budget of {self.max_tokens} exceeded")
+        if time.perf_counter() - self.started > self.max_seconds:
+            raise BudgetExceeded(f"time budget of {self.max_seconds:.0f}s exceeded")
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._pending[run_id] = (time.perf_counter(), sum(count_tokens(prompt) for prompt in prompts))
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self.on_llm_start(serialized, [get_buffer_string(batch) for batch in messages], run_id=run_id)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        start, estimated = self._pending.pop(run_id, (time.perf_counter(), 0))
+        prompt_tokens, completion_tokens = _llm_tokens(response, estimated)
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        self.steps.append({"type": "llm", "seconds": round(time.perf_counter() - start, 4),
+                           "prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens})
+        self._check_budget()
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._pending.pop(run_id, None)
+
+    def on_tool_start(self, serialized, input_str, *, run_id, **kwargs):
+        self._pending[run_id] = (time.perf_counter(), (serialized or {}).get("name", "tool"))
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        start, name = self._pending.pop(run_id, (time.perf_counter(), "tool"))
+        if name == "_Exception":
+            return  # parse-error feedback, already counted in on_agent_action
+        self.last_observation = str(getattr(output, "content", output))
+        self.steps.append({"type": "tool", "name": name, "seconds": round(time.perf_counter() - start, 4)})
+        self._check_budget()
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        start, name = self._pending.pop(run_id, (time.perf_counter(), "tool"))
+        self.steps.append({"type": "tool", "name": name, "seconds": round(time.perf_counter() - start, 4),
+                           "error": str(error)})
+
+    def on_agent_action(self, action, **kwargs):
+        self.iterations += 1
+        if action.tool == "_Exception":
+            self.parse_failures += 1
+
+    def early_answer(self, reason):
+        self.stopped = reason
+        if self.last_observation:
+            return (f"I had to stop early ({reason}). "
+                    f"The most relevant information I found:\n\n{self.last_observation[:1500]}")
+        return f"I had to stop early ({reason}) before finding an answer. Please try a narrower question."
+
+    def summary(self):
+        llm_steps = [step for step in self.steps if step["type"] == "llm"]
+        tool_steps = [step for step in self.steps if step["type"] == "tool"]
+        return {
+            "agent": self.agent_name,
+            "seconds": round(time.perf_counter() - self.started, 4),
+            "iterations": self.iterations,
+            "llm_calls": len(llm_steps),
+            "llm_seconds": round(sum(step["seconds"] for step in llm_steps), 4),
+            "tool_calls": len(tool_steps),
+            "tool_seconds": round(sum(step["seconds"] for step in tool_steps), 4),
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "parse_failures": self.parse_failures,
+            "stopped": self.stopped,
+            "steps": self.steps,
+        }
+
+    def export(self):
+        """Write this run as a JSON log line and fold it into the Prometheus totals"""
+        summary = self.summary()
+        line = json.dumps(summary, ensure_ascii=False)
+        if METRICS_LOG:
+            with open(METRICS_LOG, "a", encoding="utf-8") as log:
+                log.write(line + "\n")
+        else:
+            logger.debug(line)
+
+        agent = {"agent": self.agent_name}
+        _add("agent_runs_total", 1, agent, outcome="stopped" if self.stopped else "answered")
+        _add("agent_run_seconds_total", summary["seconds"], agent)
+        _add("agent_iterations_total", self.iterations, agent)
+        _add("agent_parse_failures_total", self.parse_failures, agent)
+        _add("agent_llm_calls_total", summary["llm_calls"], agent)
+        _add("agent_llm_seconds_total", summary["llm_seconds"], agent)
+        _add("agent_tokens_total", self.prompt_tokens, agent, kind="prompt")
+        _add("agent_tokens_total", self.completion_tokens, agent, kind="completion")
+        for step in self.steps:
+            if step["type"] == "tool":
+                _add("agent_tool_calls_total", 1, agent, tool=step["name"])
+                _add("agent_tool_seconds_total", step["seconds"], agent, tool=step["name"])
+                if "error" in step:
+                    _add("agent_tool_errors_total", 1, agent, tool=step["name"])
+        if PROM_FILE:
+            # Write-then-rename so the collector never reads a half-written file
+            with open(PROM_FILE + ".tmp", "w", encoding="utf-8") as prom:
+                prom.write(prometheus_text())
+            os.replace(PROM_FILE + ".tmp", PROM_FILE)
+        return summary
+
+
+def _add(name, value, labels, **extra):
+    key = (name, tuple(sorted(dict(labels, **extra).items())))
+    with _metrics_lock:
+        _metrics[key] += value
+
+
+def prometheus_text():
+    """Accumulated metrics of this process in the Prometheus text exposition format"""
+    with _metrics_lock:
+        items = sorted(_metrics.items())
+    lines, current = [], None
+    for (name, labels), value in items:
+        if name != current:
+            lines.append(f"# TYPE {name} counter")
+            current = name
+        rendered = ",".join(f'{key}="{str(label).replace(chr(34), chr(39))}"' for key, label in labels)
+        lines.append(f"{name}{{{rendered}}} {value:g}")
+    return "\n".join(lines) + "\n"
+
+
+def _settle(telemetry, answer):
+    if answer.startswith(_FORCED_STOP):
+        return telemetry.early_answer("iteration or time limit reached")
+    if telemetry.iterations >= MAX_ITERATIONS:
+        # early_stopping_method="generate" already wrote a final answer
+        telemetry.stopped = "iteration limit reached"
+    return answer
+
+
+def run_with_budget(agent, agent_input, agent_name, callbacks=()):
+    """Run `agent` under the budgets; returns (answer, telemetry summary)"""
+    telemetry = AgentTelemetry(agent_name)
+    try:
+        answer = _settle(telemetry, agent.run(agent_input, callbacks=[telemetry, *callbacks]))
+    except BudgetExceeded as e:
+        answer = telemetry.early_answer(str(e))
+    return answer, telemetry.export()
+
+
+async def astream_with_budget(agent, agent_input, agent_name, callbacks=()):
+    """Async run_with_budget yielding (event, data) pairs while the agent runs.
+
+    Events: "token" (LLM output, including the agent's thoughts), "tool", "observation" and
+    finally "result" with the answer and the telemetry summary (without the step list).
+    """
+    telemetry = AgentTelemetry(agent_name)
+    answer = ""
+    try:
+        async for event in agent.astream_events({"input": agent_input}, {"callbacks": [telemetry, *callbacks]},
+                                                version="v2"):
+            kind, data = event["event"], event["data"]
+            if kind in ("on_chat_model_stream", "on_llm_stream"):
+                chunk = data.get("chunk")
+                text = getattr(chunk, "content", None) or getattr(chunk, "text", "") or ""
+                if text:
+                    yield "token", {"text": text}
+            elif kind == "on_tool_start" and event["name"] != "_Exception":
+                yield "tool", {"tool": event["name"], "input": data.get("input")}
+            elif kind == "on_tool_end" and event["name"] != "_Exception":
+                yield "observation", {"tool": event["name"], "output": str(data.get("output"))[:2000]}
+            elif kind == "on_chain_end" and not event.get("parent_ids"):
+                answer = data["output"]["output"]
+        answer = _settle(telemetry, answer)
+    except BudgetExceeded as e:
+        answer = telemetry.early_answer(str(e))
+    summary = telemetry.export()
+    summary.pop("steps")
+    yield "result", {"answer": answer, "telemetry": summary}
+
+
+def describe(summary):
+    """One-line sidebar caption for a run summary"""
+    text = (f"{summary['iterations']} steps · LLM {summary['llm_seconds']:.1f}s · "
+            f"tools {summary['tool_seconds']:.1f}s · "
+            f"{summary['prompt_tokens'] + summary['completion_tokens']} tokens")
+    if summary["parse_failures"]:
+        text += f" · {summary['parse_failures']} parse failures"
+    if summary["stopped"]:
+        text += f" · stopped: {summary['stopped']}"
+    return text
@@ -5,28 +5,49 @@ import streamlit as st
 from langchain_groq import ChatGroq
 from langchain_community.utilities import ArxivAPIWrapper,WikipediaAPIWrapper
 from langchain_community.tools import ArxivQueryRun,WikipediaQueryRun,DuckDuckGoSearchRun
-from langchain.agents import initialize_agent,AgentType
+from langchain.agents import AgentExecutor
 from langchain.callbacks import StreamlitCallbackHandler
 import os
+import time
+import resources
+from agent_telemetry import describe, executor_limits, run_with_budget
+from conversation_memory import ConversationMemory, llm_summarizer
+from tool_cache import PrefetchAgent, TTLCache, ToolFanout, cached_tool, prefetched_steps
+
+TOOL_CACHE_TTL = int(os.getenv("TOOL_CACHE_TTL", "600"))
+
+setup_start = time.perf_counter()
 
 # Arxiv and Wikipedia Tools
+# Tools, the LLM and the agent are built once per process and shared by every session (see resources.py)
+
+def build_tools():
+    arxiv_wrapper = ArxivAPIWrapper(top_k_results=1,doc_content_chars_max=200)
+    arxiv = ArxivQueryRun(api_wrapper=arxiv_wrapper)
 
-arxiv_wrapper = ArxivAPIWrapper(top_k_results=1,doc_content_chars_max=200)
-arxiv = ArxivQueryRun(api_wrapper=arxiv_wrapper)
+    wiki_wrapper = WikipediaAPIWrapper(top_k_results=1,doc_content_chars_max=200)
+    wiki = WikipediaQueryRun(api_wrapper=wiki_wrapper)
 
-wiki_wrapper = WikipediaAPIWrapper(top_k_results=1,doc_content_chars_max=200)
-wiki = WikipediaQueryRun(api_wrapper=wiki_wrapper)
+    arxiv.name = "Arxiv"
+    wiki.name = "Wikipedia"
 
-arxiv.name = "Arxiv"
-wiki.name = "Wikipedia"
+    search = DuckDuckGoSearchRun(name="Search")
 
-search = DuckDuckGoSearchRun(name="Search")
+    # Identical queries (from any session) within the TTL are answered from the cache,
+    # concurrent identical queries share one upstream call
+    cache = TTLCache(ttl=TOOL_CACHE_TTL)
+    return [cached_tool(tool, cache) for tool in (search,arxiv,wiki)]
+
+tools = resources.get_or_create(("search_tools",), build_tools)
+fanout = resources.get_or_create(("search_fanout",), lambda: ToolFanout(tools))
+setup_seconds = time.perf_counter() - setup_start
 
 st.title("Langchain chat with search")
 
 # Sidebar for settings
 st.sidebar.title("Settings")
 api_key = st.sidebar.text_input("Enter your Groq Api Key:",type="password")
+prefetch = st.sidebar.checkbox("Query all sources in parallel first", value=True)
 
 if "messages" not in st.session_state:
     st.session_state["messages"] = [{"role":"assistant",
@@ -41,15 +62,37 @@ if prompt and api_key:
     st.session_state.messages.append({"role":"user","content":prompt})   
     st.chat_message("user").write(prompt)
 
-    llm = ChatGroq(groq_api_key = api_key, model_name = "llama3-8b-8192",streaming=True)
-    tools = [search,arxiv,wiki]
+    setup_start = time.perf_counter()
+    llm_key = resources.resource_key("llm", "groq", "llama3-8b-8192", api_key, streaming=True)
+    llm = resources.get_llm("groq", "llama3-8b-8192", api_key, streaming=True)
+
+    search_agent = resources.get_or_create(
+        ("search_agent",) + llm_key,
+        lambda: AgentExecutor.from_agent_and_tools(agent=PrefetchAgent.from_llm_and_tools(llm,tools),tools=tools,
+                                                   handle_parsing_errors=True,**executor_limits())
+    )
+    setup_seconds += time.perf_counter() - setup_start
+    st.sidebar.caption(f"Setup this rerun: {setup_seconds * 1000:.1f} ms")
 
-    search_agent = initialize_agent(tools,llm,agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION,handle_parsing_errors=True)
+    # Per-session memory: recent turns verbatim, older ones summarized and retrieved on demand
+    if "memory" not in st.session_state:
+        st.session_state["memory"] = ConversationMemory(summarize=llm_summarizer(llm))
+    memory = st.session_state["memory"]
 
     with st.chat_message("assistant"):
         st_cb = StreamlitCallbackHandler(st.container(),expand_new_thoughts=False)
-        history = "\n".join([f"{msg['role']}: {msg['content']}" for msg in st.session_state.messages])
-        response = search_agent.run(history, callbacks=[st_cb])
-        
+        history = memory.build_input(prompt)
+        st.sidebar.caption(f"Prompt: {memory.last_prompt_tokens} tokens "
+                           f"(full history would be {memory.last_full_tokens})")
+        agent_input = history
+        if prefetch:
+            # Search, Arxiv and Wikipedia run concurrently instead of one ReAct step at a time; the results
+            # open the scratchpad once as if the agent had called each tool, instead of riding in the input
+            agent_input = {"input": history, "prefetched": prefetched_steps(fanout.prefetch(prompt), prompt)}
+        response, run_stats = run_with_budget(search_agent, agent_input, "search", callbacks=[st_cb])
+        st.sidebar.caption(describe(run_stats))
+
         st.session_state.messages.append({"role":"assistant","content":response})
         st.write(response)
+        # Folding may make a summarization call, so it runs after the answer is on screen
+        memory.add_turn(prompt, response)
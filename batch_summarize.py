@@ -0,0 +1,204 @@
+"""
+Toplu özetleme (batch) komut satırı aracı
+
+Özetleme şimdiye kadar sadece youtube_app.py arayüzünde, her seferinde tek bir URL için butona basarak
+yapılabiliyordu. Binlerce linki gece boyunca özetlemek için bu araç arayüzsüz çalışır:
+
+    - girdi: JSONL dosyası (requests.jsonl ile aynı biçim), satır başına bir iş. URL "url" alanından,
+      yoksa satırdaki ilk http(s) adresinden alınır; iş kimliği "id" / "request_id" alanı veya satır numarasıdır
+    - her iş arayüzle aynı yoldan geçer: content_loader.load_document (fetch + extract) ve
+      summarizer.summarize_document (gerekirse paralel map-reduce); summary_cache paylaşılır
+    - eşzamanlılık sınırlıdır: BATCH_WORKERS iş aynı anda çalışır, girdi dosyası tembel okunur (en fazla
+      2 * workers iş bellekte), tüm LLM çağrıları tek bir TokenBucket ile SUMMARIZE_RPS'e sınırlanır
+    - çıktı: iş başına bir JSONL satırı (status, summary, source_type, karakter sayısı, önbellek bilgisi,
+      fetch / parse / summarize / total süreleri); her satır yazıldıktan sonra flush + fsync edilir
+    - kaldığı yerden devam (resume): çıktı dosyası aynı zamanda checkpoint'tir. Yeniden çalıştırıldığında
+      "ok" olan işler atlanır; hatalı işler tekrar denenir (--skip-failed ile atlanır). Çökme anında yarım
+      kalan son satır yok sayılır. Bir iş birden fazla satırda görünebilir; geçerli olan sonuncusudur.
+
+Kullanım (GROQ_API_KEY ortam değişkeni gerekir):
+    python batch_summarize.py urls.jsonl --output summaries.jsonl
+    python batch_summarize.py urls.jsonl --output summaries.jsonl --workers 8 --limit 100
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+
+import validators
+from langchain.prompts import PromptTemplate
+
+import resources
+from content_loader import load_document
+from summarizer import REQUESTS_PER_SECOND, TokenBucket, summarize_document
+from summary_cache import get_cache
+
+MODEL_NAME = os.getenv("BATCH_MODEL", "llama3-8b-8192")
+CONTEXT_WINDOW = 8192
+MAX_OUTPUT_TOKENS = 1024
+WORKERS = int(os.getenv("BATCH_WORKERS", "4"))
+
+# Same template as youtube_app.py, so the UI and batch runs share summary cache entries
+prompt_template = """
+Please provide a concise summary of the following content in about 300 words.
+Focus on key points and main ideas:
+
+Content:{text}
+
+SUMMARY:
+"""
+prompt = PromptTemplate(template=prompt_template, input_variables=["text"])
+
+_URL = re.compile(r"https?://[^\s\"'<>]+")
+
+
+#1. GİRDİ VE CHECKPOINT
+def _first_url(record):
+    for value in record.values():
+        match = _URL.search(value) if isinstance(value, str) else None
+        if match:
+            return match.group(0).rstrip(".,;:)]")
+    return None
+
+
+def read_jobs(path):
+    """Yield (job id, url) per line; the id defaults to the line number"""
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                print(f"{path}:{number}: not valid JSON, skipped")
+                continue
+            if isinstance(record, str):
+                record = {"url": record}
+            job_id = str(record.get("id") or record.get("request_id") or number)
+            yield job_id, record.get("url") or _first_url(record)
+
+
+def load_checkpoint(path, skip_failed=False):
+    """Ids already handled by a previous run of the same output file"""
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # partial last line of a crashed run
+            if record.get("status") == "ok" or skip_failed:
+                done.add(record["id"])
+    return done
+
+
+def open_output(path):
+    out = open(path, "a", encoding="utf-8")
+    if out.tell():
+        with open(path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                out.write("\n")  # start after a partial line instead of appending to it
+    return out
+
+
+#2. TEK İŞ
+def summarize_url(job_id, url, llm, cache, bucket):
+    """Fetch, extract and summarize one URL; never raises, errors become the record's status"""
+    start = time.perf_counter()
+    record = {"id": job_id, "url": url}
+    result = None
+    try:
+        if not url or not validators.url(url):
+            raise ValueError("Invalid URL")
+        result = load_document(url, cache)
+        if not result.document or not result.document.page_content.strip():
+            raise ValueError("No content found")
+        summarize_document(result, llm, prompt, MODEL_NAME, cache=cache, context_window=CONTEXT_WINDOW,
+                           max_output_tokens=MAX_OUTPUT_TOKENS, bucket=bucket)
+        record.update(status="ok", source_type=result.source_type, summary=result.summary,
+                      characters=len(result.document.page_content), document_cached=result.document_cached,
+                      summary_cached=result.summary_cached)
+    except Exception as e:
+        record.update(status="error", error=f"{type(e).__name__}: {e}")
+    timings = dict(result.timings) if result else {}
+    timings["total"] = time.perf_counter() - start
+    record["timings"] = {name: round(seconds, 3) for name, seconds in timings.items()}
+    return record
+
+
+#3. TOPLU ÇALIŞTIRMA
+def run(input_path, output_path, workers=WORKERS, limit=None, skip_failed=False):
+    llm = resources.get_llm("groq", MODEL_NAME, os.environ["GROQ_API_KEY"],
+                            temperature=0.3, max_tokens=MAX_OUTPUT_TOKENS)
+    cache = get_cache()
+    bucket = TokenBucket(REQUESTS_PER_SECOND, capacity=workers)
+    done = load_checkpoint(output_path, skip_failed)
+    seen = set()
+    counts = {"ok": 0, "error": 0, "skipped": 0}
+    latencies = []
+    start = time.perf_counter()
+
+    out = open_output(output_path)
+    pool = ThreadPoolExecutor(max_workers=workers)
+
+    def write(futures):
+        for future in futures:
+            record = future.result()
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+            os.fsync(out.fileno())
+            counts[record["status"]] += 1
+            latencies.append(record["timings"]["total"])
+            print(f"[{counts['ok'] + counts['error']}] {record['status']:<5} {record['id']} "
+                  f"{record['timings']['total']:.1f}s {record.get('error', '')}")
+
+    try:
+        in_flight = set()
+        for job_id, url in read_jobs(input_path):
+            if job_id in done or job_id in seen:
+                counts["skipped"] += 1
+                continue
+            if limit is not None and len(seen) >= limit:
+                break
+            seen.add(job_id)
+            if len(in_flight) >= 2 * workers:
+                finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                write(finished)
+            in_flight.add(pool.submit(summarize_url, job_id, url, llm, cache, bucket))
+        write(as_completed(in_flight))
+        pool.shutdown()
+    except KeyboardInterrupt:
+        # Finished items are already on disk; rerunning the same command resumes after them
+        print("Interrupted, rerun the same command to resume")
+        pool.shutdown(wait=False, cancel_futures=True)
+    finally:
+        out.close()
+
+    elapsed = time.perf_counter() - start
+    processed = counts["ok"] + counts["error"]
+    print(f"\n{processed} processed ({counts['ok']} ok, {counts['error']} failed), "
+          f"{counts['skipped']} skipped from earlier runs, {elapsed:.0f}s, "
+          f"{processed / max(elapsed, 1e-9) * 60:.1f} items/min")
+    if latencies:
+        latencies.sort()
+        p95 = latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))]
+        print(f"per item: p50 {statistics.median(latencies):.1f}s, p95 {p95:.1f}s; cache {cache.stats()}")
+    return counts
+
+
+#4. KOMUT SATIRI
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize every URL in a JSONL file, resumably")
+    parser.add_argument("input", help="JSONL file, one job per line with a 'url' (or a URL in any field)")
+    parser.add_argument("--output", required=True, help="results JSONL; also the resume checkpoint")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="URLs processed at the same time")
+    parser.add_argument("--limit", type=int, help="process at most this many new items")
+    parser.add_argument("--skip-failed", action="store_true", help="do not retry items that failed in earlier runs")
+    args = parser.parse_args()
+    run(args.input, args.output, args.workers, args.limit, args.skip_failed)
@@ -0,0 +1,68 @@
+"""
+HTML çıkarıcı benchmark'ı
+
+benchmarks/html altındaki kayıtlı sayfalar (*.html) her backend ile çıkarılır ve
+elle hazırlanmış referans metinle (*.txt) karşılaştırılır.
+
+Hız: saniyedeki sayfa ve MB sayısı.
+Kalite: referansa göre kelime bazlı precision / recall / F1.
+
+Çalıştırma (repo kökünden):
+    python -m benchmarks.bench_extract --repeat 50
+"""
+import argparse
+import time
+from collections import Counter
+from pathlib import Path
+
+from html_extractors import EXTRACTORS, available_extractors
+
+CORPUS = Path(__file__).parent / "html"
+
+
+def word_f1(predicted, reference):
+    predicted, reference = Counter(predicted.lower().split()), Counter(reference.lower().split())
+    overlap = sum((predicted & reference).values())
+    if not overlap:
+        return 0.0, 0.0, 0.0
+    precision = overlap / sum(predicted.values())
+    recall = overlap / sum(reference.values())
+    return precision, recall, 2 * precision * recall / (precision + recall)
+
+
+def load_corpus():
+    pages = []
+    for html_path in sorted(CORPUS.glob("*.html")):
+        reference = html_path.with_suffix(".txt").read_text(encoding="utf-8")
+        pages.append((html_path.stem, html_path.read_text(encoding="utf-8"), reference))
+    return pages
+
+
+def run(backends, repeat):
+    pages = load_corpus()
+    total_bytes = sum(len(html.encode("utf-8")) for _, html, _ in pages)
+    print(f"{len(pages)} pages, {total_bytes / 1024:.1f} KB, {repeat} repetitions\n")
+    print(f"{'backend':<12} {'pages/s':>9} {'MB/s':>7} {'prec':>6} {'recall':>6} {'F1':>6}")
+
+    for backend in backends:
+        extract = EXTRACTORS[backend]
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for _, html, _ in pages:
+                extract(html)
+        elapsed = time.perf_counter() - start
+
+        scores = [word_f1(extract(html), reference) for _, html, reference in pages]
+        precision, recall, f1 = (sum(column) / len(scores) for column in zip(*scores))
+        pages_per_second = repeat * len(pages) / elapsed
+        mb_per_second = repeat * total_bytes / elapsed / 1e6
+        print(f"{backend:<12} {pages_per_second:>9.0f} {mb_per_second:>7.2f} "
+              f"{precision:>6.2f} {recall:>6.2f} {f1:>6.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare HTML extractor throughput and quality")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--backend", action="append", help="limit to these backends")
+    args = parser.parse_args()
+    run(args.backend or available_extractors(), args.repeat)
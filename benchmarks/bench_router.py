@@ -0,0 +1,120 @@
+"""
+math_app niyet yönlendirici (math_router) benchmark'ı
+
+benchmarks/math_questions.jsonl içindeki her soru etiketlidir (calculator / wikipedia / agent).
+
+Yönlendirme doğruluğu: route() kararının etikete uyup uymadığı, karışıklık matrisi ve yanlış yönlendirilen sorular.
+Yönlendirme gecikmesi: route() çağrısı başına mikrosaniye (ortalama / p95); LLM gerektirmez.
+
+--e2e ile uçtan uca gecikme de ölçülür: her soru bir kez yönlendirici + (gerekirse) agent ile, bir kez de
+doğrudan agent ile cevaplanır. GROQ_API_KEY ortam değişkeni ve internet erişimi (Wikipedia) gerekir.
+
+Çalıştırma (repo kökünden):
+    python -m benchmarks.bench_router
+    python -m benchmarks.bench_router --e2e
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+from collections import Counter
+from pathlib import Path
+
+import math_router
+
+QUESTIONS = Path(__file__).parent / "math_questions.jsonl"
+INTENTS = [math_router.CALCULATOR, math_router.WIKIPEDIA, math_router.AGENT]
+
+
+def p95(values):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(0.95 * len(values)))]
+
+
+def routing(questions, repeat):
+    confusion, misses, latencies = Counter(), [], []
+    for item in questions:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            intent, _ = math_router.route(item["question"])
+            latencies.append((time.perf_counter() - start) * 1e6)
+        confusion[item["intent"], intent] += 1
+        if intent != item["intent"]:
+            misses.append((item["intent"], intent, item["question"]))
+
+    correct = sum(confusion[intent, intent] for intent in INTENTS)
+    print(f"routing accuracy: {correct}/{len(questions)} ({correct / len(questions):.0%})")
+    print(f"routing latency: mean {statistics.mean(latencies):.0f} us, p95 {p95(latencies):.0f} us\n")
+    print(f"{'label/routed':<15}" + "".join(f"{intent:>12}" for intent in INTENTS))
+    for label in INTENTS:
+        print(f"{label:<15}" + "".join(f"{confusion[label, intent]:>12}" for intent in INTENTS))
+    for label, intent, question in misses:
+        print(f"  {label} -> {intent}: {question}")
+
+
+def build_agent(model):
+    from langchain.agents import AgentType, Tool, initialize_agent
+    from langchain.chains import LLMMathChain
+    from langchain_community.utilities import WikipediaAPIWrapper
+
+    import resources
+    from agent_telemetry import executor_limits
+
+    llm = resources.get_llm("groq", model, os.environ["GROQ_API_KEY"])
+    wikipedia = WikipediaAPIWrapper()
+    math_chain = LLMMathChain.from_llm(llm=llm)
+    tools = [
+        Tool(name="Wikipedia", func=wikipedia.run,
+             description="A tool searching the internet to find various information"),
+        Tool(name="Calculator", func=math_chain.run,
+             description="A tool answering math related questions. Only input mathematical expressions."),
+    ]
+    agent = initialize_agent(tools=tools, llm=llm, agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
+                             handle_parsing_errors=True, **executor_limits())
+    return agent
+
+
+def end_to_end(questions, model):
+    agent = build_agent(model)
+
+    def routed(question):
+        intent, payload = math_router.route(question)
+        if intent == math_router.CALCULATOR:
+            return payload
+        if intent == math_router.WIKIPEDIA:
+            answer = math_router.wikipedia_answer(payload)
+            if answer is not None:
+                return answer
+        return agent.invoke({"input": question})["output"]
+
+    def direct(question):
+        return agent.invoke({"input": question})["output"]
+
+    print(f"\nend to end, model {model}")
+    print(f"{'mode':<8} {'mean s':>7} {'p50 s':>6} {'p95 s':>6} {'errors':>6}")
+    for name, answer in (("routed", routed), ("agent", direct)):
+        latencies, errors = [], 0
+        for item in questions:
+            start = time.perf_counter()
+            try:
+                answer(item["question"])
+            except Exception as e:
+                errors += 1
+                print(f"  {name} failed on {item['question']!r}: {e}")
+            latencies.append(time.perf_counter() - start)
+        print(f"{name:<8} {statistics.mean(latencies):>7.2f} {statistics.median(latencies):>6.2f} "
+              f"{p95(latencies):>6.2f} {errors:>6}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Routing accuracy and latency of the math assistant's intent router")
+    parser.add_argument("--repeat", type=int, default=100, help="route() calls per question for the latency figure")
+    parser.add_argument("--e2e", action="store_true", help="also time routed vs agent-only answers (needs GROQ_API_KEY)")
+    parser.add_argument("--model", default="Gemma2-9b-It")
+    args = parser.parse_args()
+    questions = [json.loads(line) for line in QUESTIONS.read_text(encoding="utf-8").splitlines() if line.strip()]
+    print(f"{len(questions)} labelled questions\n")
+    routing(questions, args.repeat)
+    if args.e2e:
+        end_to_end(questions, args.model)
@@ -0,0 +1,117 @@
+"""
+Text-to-SQL benchmark'ı: hızlı yol (sql_fast_path) ve ReAct agent karşılaştırması
+
+benchmarks/sql_questions.jsonl içindeki her soru iki modda da cevaplanır.
+
+Doğruluk (execution accuracy): modun çalıştırdığı SQL'in sonucu referans SQL'in sonucuyla aynı mı
+(satır sırası önemsiz).
+Hız: soru başına gecikme (ortalama / p50 / p95) ve LLM çağrısı sayısı.
+
+Hızlı yol, streamlit_db_app gibi davranır: üretilen SQL reddedilirse (InvalidSQL) soru agent'a düşer.
+Bu sorular hızlı yolun doğruluk / gecikme / LLM çağrısı sayılarına dahildir ve "fallbacks" sütununda ayrıca
+sayılır.
+
+GROQ_API_KEY ortam değişkeni gerekir. Çalıştırma (repo kökünden):
+    python -m benchmarks.bench_sql --mode fast --mode agent
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+from collections import Counter
+from pathlib import Path
+
+from sqlalchemy import create_engine
+
+import resources
+from agent_telemetry import AgentTelemetry, executor_limits
+from sql_fast_path import InvalidSQL, fast_answer
+from sql_result_cache import SQLCapture
+from sql_schema import SchemaCache, agent_prompt
+
+QUESTIONS = Path(__file__).parent / "sql_questions.jsonl"
+DEFAULT_DB = Path(__file__).parent.parent / "student.db"
+
+
+def rows(engine, sql):
+    with engine.connect() as conn:
+        return Counter(tuple(row) for row in conn.exec_driver_sql(sql).fetchall())
+
+
+def build_agent(llm, engine, schema_text):
+    from langchain_community.agent_toolkits import SQLDatabaseToolkit, create_sql_agent
+    from langchain_community.utilities import SQLDatabase
+
+    db = SQLDatabase(engine)
+    return create_sql_agent(llm=llm, toolkit=SQLDatabaseToolkit(db=db, llm=llm),
+                            agent_type="zero-shot-react-description", prompt=agent_prompt(schema_text),
+                            handle_parsing_errors=True, **executor_limits("force"))
+
+
+def run_agent(agent, question):
+    telemetry, capture = AgentTelemetry("sql-bench"), SQLCapture()
+    agent.invoke({"input": question}, {"callbacks": [telemetry, capture]})
+    return capture.sql, telemetry.summary()["llm_calls"]
+
+
+def run_fast(llm, engine, schema_text, question, agent):
+    """(sql, LLM calls, fell back to the agent) with the app's fallback on rejected SQL"""
+    try:
+        result = fast_answer(llm, engine, schema_text, question, phrase=False)
+    except InvalidSQL:
+        sql, llm_calls = run_agent(agent(), question)
+        return sql, 1 + llm_calls, True
+    return result["sql"], result["llm_calls"], False
+
+
+def run(modes, db_path, model):
+    engine = create_engine(f"sqlite:///{db_path}")
+    _, schema_text = SchemaCache(engine).current()
+    llm = resources.get_llm("groq", model, os.environ["GROQ_API_KEY"])
+    questions = [json.loads(line) for line in QUESTIONS.read_text(encoding="utf-8").splitlines() if line.strip()]
+    print(f"{len(questions)} questions, model {model}\n")
+    print(f"{'mode':<6} {'accuracy':>8} {'mean s':>7} {'p50 s':>6} {'p95 s':>6} {'LLM calls':>9} {'fallbacks':>9}")
+
+    agents = []
+
+    def agent():
+        # Built on first use, so a fast-only run without fallbacks never creates it
+        if not agents:
+            agents.append(build_agent(llm, engine, schema_text))
+        return agents[0]
+
+    for mode in modes:
+        correct, latencies, calls, fallbacks = 0, [], [], 0
+        for item in questions:
+            start = time.perf_counter()
+            try:
+                if mode == "fast":
+                    sql, llm_calls, fell_back = run_fast(llm, engine, schema_text, item["question"], agent)
+                    fallbacks += fell_back
+                else:
+                    sql, llm_calls = run_agent(agent(), item["question"])
+            except Exception as e:
+                print(f"  {mode} failed on {item['question']!r}: {e}")
+                sql, llm_calls = None, 0
+            latencies.append(time.perf_counter() - start)
+            calls.append(llm_calls)
+            try:
+                correct += sql is not None and rows(engine, sql) == rows(engine, item["sql"])
+            except Exception:
+                pass
+
+        latencies.sort()
+        p95 = latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))]
+        print(f"{mode:<6} {correct / len(questions):>8.0%} {statistics.mean(latencies):>7.2f} "
+              f"{statistics.median(latencies):>6.2f} {p95:>6.2f} {statistics.mean(calls):>9.1f} "
+              f"{fallbacks if mode == 'fast' else '-':>9}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the single-shot SQL fast path with the ReAct SQL agent")
+    parser.add_argument("--mode", action="append", choices=["fast", "agent"], help="default: both")
+    parser.add_argument("--db", default=str(DEFAULT_DB))
+    parser.add_argument("--model", default="Llama3-8b-8192")
+    args = parser.parse_args()
+    run(args.mode or ["fast", "agent"], args.db, args.model)
@@ -0,0 +1,141 @@
+"""
+Token bazlı anlamsal parçalayıcı (chunker)
+
+Eski kod metni content[i:i+2000] ile böldüğü için cümleler ve kelimeler ortadan kesiliyordu,
+modelin gerçek context penceresi de hesaba katılmıyordu.
+
+Burada metin önce paragraflara, sonra cümlelere ayrılır ve parçalar gerçek token sayısına göre
+modelin context penceresinin bir oranına (fraction) kadar doldurulur. İstenirse parçalar arasında
+overlap bırakılır. Daha az ama daha dolu parça = doküman başına daha az LLM çağrısı.
+Tek başına bütçeyi aşan bir "kelime" (boşluksuz CJK metni, uzun URL, base64) token sınırlarından kesilir;
+hiçbir parça max_tokens'ı aşmaz.
+
+Token sayımı tiktoken ile yapılır (yoksa ~4 karakter/token tahmini). Sadece kısa birimlerin (cümle, kelime,
+transcript segmenti; en fazla UNIT_CACHE_CHARS karakter) sayımı önbelleğe alınır (count_unit_tokens);
+overlap yüzünden tekrar sayılan cümleler tekrar tokenize edilmez. Tam dokümanlar count_tokens ile önbelleksiz
+sayılır, böylece sayfa ve transcript metinleri süreç boyunca bellekte tutulmaz.
+"""
+import codecs
+import re
+from functools import lru_cache
+
+try:
+    import tiktoken
+    # llama3's tokenizer is tiktoken-based; cl100k_base counts within a few percent of it
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except Exception:
+    _encoding = None
+
+UNIT_CACHE_CHARS = 1024
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+_SENTENCE_END = re.compile(r"(?<=[.!?…])\s+(?=[\"'“(\[]?[A-ZÇĞİÖŞÜ0-9])")
+
+
+def count_tokens(text):
+    if _encoding is not None:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return len(text) // 4 + 1
+
+
+_cached_count = lru_cache(maxsize=16384)(count_tokens)
+
+
+def count_unit_tokens(text):
+    """count_tokens for chunking units; short texts are cached, long ones are not kept alive"""
+    return _cached_count(text) if len(text) <= UNIT_CACHE_CHARS else count_tokens(text)
+
+
+def chunk_budget(context_window, fraction=0.5, reserved_tokens=0):
+    """Tokens available for one chunk: a fraction of the context minus prompt and output"""
+    return max(int(context_window * fraction) - reserved_tokens, 64)
+
+
+def _slice_tokens(text, max_tokens):
+    """Cut a single unbreakable word (CJK text, URLs, base64) into pieces of at most max_tokens tokens"""
+    if _encoding is None:
+        width = max(max_tokens - 1, 1) * 4
+        return [text[i:i + width] for i in range(0, len(text), width)]
+    tokens = _encoding.encode(text, disallowed_special=())
+    # Token windows can split a multi-byte character; the incremental decoder carries it to the next piece
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    pieces = []
+    for start in range(0, len(tokens), max_tokens):
+        piece = decoder.decode(_encoding.decode_bytes(tokens[start:start + max_tokens]))
+        if piece:
+            pieces.append(piece)
+    return pieces
+
+
+def _split_words(sentence, max_tokens):
+    """Break a sentence longer than max_tokens (e.g. unpunctuated transcripts) at word boundaries"""
+    pieces, current, size = [], [], 0
+    for word in sentence.split():
+        tokens = count_unit_tokens(" " + word)
+        if tokens > max_tokens:
+            if current:
+                pieces.append(" ".join(current))
+                current, size = [], 0
+            pieces.extend(_slice_tokens(word, max_tokens))
+            continue
+        if current and size + tokens > max_tokens:
+            pieces.append(" ".join(current))
+            current, size = [], 0
+        current.append(word)
+        size += tokens
+    if current:
+        pieces.append(" ".join(current))
+    return pieces
+
+
+def _units(text, max_tokens):
+    """Yield (text, tokens, starts_paragraph) units no larger than max_tokens"""
+    for paragraph in _PARAGRAPH_BREAK.split(text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        tokens = count_unit_tokens(paragraph)
+        if tokens <= max_tokens:
+            yield paragraph, tokens, True
+            continue
+        first = True
+        for sentence in _SENTENCE_END.split(paragraph):
+            tokens = count_unit_tokens(sentence)
+            pieces = [sentence] if tokens <= max_tokens else _split_words(sentence, max_tokens)
+            for piece in pieces:
+                yield piece, count_unit_tokens(piece), first
+                first = False
+
+
+def chunk_text(text, max_tokens, overlap_tokens=0):
+    """Pack paragraphs/sentences into chunks of at most max_tokens tokens.
+
+    Consecutive chunks share up to overlap_tokens tokens of trailing sentences.
+    """
+    chunks = []
+    current = []  # (text, tokens, starts_paragraph)
+    size = 0
+
+    def flush():
+        chunks.append("".join(
+            ("\n\n" if starts and i else " " if i else "") + unit
+            for i, (unit, _, starts) in enumerate(current)
+        ))
+
+    for unit in _units(text, max_tokens):
+        if current and size + unit[1] > max_tokens:
+            flush()
+            # Carry the tail of the previous chunk over as overlap
+            carried, carried_size = [], 0
+            for previous in reversed(current):
+                if carried_size + previous[1] > overlap_tokens or carried_size + previous[1] + unit[1] > max_tokens:
+                    break
+                carried.insert(0, previous)
+                carried_size += previous[1]
+            current, size = carried, carried_size
+        current.append(unit)
+        size += unit[1]
+
+    if current:
+        flush()
+    return chunks
@@ -1,56 +1,30 @@
-
-import requests
-import json
+import os
 import gradio as gr
+from code_generation import ConversationHistory, generate_response, generate_response_stream
 #1. Gerekli Kütüphanelerin İçe Aktarılması
 
 """
-typing.final ve matplotlib.pyplot.hist aslında bu kodda kullanılmıyor, kaldırılabilir.
-requests: HTTP istekleri yapmak için kullanılır.
-json: JSON verilerini işlemek için kullanılır.
 gradio: Web tabanlı arayüz oluşturmak için kullanılır
+code_generation: Ollama isteği ve oturum geçmişi (ConversationHistory, generate_response,
+generate_response_stream) arayüzden bağımsız olarak orada tanımlıdır; service.py de aynı modülü kullanır.
 """
-url = "http://localhost:11434/api/generate"
-
-headers = {
-    "Content-Type": "application/json",
-}
-#2. API URL ve Header Tanımlamaları
-"""
-API'ye istek yapılacak adres ve içerik tipini belirten başlıklar tanımlanıyor.
+#2. - #4b. bkz. code_generation.py
+#4c. Mod Seçimi
 """
-#3. Geçmiş (history) Listesi
+Arayüzdeki "Stream response" kutucuğu ile akışlı veya klasik (tek seferde) mod seçilir.
+Varsayılan değer CODE_ASSISTANT_STREAM ortam değişkeninden okunur ("0" ise klasik mod).
+Oturum geçmişi Gradio'nun "state" bileşeni ile her kullanıcıya ayrı tutulur.
 """
-Kullanıcının yazdığı tüm promptlar burada saklanıyor. Böylece önceki girdiler de modele gönderilebiliyor.
-"""
-history = []
+STREAM_BY_DEFAULT = os.getenv("CODE_ASSISTANT_STREAM", "1") != "0"
 
-#4. Ana Fonksiyon: generate_response
-"""
-Kullanıcıdan gelen prompt, history listesine ekleniyor.
-Tüm geçmiş promptlar birleştirilip (final_prompt) modele gönderiliyor.
-API'ye POST isteği gönderiliyor.
-Eğer istek başarılıysa (status_code == 200), dönen JSON içinden modelin cevabı alınıp kullanıcıya dönülüyor.
-Hata olursa hata mesajı dönülüyor.
-"""
-def generate_response(prompt):
-    history.append(prompt)
-    final_prompt = "\n".join(history)
-
-    data = {
-        "model": "codeguru",
-        "prompt": final_prompt,
-        "stream": False,
-    }
-
-    response = requests.post(url, headers=headers, data=json.dumps(data))
-    if response.status_code == 200:
-        response = response.text
-        data = json.loads(response)
-        actual_response = data['response']
-        return actual_response
+def respond(prompt, stream=STREAM_BY_DEFAULT, session=None):
+    if session is None:
+        session = ConversationHistory()
+    if stream:
+        for text in generate_response_stream(prompt, session):
+            yield text, session
     else:
-        return {"error": response.text}
+        yield generate_response(prompt, session), session
  #5. Gradio Arayüzü Oluşturulması
 """
 Gradio ile bir web arayüzü oluşturuluyor.
@@ -58,21 +32,27 @@ Kullanıcıdan metin girişi alınıyor ve cevap olarak metin gösteriliyor.
 Arayüz başlığı ve açıklaması belirleniyor.
 """   
 interface = gr.Interface(
-    fn=generate_response,
-    inputs=gr.Textbox(lines=4, placeholder="Enter your prompt here"),
-    outputs="text",
+    fn=respond,
+    inputs=[
+        gr.Textbox(lines=4, placeholder="Enter your prompt here"),
+        gr.Checkbox(value=STREAM_BY_DEFAULT, label="Stream response"),
+        "state",
+    ],
+    outputs=["text", "state"],
     title="Code Assistant",
     description="A simple code assistant that generates code based on your prompt.",
 )
 #6. Arayüzün Başlatılması
 """
 Gradio arayüzü başlatılıyor ve kullanıcıya sunuluyor.
+Modül import edildiğinde (ör. sahte bir Ollama sunucusuna karşı test ederken) arayüz başlatılmaz.
 """
-interface.launch()
+if __name__ == "__main__":
+    interface.launch()
 
 """
 Kullanıcı arayüze prompt girer.
-Prompt geçmişe eklenir ve API'ye gönderilir.
+Prompt oturum geçmişiyle (veya Ollama context'i ile) birlikte API'ye gönderilir.
 API'den gelen cevap kullanıcıya gösterilir.
 """
 
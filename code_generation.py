@@ -0,0 +1,204 @@
+"""
+Kod asistanının arayüzden bağımsız çekirdeği
+
+code_assistant.py Gradio arayüzünü modül seviyesinde kurar; service.py'nin /code ucu sadece oturum geçmişi
+ve Ollama isteği için o modülü import ettiğinde gradio yükleniyor ve gr.Interface bir istek içinde
+oluşturuluyordu. ConversationHistory, generate_response ve generate_response_stream burada, UI yan etkisi
+olmadan durur; code_assistant.py (Gradio) ve service.py (FastAPI) ikisi de buradan import eder.
+"""
+import json
+import os
+import time
+
+import http_client
+
+url = os.getenv("OLLAMA_URL", "http://localhost:11434/api/generate")
+# Generation on CPU hosts can take minutes; the read timeout applies per chunk when streaming
+OLLAMA_TIMEOUT = (5, 600)
+
+headers = {
+    "Content-Type": "application/json",
+}
+#2. API URL ve Header Tanımlamaları
+"""
+API'ye istek yapılacak adres ve içerik tipini belirten başlıklar tanımlanıyor.
+"""
+#3. Oturum Bazlı Geçmiş (ConversationHistory)
+"""
+Her Gradio oturumu kendi ConversationHistory nesnesini tutar; geçmiş artık tüm kullanıcılar arasında paylaşılmaz.
+Geçmiş bir token bütçesi (CODE_ASSISTANT_HISTORY_TOKENS) içinde tutulur: bütçe aşılınca en eski turlar kayan pencereden düşer.
+CODE_ASSISTANT_SUMMARIZE=1 ise düşen turlar model ile kısa bir özete dönüştürülüp prompt'un başına eklenir.
+Ollama'nın /api/generate cevabında döndürdüğü 'context' token dizisi saklanır ve bir sonraki istekte geri gönderilir.
+Böylece sunucu her turda tüm geçmişi yeniden işlemez; sadece yeni prompt gönderilir.
+"""
+HISTORY_TOKEN_BUDGET = int(os.getenv("CODE_ASSISTANT_HISTORY_TOKENS", "2048"))
+SUMMARIZE_HISTORY = os.getenv("CODE_ASSISTANT_SUMMARIZE", "0") == "1"
+
+def estimate_tokens(text):
+    # ~4 characters per token is close enough for llama-family tokenizers
+    return len(text) // 4 + 1
+
+def truncate_tokens(text, max_tokens):
+    """Cut text to about max_tokens tokens, using the same 4-characters-per-token estimate"""
+    return text if estimate_tokens(text) <= max_tokens else text[: max(max_tokens - 1, 0) * 4]
+
+def summarize_turns(summary, turns):
+    """Fold evicted turns into the running conversation summary"""
+    transcript = "\n".join(f"User: {user}\nAssistant: {assistant}" for user, assistant, _ in turns)
+    data = {
+        "model": "codeguru",
+        "prompt": (
+            "Summarize the following conversation in a few sentences. "
+            "Keep names, code identifiers and decisions.\n\n"
+            f"{summary}\n{transcript}\n\nSUMMARY:"
+        ),
+        "stream": False,
+    }
+    response = http_client.post(url, headers=headers, data=json.dumps(data), timeout=OLLAMA_TIMEOUT)
+    if response.status_code != 200:
+        return summary
+    return json.loads(response.text)["response"].strip()
+
+class ConversationHistory:
+    """Per-session chat history kept inside a token budget"""
+
+    def __init__(self, max_tokens=HISTORY_TOKEN_BUDGET, summarize=SUMMARIZE_HISTORY):
+        self.max_tokens = max_tokens
+        self.summarize = summarize
+        self.turns = []  # (prompt, response, estimated tokens)
+        self.summary = ""
+        self.context = None
+        self.last_stream_stats = {}  # timings of this session's latest streamed answer
+
+    def build_request(self, prompt):
+        """Return the prompt text and the Ollama context to send for a new turn"""
+        prompt_tokens = estimate_tokens(prompt)
+        if self.context and len(self.context) + prompt_tokens <= self.max_tokens:
+            # The server already holds the whole conversation in its context
+            return prompt, self.context
+
+        self.context = None
+        self._trim(prompt_tokens)
+        if not self.turns and not self.summary:
+            return prompt, None
+
+        parts = []
+        if self.summary:
+            parts.append(f"Summary of the earlier conversation:\n{self.summary}")
+        for user, assistant, _ in self.turns:
+            parts.append(f"User: {user}\nAssistant: {assistant}")
+        parts.append(f"User: {prompt}\nAssistant:")
+        return "\n\n".join(parts), None
+
+    def record(self, prompt, response, context=None):
+        self.turns.append((prompt, response, estimate_tokens(prompt) + estimate_tokens(response)))
+        self.context = context or None
+
+    def _trim(self, reserved_tokens):
+        budget = self.max_tokens - reserved_tokens - estimate_tokens(self.summary)
+        used = sum(tokens for _, _, tokens in self.turns)
+        evicted = []
+        while self.turns and used > budget:
+            turn = self.turns.pop(0)
+            used -= turn[2]
+            evicted.append(turn)
+        if evicted and self.summarize:
+            # Keep the summary itself from eating the whole budget
+            self.summary = truncate_tokens(summarize_turns(self.summary, evicted), self.max_tokens // 2)
+
+#4. Ana Fonksiyon: generate_response
+"""
+Oturumun geçmişinden (session) gönderilecek prompt ve varsa Ollama context dizisi hazırlanıyor.
+Cevap ve yeni context, oturum geçmişine kaydediliyor.
+API'ye POST isteği gönderiliyor.
+Eğer istek başarılıysa (status_code == 200), dönen JSON içinden modelin cevabı alınıp kullanıcıya dönülüyor.
+Hata olursa hata mesajı dönülüyor.
+"""
+def generate_response(prompt, session=None):
+    session = session if session is not None else ConversationHistory()
+    final_prompt, context = session.build_request(prompt)
+
+    data = {
+        "model": "codeguru",
+        "prompt": final_prompt,
+        "stream": False,
+    }
+    if context:
+        data["context"] = context
+
+    response = http_client.post(url, headers=headers, data=json.dumps(data), timeout=OLLAMA_TIMEOUT)
+    if response.status_code == 200:
+        response = response.text
+        data = json.loads(response)
+        actual_response = data['response']
+        session.record(prompt, actual_response, data.get('context'))
+        return actual_response
+    else:
+        return {"error": response.text}
+
+#4b. Akışlı (Streaming) Yanıt: generate_response_stream
+"""
+"stream": True ile Ollama cevabı satır satır NDJSON parçaları halinde gönderir.
+Her parçadaki 'response' alanı biriktirilir ve Gradio kutusuna kısmi metin olarak yield edilir.
+Böylece kullanıcı tüm cevabın bitmesini beklemeden ilk tokenları görür.
+İstek başına ilk token süresi (time-to-first-token) ve saniyedeki token sayısı ölçülüp oturumun
+last_stream_stats alanında tutulur; eşzamanlı oturumlar birbirinin ölçümünü ezmez.
+"""
+def generate_response_stream(prompt, session=None):
+    """Yield the growing completion while reading Ollama's NDJSON stream"""
+    session = session if session is not None else ConversationHistory()
+    final_prompt, context = session.build_request(prompt)
+
+    data = {
+        "model": "codeguru",
+        "prompt": final_prompt,
+        "stream": True,
+    }
+    if context:
+        data["context"] = context
+
+    start = time.perf_counter()
+    first_token_at = None
+    token_count = 0
+    eval_count = None
+    new_context = None
+    text = ""
+
+    with http_client.post(url, headers=headers, data=json.dumps(data), timeout=OLLAMA_TIMEOUT, stream=True) as response:
+        if response.status_code != 200:
+            yield f"Error: {response.text}"
+            return
+
+        for line in response.iter_lines():
+            if not line:
+                continue
+            chunk = json.loads(line)
+            if chunk.get("error"):
+                yield f"Error: {chunk['error']}"
+                return
+            piece = chunk.get("response", "")
+            if piece:
+                if first_token_at is None:
+                    first_token_at = time.perf_counter()
+                token_count += 1
+                text += piece
+                yield text
+            if chunk.get("done"):
+                # Ollama reports the exact generated token count in the final chunk
+                eval_count = chunk.get("eval_count")
+                new_context = chunk.get("context")
+                break
+
+    end = time.perf_counter()
+    tokens = eval_count or token_count
+    generation_time = end - (first_token_at or end)
+    session.last_stream_stats = {
+        "time_to_first_token": (first_token_at - start) if first_token_at else None,
+        "total_time": end - start,
+        "tokens": tokens,
+        "tokens_per_second": tokens / generation_time if generation_time > 0 else None,
+    }
+    session.record(prompt, text, new_context)
+
+    if not text:
+        yield text
@@ -0,0 +1,182 @@
+"""
+İçerik yükleyici (web sayfası ve YouTube transcript)
+
+youtube_app.py ve huggingface_textsummarization.py içinde birebir kopyalanmış olan çekme
+fonksiyonları burada tek yerde tutulur.
+
+load_document(url) içeriği bir kez çeker, ayrıştırır ve SummaryResult içinde döndürür;
+arayüz ve API kullanıcıları aynı çıkarımı tekrar I/O yapmadan kullanır.
+"""
+import logging
+import os
+import re
+import time
+
+from bs4 import BeautifulSoup
+from langchain_core.documents import Document
+
+import http_client
+import youtube_transcript
+from html_extractors import MainContentWatcher, extract_text
+from summarizer import SummaryResult
+
+logger = logging.getLogger(__name__)
+
+MAX_PAGE_BYTES = int(os.getenv("MAX_PAGE_BYTES", str(2 * 1024 * 1024)))
+DOWNLOAD_CHUNK_BYTES = 64 * 1024
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml", "text/plain", "application/xml", "text/xml")
+BINARY_SIGNATURES = (b"%PDF", b"\x89PNG", b"GIF8", b"\xff\xd8\xff", b"PK\x03\x04", b"\x1f\x8b", b"ID3", b"RIFF")
+_META_CHARSET = re.compile(rb'<meta[^>]+charset=["\']?([\w-]+)', re.IGNORECASE)
+
+
+def source_type(url):
+    return "youtube" if "youtube.com" in url or "youtu.be" in url else "web"
+
+
+#1. Web İçeriği Çekme
+"""
+http_client ile URL’ye istek gönderir (keep-alive, timeout ve tekrar deneme ortak katmandan gelir).
+
+Ana içerik html_extractors ile çıkarılır (varsayılan lxml; HTML_EXTRACTOR ile trafilatura, readability vb. seçilebilir).
+
+article, main, div.content gibi ana içerik blokları gerçek CSS/XPath seçicilerle aranır.
+
+Bulamazsa body içeriğinin ilk 5000 karakterini döndürür.
+
+Temizleme işlemi ile script, style gibi gereksiz elemanlar çıkarılır.
+
+Sayfa akışlı (stream) indirilir: en fazla MAX_PAGE_BYTES okunur, HTML olmayan içerik
+(Content-Type veya ilk baytlardan anlaşılan PDF, resim, arşiv vb.) hemen reddedilir ve
+yeterli ana içerik geldiği anda indirme durdurulur. Böylece istek başına bellek sınırlı kalır.
+"""
+def _is_binary(head):
+    return head.startswith(BINARY_SIGNATURES) or b"\x00" in head[:1024]
+
+
+def _detect_encoding(response, head):
+    if "charset=" in response.headers.get("Content-Type", ""):
+        return response.encoding
+    match = _META_CHARSET.search(head[:4096])
+    return match.group(1).decode("ascii") if match else "utf-8"
+
+
+def fetch_page(url, max_bytes=MAX_PAGE_BYTES):
+    try:
+        headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+            'Accept-Language': 'en-US,en;q=0.5'
+        }
+
+        with http_client.get(url, headers=headers, timeout=15, stream=True) as response:
+            response.raise_for_status()
+
+            content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+            if content_type and content_type not in HTML_CONTENT_TYPES:
+                raise ValueError(f"Unsupported content type: {content_type}")
+
+            chunks, size = [], 0
+            watcher = MainContentWatcher()
+            for chunk in response.iter_content(DOWNLOAD_CHUNK_BYTES):
+                if not chunks and _is_binary(chunk):
+                    raise ValueError("Response is not an HTML page")
+                chunk = chunk[:max_bytes - size]
+                chunks.append(chunk)
+                size += len(chunk)
+                if size >= max_bytes or watcher.feed(chunk):
+                    break
+
+        body = b"".join(chunks)
+        try:
+            return body.decode(_detect_encoding(response, body), errors="replace")
+        except LookupError:
+            return body.decode("utf-8", errors="replace")
+
+    except Exception as e:
+        raise RuntimeError(f"Could not fetch web content: {str(e)}")
+
+
+def parse_page(html, backend=None):
+    try:
+        return Document(page_content=extract_text(html, backend))
+
+    except Exception as e:
+        raise RuntimeError(f"Could not fetch web content: {str(e)}")
+
+
+# Improved web content extractor
+def get_web_content(url):
+    return parse_page(fetch_page(url))
+
+
+#2. YouTube Transcript Çekme
+"""
+YouTube linkinden video_id çıkarılır (youtube_transcript.video_id).
+
+Transcript'in tamamı zamanlı segmentleriyle alınır; video ID ve dil başına diskte önbelleğe alınır
+(bkz. youtube_transcript.py). Artık 5000 karaktere kırpılmaz.
+
+Sadece transcript gerçekten yoksa (TranscriptUnavailable: altyazı kapalı, video yok vb.) başlık ve açıklama
+gibi fallback metadata çekilir; diğer hatalar "YouTube error" olarak iletilir.
+"""
+def get_youtube_metadata(video_url):
+    soup = BeautifulSoup(fetch_page(video_url), 'html.parser')
+    title = soup.find('meta', property='og:title')
+    description = soup.find('meta', property='og:description')
+    content = f"Title: {title['content'] if title else 'No title'}\n\nDescription: {description['content'] if description else 'No description'}"
+    return Document(page_content=content)
+
+
+def load_youtube(video_url):
+    """Return (Document, Transcript or None, transcript came from the disk cache)"""
+    try:
+        video_id = youtube_transcript.video_id(video_url)
+        try:
+            transcript, cached = youtube_transcript.get_transcript(video_id)
+        except youtube_transcript.TranscriptUnavailable as e:
+            logger.info("No transcript for %s, using the page metadata: %s", video_id, type(e).__name__)
+            return get_youtube_metadata(video_url), None, False
+        metadata = {"video_id": video_id, "language": transcript.language, "duration": transcript.duration}
+        return Document(page_content=transcript.text, metadata=metadata), transcript, cached
+
+    except Exception as e:
+        raise RuntimeError(f"YouTube error: {str(e)}")
+
+
+# YouTube transcript fetcher
+def get_youtube_transcript(video_url):
+    return load_youtube(video_url)[0]
+
+
+#3. Tek Seferlik Çıkarım
+"""
+Önbellekte varsa içerik tekrar indirilmez. YouTube transcript'leri kendi disk önbelleğini kullanır; zamanlı
+segmentler result.transcript'te taşınır ve özetleyici onları zaman pencereleri halinde tüketir.
+
+Çekme (fetch) ve ayrıştırma (parse) süreleri ayrı ayrı ölçülür.
+"""
+def load_document(url, cache=None):
+    """Fetch and extract `url` once, returning a SummaryResult without a summary yet"""
+    result = SummaryResult(url=url, source_type=source_type(url))
+
+    if result.source_type == "youtube":
+        start = time.perf_counter()
+        result.document, result.transcript, result.document_cached = load_youtube(url)
+        result.timings.update(fetch=time.perf_counter() - start, parse=0.0)
+        return result
+
+    cached_content = cache.get_document(url) if cache else None
+    if cached_content is not None:
+        result.document = Document(page_content=cached_content)
+        result.document_cached = True
+        result.timings.update(fetch=0.0, parse=0.0)
+        return result
+
+    start = time.perf_counter()
+    html = fetch_page(url)
+    fetched = time.perf_counter()
+    result.document = parse_page(html)
+    result.timings.update(fetch=fetched - start, parse=time.perf_counter() - fetched)
+
+    if cache and result.document.page_content.strip():
+        cache.put_document(url, result.document.page_content)
+    return result
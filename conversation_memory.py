@@ -0,0 +1,141 @@
+"""
+Arama agent'ı için konuşma hafızası
+
+app.py her turda tüm sohbeti birleştirip agent'a veriyordu; ReAct'in her adımı bu metni prompt'ta
+taşıdığından oturum uzadıkça token maliyeti ve gecikme karesel büyüyordu.
+
+ConversationMemory agent girdisini üç parçadan kurar:
+    - kayan pencere (window): son birkaç tur olduğu gibi
+    - özet: pencereden düşen turlar toplu halde (FOLD_BATCH) LLM ile kısa bir özete sıkıştırılır
+      (LLM verilmezse her turun ilk cümlesinden oluşan basit bir özet tutulur); LLM kelime sınırına
+      uymasa da özet her katlamadan sonra SUMMARY_MAX_TOKENS token'a kırpılır
+    - geri getirme (retrieval): eski turlardan sadece yeni soruyla kelime örtüşmesi (IDF ağırlıklı)
+      en yüksek olan birkaçı eklenir
+
+Her turda agent girdisinin token sayısı ve tüm geçmiş gönderilseydi tutacak token sayısı kaydedilir
+(last_prompt_tokens / last_full_tokens), böylece kazanç doğrulanabilir.
+"""
+import logging
+import math
+import os
+import re
+from collections import Counter
+
+from chunker import chunk_text, count_tokens
+
+WINDOW_TURNS = int(os.getenv("SEARCH_MEMORY_WINDOW", "3"))
+FOLD_BATCH = int(os.getenv("SEARCH_MEMORY_FOLD_BATCH", "2"))
+RETRIEVE_K = int(os.getenv("SEARCH_MEMORY_RETRIEVE", "2"))
+SUMMARY_MAX_TOKENS = 300
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"\w{3,}")
+
+
+def _terms(text):
+    return Counter(word.lower() for word in _WORD.findall(text))
+
+
+def _format_turn(turn):
+    user, assistant = turn
+    return f"user: {user}\nassistant: {assistant}"
+
+
+def _first_sentence(text, max_chars=200):
+    sentence = re.split(r"(?<=[.!?])\s", text.strip(), maxsplit=1)[0]
+    return sentence[:max_chars]
+
+
+def cap_summary(summary, max_tokens=SUMMARY_MAX_TOKENS):
+    """Fit the summary into max_tokens: drop the oldest lines, then cut at a sentence boundary"""
+    lines = summary.split("\n")
+    while len(lines) > 1 and count_tokens("\n".join(lines)) > max_tokens:
+        lines.pop(0)
+    summary = "\n".join(lines)
+    if count_tokens(summary) > max_tokens:
+        summary = chunk_text(summary, max_tokens)[0]
+    return summary
+
+
+def extractive_summary(summary, turns):
+    """Cheap fallback: keep the first sentence of each folded question and answer"""
+    lines = [summary] if summary else []
+    lines += [f"- {_first_sentence(user)} -> {_first_sentence(assistant)}" for user, assistant in turns]
+    return cap_summary("\n".join(lines))
+
+
+def llm_summarizer(llm):
+    """Summarize function that folds turns into the running summary with a chat model"""
+    def summarize(summary, turns):
+        transcript = "\n".join(_format_turn(turn) for turn in turns)
+        prompt = (
+            "Update the conversation summary with the new turns. Keep it under "
+            f"{SUMMARY_MAX_TOKENS // 2} words and keep names, facts and open questions.\n\n"
+            f"Current summary:\n{summary or '(empty)'}\n\nNew turns:\n{transcript}\n\nUpdated summary:"
+        )
+        try:
+            response = llm.invoke(prompt)
+        except Exception as e:
+            logger.warning("Summary failed, using extractive fallback: %s", e)
+            return extractive_summary(summary, turns)
+        return getattr(response, "content", response).strip()
+
+    return summarize
+
+
+class ConversationMemory:
+    """Rolling window + running summary + retrieval of relevant older turns"""
+
+    def __init__(self, summarize=None, window_turns=WINDOW_TURNS, fold_batch=FOLD_BATCH, retrieve_k=RETRIEVE_K):
+        self.summarize = summarize or extractive_summary
+        self.window_turns = window_turns
+        self.fold_batch = max(fold_batch, 1)
+        self.retrieve_k = retrieve_k
+        self.recent = []    # (user, assistant) turns sent verbatim
+        self.archive = []   # folded turns, searchable by relevance
+        self.summary = ""
+        self.full_tokens = 0
+        self.last_prompt_tokens = 0
+        self.last_full_tokens = 0
+
+    def add_turn(self, user, assistant):
+        self.recent.append((user, assistant))
+        self.full_tokens += count_tokens(_format_turn((user, assistant)))
+        if len(self.recent) >= self.window_turns + self.fold_batch:
+            folded, self.recent = self.recent[:self.fold_batch], self.recent[self.fold_batch:]
+            # The model may ignore the word limit in its prompt; never let the summary grow past the budget
+            self.summary = cap_summary(self.summarize(self.summary, folded))
+            self.archive.extend(folded)
+
+    def relevant_turns(self, question):
+        """Archived turns sharing the most (IDF-weighted) words with the question"""
+        if not self.archive or self.retrieve_k <= 0:
+            return []
+        query = _terms(question)
+        documents = [_terms(_format_turn(turn)) for turn in self.archive]
+        frequency = Counter(term for document in documents for term in document)
+        scored = []
+        for index, document in enumerate(documents):
+            score = sum(math.log(len(documents) / frequency[term]) for term in query if term in document)
+            if score > 0:
+                scored.append((score, index))
+        best = sorted(scored, reverse=True)[:self.retrieve_k]
+        return [self.archive[index] for _, index in sorted(best, key=lambda item: item[1])]
+
+    def build_input(self, question):
+        """Agent input for a new question; records prompt vs. full-history token counts"""
+        parts = []
+        if self.summary:
+            parts.append(f"Conversation summary:\n{self.summary}")
+        relevant = self.relevant_turns(question)
+        if relevant:
+            parts.append("Relevant earlier turns:\n" + "\n".join(_format_turn(turn) for turn in relevant))
+        if self.recent:
+            parts.append("Recent turns:\n" + "\n".join(_format_turn(turn) for turn in self.recent))
+        parts.append(f"user: {question}")
+        text = "\n\n".join(parts)
+
+        self.last_prompt_tokens = count_tokens(text)
+        self.last_full_tokens = self.full_tokens + count_tokens(f"user: {question}")
+        return text
@@ -0,0 +1,115 @@
+"""
+Veritabanı bağlantı havuzları (connection pooling)
+
+configure_db SQLite motorunu her checkout'ta yeni bir sqlite3.connect(...mode=ro) açan bir creator ile,
+MySQL motorunu ise varsayılan havuz ayarlarıyla kuruyordu. "sqlite:///" adresi SQLAlchemy'ye bellek içi
+veritabanı gibi göründüğü için SingletonThreadPool seçiliyordu, yani her thread kendi bağlantısını açıyordu.
+
+Burada her backend için açık bir havuz stratejisi var:
+    SQLite  salt okunur (mode=ro), thread'ler arasında paylaşılan sabit boyutlu QueuePool.
+            Bağlantılar check_same_thread=False ile açılır ve bir kez ayarlanır:
+            mmap_size, cache_size, temp_store, query_only.
+            SQLITE_IMMUTABLE=1 dosyanın hiç değişmeyeceğini söyler (kilit yok, ama değişiklikler görünmez).
+    MySQL   boyutlu QueuePool; pool_pre_ping ile ölü bağlantılar checkout'ta elenir,
+            pool_recycle ile sunucunun wait_timeout'undan önce yenilenir.
+
+Havuz metrikleri (pool_stats):
+    checkouts            toplam bağlantı alma sayısı
+    hits / misses        mevcut bağlantı kullanıldı mı, yoksa yeni mi açıldı
+    wait_seconds         havuzdan bağlantı beklerken geçen toplam süre (max_wait_seconds ile birlikte)
+    timeouts             bekleme zaman aşımı sayısı
+    checked_out          şu an kullanımda olan bağlantı sayısı
+"""
+import os
+import sqlite3
+import threading
+import time
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import URL
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+from sqlalchemy.pool import QueuePool
+
+SQLITE_POOL_SIZE = int(os.getenv("SQLITE_POOL_SIZE", "8"))
+SQLITE_MMAP_BYTES = int(os.getenv("SQLITE_MMAP_BYTES", str(256 * 1024 * 1024)))
+SQLITE_CACHE_KB = int(os.getenv("SQLITE_CACHE_KB", str(64 * 1024)))
+SQLITE_IMMUTABLE = os.getenv("SQLITE_IMMUTABLE", "0") == "1"
+
+MYSQL_POOL_SIZE = int(os.getenv("MYSQL_POOL_SIZE", "5"))
+MYSQL_MAX_OVERFLOW = int(os.getenv("MYSQL_MAX_OVERFLOW", "10"))
+MYSQL_POOL_RECYCLE = int(os.getenv("MYSQL_POOL_RECYCLE", "1800"))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+
+
+class MeteredQueuePool(QueuePool):
+    """QueuePool that records how long callers wait for a connection"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = {"checkouts": 0, "misses": 0, "wait_seconds": 0.0, "max_wait_seconds": 0.0, "timeouts": 0}
+        self.metrics_lock = threading.Lock()
+        if "_dispatch" not in kwargs:
+            # A recreated pool inherits the listener of the pool it replaces (see recreate)
+            event.listen(self, "connect", self._on_connect)
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        with self.metrics_lock:
+            self.metrics["misses"] += 1
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeout:
+            with self.metrics_lock:
+                self.metrics["timeouts"] += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            with self.metrics_lock:
+                self.metrics["checkouts"] += 1
+                self.metrics["wait_seconds"] += waited
+                self.metrics["max_wait_seconds"] = max(self.metrics["max_wait_seconds"], waited)
+
+    def recreate(self):
+        # Keep counting across pool recreation (e.g. after engine.dispose())
+        pool = super().recreate()
+        pool.metrics, pool.metrics_lock = self.metrics, self.metrics_lock
+        return pool
+
+
+def sqlite_engine(path, pool_size=SQLITE_POOL_SIZE, immutable=SQLITE_IMMUTABLE):
+    """Engine over a pool of shared read-only connections to the SQLite file at `path`"""
+    uri = f"file:{path}?mode=ro" + ("&immutable=1" if immutable else "")
+
+    def connect():
+        connection = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        connection.execute(f"PRAGMA mmap_size={SQLITE_MMAP_BYTES}")
+        connection.execute(f"PRAGMA cache_size={-SQLITE_CACHE_KB}")
+        connection.execute("PRAGMA temp_store=MEMORY")
+        connection.execute("PRAGMA query_only=1")
+        return connection
+
+    return create_engine("sqlite://", creator=connect, poolclass=MeteredQueuePool,
+                         pool_size=pool_size, max_overflow=0, pool_timeout=POOL_TIMEOUT)
+
+
+def mysql_engine(host, user, password, database):
+    """Engine with a sized, pre-pinged and recycled QueuePool for MySQL"""
+    url = URL.create("mysql+mysqlconnector", username=user, password=password, host=host, database=database)
+    return create_engine(url, poolclass=MeteredQueuePool, pool_size=MYSQL_POOL_SIZE,
+                         max_overflow=MYSQL_MAX_OVERFLOW, pool_timeout=POOL_TIMEOUT,
+                         pool_pre_ping=True, pool_recycle=MYSQL_POOL_RECYCLE)
+
+
+def pool_stats(engine):
+    pool = engine.pool
+    metrics = getattr(pool, "metrics", None)
+    if metrics is None:
+        return {}
+    with pool.metrics_lock:
+        stats = dict(metrics)
+    stats["hits"] = stats["checkouts"] - stats["misses"] - stats["timeouts"]
+    stats["checked_out"] = pool.checkedout()
+    stats["size"] = pool.size()
+    return stats
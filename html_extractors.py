@@ -0,0 +1,176 @@
+"""
+HTML metin çıkarıcıları (extractor backend'leri)
+
+get_web_content'in kullandığı ana içerik çıkarma adımı burada, değiştirilebilir backend'ler halinde tutulur:
+
+    bs4          BeautifulSoup + saf Python 'html.parser' (eski davranış)
+    bs4-lxml     BeautifulSoup + lxml parser
+    lxml         doğrudan lxml.html + XPath (varsayılan, en hızlısı)
+    selectolax   selectolax Lexbor parser (requirements.txt içinde değil, opsiyonel)
+    trafilatura  trafilatura.extract (boilerplate temizliği en iyi olan)
+    readability  readability-lxml
+
+Backend HTML_EXTRACTOR ortam değişkeni ile seçilir.
+
+MainContentWatcher indirme sırasında HTML'i parça parça ayrıştırır; yeterli ana içerik
+kapandığında indirmenin erken durdurulabilmesini sağlar.
+
+Not: Eski kod soup.find('div.content') çağırıyordu; find CSS seçici anlamaz, bu yüzden hiç eşleşmiyordu.
+Burada seçiciler gerçekten CSS (bs4.select_one / selectolax.css_first) veya XPath olarak uygulanır.
+"""
+import os
+from functools import partial
+
+import lxml.etree
+import lxml.html
+from bs4 import BeautifulSoup
+
+REMOVE_TAGS = ['script', 'style', 'nav', 'footer', 'iframe', 'noscript']
+MAIN_SELECTORS = ['article', 'main', 'div.content', 'div.post-content']
+MIN_MAIN_CHARS = 200
+FALLBACK_CHARS = 5000
+
+
+def _selector_to_xpath(selector):
+    """Translate the simple 'tag' / 'tag.class' selectors above to XPath"""
+    tag, _, css_class = selector.partition('.')
+    if not css_class:
+        return f"//{tag}"
+    return f"//{tag}[contains(concat(' ', normalize-space(@class), ' '), ' {css_class} ')]"
+
+
+REMOVE_XPATH = "|".join(f"//{tag}" for tag in REMOVE_TAGS) + "|//comment()"
+MAIN_XPATHS = [_selector_to_xpath(selector) for selector in MAIN_SELECTORS]
+
+
+def _pick(candidates, fallback):
+    """Return the first main-content candidate long enough, else the truncated fallback"""
+    for get_text in candidates:
+        text = get_text()
+        if text is not None and len(text) > MIN_MAIN_CHARS:
+            return text
+    return fallback()[:FALLBACK_CHARS]  # Limit content size
+
+
+class MainContentWatcher:
+    """Incrementally parse a download and report once a main-content block has closed"""
+
+    def __init__(self, min_chars=MIN_MAIN_CHARS):
+        self.min_chars = min_chars
+        self.targets = [selector.partition('.')[::2] for selector in MAIN_SELECTORS]
+        tags = sorted({tag for tag, _ in self.targets})
+        self.parser = lxml.etree.HTMLPullParser(events=("end",), tag=tags)
+
+    def _is_main(self, element):
+        classes = (element.get('class') or '').split()
+        return any(element.tag == tag and (not css_class or css_class in classes)
+                   for tag, css_class in self.targets)
+
+    def feed(self, data):
+        """Feed the next downloaded bytes, returning True when enough content has arrived"""
+        self.parser.feed(data)
+        for _, element in self.parser.read_events():
+            if self._is_main(element) and len(_lxml_text(element)) > self.min_chars:
+                return True
+        return False
+
+
+def extract_bs4(html, parser='html.parser'):
+    soup = BeautifulSoup(html, parser)
+
+    # Remove unwanted elements
+    for element in soup(REMOVE_TAGS):
+        element.decompose()
+
+    def main(selector):
+        content = soup.select_one(selector)
+        return content.get_text(separator='\n', strip=True) if content else None
+
+    return _pick([partial(main, selector) for selector in MAIN_SELECTORS],
+                 lambda: soup.get_text(separator='\n', strip=True))
+
+
+def _lxml_text(element):
+    # Same shape as BeautifulSoup's get_text(separator='\n', strip=True)
+    return "\n".join(part.strip() for part in element.itertext() if part.strip())
+
+
+def extract_lxml(html):
+    if not html.strip():
+        return ""
+    if isinstance(html, str):
+        # lxml refuses str input that carries an XML encoding declaration
+        html = html.encode('utf-8')
+    tree = lxml.html.fromstring(html)
+
+    for element in tree.xpath(REMOVE_XPATH):
+        element.drop_tree()
+
+    def main(xpath):
+        found = tree.xpath(xpath)
+        return _lxml_text(found[0]) if found else None
+
+    return _pick([partial(main, xpath) for xpath in MAIN_XPATHS], lambda: _lxml_text(tree))
+
+
+def extract_selectolax(html):
+    from selectolax.lexbor import LexborHTMLParser
+
+    tree = LexborHTMLParser(html)
+    tree.strip_tags(REMOVE_TAGS)
+
+    def main(selector):
+        node = tree.css_first(selector)
+        return node.text(separator='\n', strip=True) if node else None
+
+    root = tree.body or tree.root
+    return _pick([partial(main, selector) for selector in MAIN_SELECTORS],
+                 lambda: root.text(separator='\n', strip=True) if root else "")
+
+
+def extract_trafilatura(html):
+    import trafilatura
+
+    text = trafilatura.extract(html, include_comments=False, include_tables=True)
+    return text if text else extract_lxml(html)
+
+
+def extract_readability(html):
+    from readability import Document as ReadabilityDocument
+
+    summary = ReadabilityDocument(html).summary(html_partial=True)
+    text = _lxml_text(lxml.html.fromstring(summary)) if summary.strip() else ""
+    return text if len(text) > MIN_MAIN_CHARS else extract_lxml(html)
+
+
+EXTRACTORS = {
+    "bs4": extract_bs4,
+    "bs4-lxml": partial(extract_bs4, parser='lxml'),
+    "lxml": extract_lxml,
+    "selectolax": extract_selectolax,
+    "trafilatura": extract_trafilatura,
+    "readability": extract_readability,
+}
+DEFAULT_EXTRACTOR = os.getenv("HTML_EXTRACTOR", "lxml")
+
+
+def extract_text(html, backend=None):
+    """Extract the main text of `html` with the chosen backend"""
+    backend = backend or DEFAULT_EXTRACTOR
+    if backend not in EXTRACTORS:
+        raise ValueError(f"Unknown HTML extractor '{backend}', choose one of {sorted(EXTRACTORS)}")
+    return EXTRACTORS[backend](html)
+
+
+def available_extractors():
+    """Backends whose optional dependency is importable here"""
+    modules = {"selectolax": "selectolax.lexbor", "trafilatura": "trafilatura", "readability": "readability"}
+    available = []
+    for name in EXTRACTORS:
+        try:
+            if name in modules:
+                __import__(modules[name])
+            available.append(name)
+        except ImportError:
+            pass
+    return available
@@ -0,0 +1,197 @@
+"""
+Ortak HTTP istemcisi (transport katmanı)
+
+Tüm dış HTTP çağrıları (Ollama, web sayfaları, YouTube) bu modül üzerinden yapılır.
+
+Tek bir requests.Session ve bağlantı havuzu (connection pooling) kullanılır; keep-alive sayesinde
+her istekte yeniden TCP/TLS kurulumu yapılmaz.
+
+Host başına eşzamanlı istek sayısı sınırlanır (HTTP_MAX_PER_HOST).
+
+Varsayılan timeout uygulanır, geçici hatalarda jitter'lı exponential backoff ile tekrar denenir.
+GET/HEAD/OPTIONS bağlantı hatası, timeout ve RETRY_STATUSES durumlarında tekrar denenir; POST gibi
+idempotent olmayan metotlar sadece bağlantı hiç kurulamadığında (istek gönderilmediği kesin olduğunda).
+
+stats() ile bağlantı yeniden kullanımı (connection reuse) ve tekrar deneme metrikleri okunabilir. Yeniden
+kullanım her istekte ölçülür: havuzdan canlı bir bağlantı alındıysa "reused", yeni TCP/TLS bağlantısı
+açılacaksa "opened" sayılır.
+"""
+import os
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+
+MAX_PER_HOST = int(os.getenv("HTTP_MAX_PER_HOST", "8"))
+DEFAULT_TIMEOUT = (5, 30)  # (connect, read) seconds
+DEFAULT_RETRIES = 2
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 8.0
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+_session = None
+_session_lock = threading.Lock()
+
+_host_slots = {}
+_host_slots_lock = threading.Lock()
+
+_metrics = {"requests": 0, "retries": 0, "failures": 0, "slot_wait_seconds": 0.0,
+            "connections_opened": 0, "connections_reused": 0}
+_metrics_lock = threading.Lock()
+
+
+class _CountingPool:
+    """Counts, per checkout, whether the request rides on a live pooled connection or opens a new one"""
+
+    def _get_conn(self, timeout=None):
+        conn = super()._get_conn(timeout)
+        # urllib3 closes dropped connections before returning them, so no socket means a fresh connect
+        _count("connections_reused" if getattr(conn, "sock", None) is not None else "connections_opened")
+        return conn
+
+
+class _CountingHTTPPool(_CountingPool, HTTPConnectionPool):
+    pass
+
+
+class _CountingHTTPSPool(_CountingPool, HTTPSConnectionPool):
+    pass
+
+
+class _CountingAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {"http": _CountingHTTPPool, "https": _CountingHTTPSPool}
+
+
+def get_session():
+    """Return the process-wide pooled session"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = _CountingAdapter(pool_connections=16, pool_maxsize=MAX_PER_HOST, max_retries=0)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _session = session
+    return _session
+
+
+def _host_slot(url):
+    host = urlsplit(url).netloc
+    with _host_slots_lock:
+        slot = _host_slots.get(host)
+        if slot is None:
+            slot = _host_slots[host] = threading.BoundedSemaphore(MAX_PER_HOST)
+        return slot
+
+
+def _count(key, amount=1):
+    with _metrics_lock:
+        _metrics[key] += amount
+
+
+def _backoff(attempt, response=None):
+    if response is not None and response.headers.get("Retry-After", "").isdigit():
+        return min(float(response.headers["Retry-After"]), BACKOFF_MAX)
+    # "Full jitter": spreads retries from many clients instead of synchronising them
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+def _release_on_close(response, slot):
+    """Keep the host slot busy until a streamed response is closed"""
+    original_close = response.close
+    released = threading.Event()
+
+    def close():
+        try:
+            original_close()
+        finally:
+            if not released.is_set():
+                released.set()
+                slot.release()
+
+    response.close = close
+    return response
+
+
+def _not_sent(error):
+    """True when the connection was never established, so even a POST can be sent again safely"""
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(reason, (NewConnectionError, ConnectTimeoutError))
+
+
+def request(method, url, timeout=DEFAULT_TIMEOUT, retries=None, **kwargs):
+    """Send a request through the shared pool with host limits and retries.
+
+    IDEMPOTENT_METHODS are retried on connection errors, timeouts and RETRY_STATUSES; other methods
+    (POST) only when the connection could not be established, so the request never reached the server.
+    """
+    method = method.upper()
+    if retries is None:
+        retries = DEFAULT_RETRIES
+    session = get_session()
+    slot = _host_slot(url)
+
+    attempt = 0
+    while True:
+        wait_start = time.perf_counter()
+        slot.acquire()
+        _count("slot_wait_seconds", time.perf_counter() - wait_start)
+        _count("requests")
+        try:
+            response = session.request(method, url, timeout=timeout, **kwargs)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            slot.release()
+            retryable = method in IDEMPOTENT_METHODS or _not_sent(e)
+            if attempt >= retries or not retryable:
+                _count("failures")
+                raise
+            _count("retries")
+            time.sleep(_backoff(attempt))
+            attempt += 1
+            continue
+        except Exception:
+            slot.release()
+            _count("failures")
+            raise
+
+        if response.status_code in RETRY_STATUSES and method in IDEMPOTENT_METHODS and attempt < retries:
+            response.close()
+            slot.release()
+            _count("retries")
+            time.sleep(_backoff(attempt, response))
+            attempt += 1
+            continue
+
+        if kwargs.get("stream"):
+            return _release_on_close(response, slot)
+        slot.release()
+        return response
+
+
+def get(url, **kwargs):
+    return request("GET", url, **kwargs)
+
+
+def post(url, **kwargs):
+    return request("POST", url, **kwargs)
+
+
+def stats():
+    """Snapshot of request, retry and connection-reuse counters"""
+    with _metrics_lock:
+        snapshot = dict(_metrics)
+
+    checkouts = snapshot["connections_opened"] + snapshot["connections_reused"]
+    snapshot["connection_reuse_ratio"] = snapshot["connections_reused"] / checkouts if checkouts else None
+    return snapshot
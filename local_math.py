@@ -0,0 +1,307 @@
+"""
+Yerel, deterministik matematik değerlendirici (LLMMathChain önünde hızlı yol)
+
+safe_calculator her ifadeyi LLMMathChain'e gönderiyordu; "2+2*3" gibi bir ifadeyi numexpr koduna çevirmek için
+bile Gemma2 modeline bir LLM turu harcanıyordu.
+
+evaluate() ifadeyi yerelde çözmeye çalışır:
+    - aritmetik: + - * / ^, % (ardından sayı gelirse mod, gelmezse yüzde), faktöriyel ("5!", "(2+1)!"), parantez, "15% of 240", "plus / minus / times / divided by" gibi kelimeler,
+      sqrt, sin, cos, log, exp, abs ... -> numexpr (mikrosaniyeler)
+    - birim dönüşümü: "5 km in miles", "100 F to C", "3 hours in minutes"
+    - cebir (sympy kuruluysa, opsiyonel): "solve x^2 - 4 = 0", "simplify ...", "expand ...", "factor ...",
+      "derivative of ...", "integrate ..."
+
+Çözemediği her şey için None döner; gerçek sözel problemler (word problems) LLM zincirine gider.
+Girdi beyaz listeli karakter ve fonksiyon adlarıyla sınırlandığı için numexpr/sympy'ye serbest kod ulaşmaz.
+
+Büyüklük sınırları: numexpr "9^9^9" gibi üs zincirlerini Python tam sayılarıyla sabit katlamaya (constant
+folding) çalışır ve dakikalarca takılır. Üs zincirleri, |üs| > MAX_EXPONENT veya sonucu ~10^MAX_MAGNITUDE'u
+aşacak üsler numexpr'e hiç gönderilmez. sympy'ye sadece kısa (SYMBOLIC_MAX_CHARS), üsleri küçük
+(SYMBOLIC_MAX_EXPONENT) ifadeler gider ve işlem SYMBOLIC_SECONDS içinde bitmezse cevap beklenmez.
+Bu durumların hepsinde None döner, soru LLM zincirine / agent'a gider.
+
+stats() hızlı yolun ne sıklıkla devreye girdiğini verir.
+"""
+import ast
+import math
+import re
+import threading
+
+import numexpr
+
+try:
+    import sympy
+except ImportError:
+    sympy = None
+
+FUNCTIONS = {"sqrt", "sin", "cos", "tan", "arcsin", "arccos", "arctan", "sinh", "cosh", "tanh",
+             "log", "log10", "log1p", "exp", "expm1", "abs"}
+CONSTANTS = {"pi": math.pi, "e": math.e}
+MAX_EXPONENT = 1000
+MAX_MAGNITUDE = 308  # decimal digits; beyond this a float overflows anyway
+SYMBOLIC_MAX_CHARS = 120
+SYMBOLIC_MAX_EXPONENT = 25
+SYMBOLIC_SECONDS = 2.0
+
+_PREFIX = re.compile(
+    r"^\s*(what\s+is|what's|calculate|compute|evaluate|solve|find|how\s+much\s+is)\s*(the\s+value\s+of\s*)?:?\s*",
+    re.IGNORECASE)
+_WORDS = [
+    (r"\bdivided\s+by\b", "/"), (r"\bover\b", "/"), (r"\bmultiplied\s+by\b", "*"), (r"\btimes\b", "*"),
+    (r"\bplus\b", "+"), (r"\bminus\b", "-"), (r"\bto\s+the\s+power\s+of\b", "**"),
+    (r"\bsquare\s+root\s+of\b", "sqrt"), (r"\bsquared\b", "**2"), (r"\bcubed\b", "**3"),
+]
+_PERCENT_OF = re.compile(r"(\d+(?:\.\d+)?)\s*%\s*of\b", re.IGNORECASE)
+# "%" with an operand after it stays modulo ("10 % 3"); otherwise it is a percentage ("20% + 5")
+_PERCENT = re.compile(r"(\d+(?:\.\d+)?)\s*%(?!\s*[\w(.])")
+_THOUSANDS = re.compile(r"(?<=\d),(?=\d{3}\b)")
+_IDENTIFIER = re.compile(r"[a-z_]\w*", re.IGNORECASE)
+_FACTORIAL = re.compile(r"(\d+(?:\.\d+)?|\([^()]*\))\s*!")
+_ARITHMETIC = re.compile(r"^[\d\s.+\-*/%()a-z_,]*$", re.IGNORECASE)
+
+_UNIT = re.compile(r"^\s*(-?\d+(?:\.\d+)?)\s*([a-z°]+)\s+(?:in|to|into)\s+([a-z°]+)\s*\??\s*$", re.IGNORECASE)
+# unit -> (dimension, factor to the SI base unit)
+UNITS = {
+    "mm": ("length", 0.001), "cm": ("length", 0.01), "m": ("length", 1.0), "km": ("length", 1000.0),
+    "in": ("length", 0.0254), "inch": ("length", 0.0254), "inches": ("length", 0.0254),
+    "ft": ("length", 0.3048), "foot": ("length", 0.3048), "feet": ("length", 0.3048),
+    "yd": ("length", 0.9144), "yard": ("length", 0.9144), "yards": ("length", 0.9144),
+    "mi": ("length", 1609.344), "mile": ("length", 1609.344), "miles": ("length", 1609.344),
+    "meter": ("length", 1.0), "meters": ("length", 1.0), "kilometer": ("length", 1000.0),
+    "kilometers": ("length", 1000.0),
+    "mg": ("mass", 1e-6), "g": ("mass", 0.001), "gram": ("mass", 0.001), "grams": ("mass", 0.001),
+    "kg": ("mass", 1.0), "kilogram": ("mass", 1.0), "kilograms": ("mass", 1.0),
+    "lb": ("mass", 0.45359237), "lbs": ("mass", 0.45359237), "pound": ("mass", 0.45359237),
+    "pounds": ("mass", 0.45359237), "oz": ("mass", 0.028349523125), "ounce": ("mass", 0.028349523125),
+    "ounces": ("mass", 0.028349523125),
+    "s": ("time", 1.0), "sec": ("time", 1.0), "second": ("time", 1.0), "seconds": ("time", 1.0),
+    "min": ("time", 60.0), "minute": ("time", 60.0), "minutes": ("time", 60.0),
+    "h": ("time", 3600.0), "hour": ("time", 3600.0), "hours": ("time", 3600.0),
+    "day": ("time", 86400.0), "days": ("time", 86400.0), "week": ("time", 604800.0), "weeks": ("time", 604800.0),
+    "l": ("volume", 1.0), "liter": ("volume", 1.0), "liters": ("volume", 1.0), "ml": ("volume", 0.001),
+    "gallon": ("volume", 3.785411784), "gallons": ("volume", 3.785411784),
+}
+TEMPERATURES = {"c": "C", "celsius": "C", "°c": "C", "f": "F", "fahrenheit": "F", "°f": "F",
+                "k": "K", "kelvin": "K"}
+
+_SYMBOLIC = re.compile(r"^\s*(solve|simplify|expand|factor|derivative\s+of|differentiate|integrate|integral\s+of)\s+"
+                       r"(.+?)(?:\s+for\s+([a-z]))?\s*\??\s*$", re.IGNORECASE)
+_SYMPY_SAFE = re.compile(r"^[\d\s.+\-*/^()a-z=,]*$", re.IGNORECASE)
+_SYMPY_EXPONENT = re.compile(r"\*\*\s*\(?\s*-?(\d+(?:\.\d+)?)")
+_SYMPY_POWER_CHAIN = re.compile(r"\*\*\s*\(?[\w.\s]+\)?\s*\*\*")
+
+_stats = {"local": 0, "llm": 0}
+_stats_lock = threading.Lock()
+
+
+def _format(value):
+    if isinstance(value, float):
+        if value.is_integer() and abs(value) < 1e15:
+            return str(int(value))
+        return f"{value:.10g}"
+    return str(value)
+
+
+def _strip_end(text):
+    """Drop trailing punctuation, keeping a factorial "!" after a digit or ")" """
+    while text:
+        before = text[:-1].rstrip()[-1:]
+        if text[-1] in "?. \t\n" or (text[-1] == "!" and not (before.isdigit() or before == ")")):
+            text = text[:-1]
+        else:
+            return text
+    return text
+
+
+def normalize(expression):
+    """Turn a natural arithmetic phrase into a numexpr expression (no validation)"""
+    text = _strip_end(_PREFIX.sub("", expression.strip()))
+    text = text.replace("×", "*").replace("÷", "/").replace("−", "-").replace("^", "**")
+    text = re.sub(r"(?<=\d)\s*x\s*(?=[\d(])", "*", text)  # "3 x 4"
+    text = _THOUSANDS.sub("", text)
+    for pattern, replacement in _WORDS:
+        text = re.sub(pattern, replacement, text, flags=re.IGNORECASE)
+    text = _PERCENT_OF.sub(r"(\1/100)*", text)
+    text = _PERCENT.sub(r"(\1/100)", text)
+    return text.strip()
+
+
+def _expand_factorials(text):
+    """Replace "5!" and "(2+1)!" with their values; None if an operand is not a small non-negative integer"""
+    while True:
+        match = _FACTORIAL.search(text)
+        if not match:
+            return text
+        operand = match.group(1)
+        if operand.startswith("(") and text[:match.start()].rstrip()[-1:].isalpha():
+            return None  # "sqrt(16)!": leave the precedence question to the LLM chain
+        value = evaluate_arithmetic(operand[1:-1]) if operand.startswith("(") else operand
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            return None
+        if not number.is_integer() or not 0 <= number <= 170:
+            return None  # beyond 170! a float overflows
+        result = math.factorial(int(number))
+        literal = str(result) if result < 2 ** 63 else repr(float(result))
+        text = text[:match.start()] + f"({literal})" + text[match.end():]
+
+
+def _value(node):
+    try:
+        return float(numexpr.evaluate(ast.unparse(node), local_dict=dict(CONSTANTS), global_dict={}).item())
+    except Exception:
+        return None
+
+
+def _powers_bounded(text):
+    """False for power chains and powers whose exponent or result is too large to fold quickly"""
+    try:
+        tree = ast.parse(text, mode="eval")
+    except (SyntaxError, ValueError):
+        return False
+    # Innermost powers first, so a base is only evaluated once its own powers passed the check
+    for node in reversed(list(ast.walk(tree))):
+        if not (isinstance(node, ast.BinOp) and isinstance(node.op, ast.Pow)):
+            continue
+        if any(isinstance(inner, ast.BinOp) and isinstance(inner.op, ast.Pow) for inner in ast.walk(node.right)):
+            return False  # "9**9**9"
+        exponent, base = _value(node.right), _value(node.left)
+        if exponent is None or base is None or abs(exponent) > MAX_EXPONENT:
+            return False
+        if abs(base) > 1 and exponent * math.log10(abs(base)) > MAX_MAGNITUDE:
+            return False
+    return True
+
+
+def evaluate_arithmetic(expression):
+    text = normalize(expression)
+    if "!" in text:
+        text = _expand_factorials(text)
+        if text is None:
+            return None
+    if not text or not _ARITHMETIC.match(text) or not re.search(r"\d", text):
+        return None
+    names = {name.lower() for name in _IDENTIFIER.findall(text)}
+    if not names <= FUNCTIONS | set(CONSTANTS):
+        return None
+    if "**" in text and not _powers_bounded(text.lower()):
+        return None
+    try:
+        value = numexpr.evaluate(text.lower(), local_dict=dict(CONSTANTS), global_dict={})
+    except ZeroDivisionError:
+        raise
+    except Exception:
+        return None
+    value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        if "/" in text:
+            raise ZeroDivisionError("division by zero")
+        return None  # overflow: let the LLM chain explain it
+    return _format(value)
+
+
+def convert_units(expression):
+    match = _UNIT.match(_PREFIX.sub("", expression))
+    if not match:
+        return None
+    value, source, target = float(match.group(1)), match.group(2).lower(), match.group(3).lower()
+    if source in TEMPERATURES and target in TEMPERATURES:
+        source, target = TEMPERATURES[source], TEMPERATURES[target]
+        celsius = {"C": value, "F": (value - 32) * 5 / 9, "K": value - 273.15}[source]
+        result = {"C": celsius, "F": celsius * 9 / 5 + 32, "K": celsius + 273.15}[target]
+        return f"{_format(round(result, 6))} {target}"
+    if source in UNITS and target in UNITS and UNITS[source][0] == UNITS[target][0]:
+        result = value * UNITS[source][1] / UNITS[target][1]
+        return f"{_format(round(result, 6))} {match.group(3)}"
+    return None
+
+
+def _with_timeout(function, seconds):
+    """function() or None if it does not finish in time (the worker thread is left to finish on its own)"""
+    result = []
+    worker = threading.Thread(target=lambda: result.append(function()), daemon=True)
+    worker.start()
+    worker.join(seconds)
+    return result[0] if result else None
+
+
+def solve_symbolic(expression):
+    if sympy is None:
+        return None
+    match = _SYMBOLIC.match(expression)
+    if not match or not _SYMPY_SAFE.match(match.group(2)) or len(match.group(2)) > SYMBOLIC_MAX_CHARS:
+        return None
+    operation, body, variable = match.group(1).lower(), match.group(2).replace("^", "**"), match.group(3)
+    # parse_expr already folds numeric powers, so large ones never reach it
+    if _SYMPY_POWER_CHAIN.search(body) or any(
+            float(exponent) > SYMBOLIC_MAX_EXPONENT for exponent in _SYMPY_EXPONENT.findall(body)):
+        return None
+    names = {name.lower() for name in _IDENTIFIER.findall(body)}
+    allowed = FUNCTIONS | set(CONSTANTS)
+    # Only known functions and single-letter variables reach sympy's parser
+    if any(name not in allowed and len(name) != 1 for name in names):
+        return None
+    return _with_timeout(lambda: _symbolic(operation, body, variable), SYMBOLIC_SECONDS)
+
+
+def _symbolic(operation, body, variable):
+    from sympy.parsing.sympy_parser import (implicit_multiplication_application, parse_expr,
+                                            standard_transformations)
+
+    transformations = standard_transformations + (implicit_multiplication_application,)
+    try:
+        if "=" in body:
+            left, right = body.split("=", 1)
+            expr = parse_expr(left, transformations=transformations) - parse_expr(right, transformations=transformations)
+        else:
+            expr = parse_expr(body, transformations=transformations)
+        symbols = sorted(expr.free_symbols, key=str)
+        symbol = sympy.Symbol(variable) if variable else (symbols[0] if symbols else None)
+        if operation == "solve":
+            return str(sympy.solve(expr, symbol)) if symbol is not None else None
+        if operation == "simplify":
+            return str(sympy.simplify(expr))
+        if operation == "expand":
+            return str(sympy.expand(expr))
+        if operation == "factor":
+            return str(sympy.factor(expr))
+        if symbol is None:
+            return None
+        if operation.startswith(("derivative", "differentiate")):
+            return str(sympy.diff(expr, symbol))
+        return str(sympy.integrate(expr, symbol)) + " + C"
+    except Exception:
+        return None
+
+
+def evaluate(expression, count=True):
+    """'Answer: ...' (LLMMathChain's output format) if the expression can be solved locally, else None.
+
+    count=False leaves the hit-rate statistics untouched (used by the intent router's probe).
+    """
+    for solver in (convert_units, solve_symbolic, evaluate_arithmetic):
+        try:
+            result = solver(expression)
+        except ZeroDivisionError:
+            if count:
+                record(local=True)
+            raise
+        if result is not None:
+            if count:
+                record(local=True)
+            return f"Answer: {result}"
+    if count:
+        record(local=False)
+    return None
+
+
+def record(local):
+    with _stats_lock:
+        _stats["local" if local else "llm"] += 1
+
+
+def stats():
+    with _stats_lock:
+        total = _stats["local"] + _stats["llm"]
+        return dict(_stats, hit_rate=_stats["local"] / total if total else 0.0)
@@ -20,6 +20,11 @@ from langchain_community.utilities import WikipediaAPIWrapper
 from langchain.agents.agent_types import AgentType
 from langchain.agents import Tool, initialize_agent
 from langchain.callbacks import StreamlitCallbackHandler
+import time
+import resources
+import local_math
+import math_router
+from agent_telemetry import describe, executor_limits, run_with_budget
 
 #2. SAYFA BAŞLIĞI VE GÖRÜNÜM
 # Uygulama başlığını ve tarayıcı sekmesinde görünecek başlığı ayarlar.
@@ -32,6 +37,7 @@ Yan panelden API anahtarı girişi alınır.
 st.stop(): API key girilmemişse uygulamayı durdurur.
 """
 groq_api_key = st.sidebar.text_input(label="Groq API Key", type="password")
+setup_start = time.perf_counter()
 
 if not groq_api_key:
     st.info("Please add your Groq Api Key to continue")
@@ -42,8 +48,12 @@ if not groq_api_key:
 Groq LLM’den Gemma2-9b-It modelini seçer.
 
 Artık bu LLM, soruları yanıtlamaya hazırdır.
+
+LLM, zincirler ve agent resources kayıt defteri üzerinden süreç başına bir kez kurulur;
+Streamlit'in her yeniden çalıştırmasında (rerun) tekrar oluşturulmaz, tüm oturumlar paylaşır.
 """
-llm = ChatGroq(model="Gemma2-9b-It", groq_api_key=groq_api_key)
+llm_key = resources.resource_key("llm", "groq", "Gemma2-9b-It", groq_api_key)
+llm = resources.get_llm("groq", "Gemma2-9b-It", groq_api_key)
 
 #5. WIKIPEDIA TOOL
 """
@@ -52,7 +62,7 @@ Wikipedia API wrapper’ı çalıştırılır.
 Tool: Wikipedia’dan bilgi çekme aracı haline getirilir.
 """
 # Initialize the tools
-wikipedia_wrapper = WikipediaAPIWrapper()
+wikipedia_wrapper = resources.get_or_create(("wikipedia_wrapper",), WikipediaAPIWrapper)
 wikipedia_tool = Tool(
     name="Wikipedia",
     func=wikipedia_wrapper.run,
@@ -101,17 +111,25 @@ LLM destekli matematiksel ifade çözücü zincir oluşturulur.
 
 Matematik işlemlerini try/except bloğu ile sararak "division by zero" gibi hataları yakalar.
 
+Önce local_math ile yerel hızlı yol denenir: aritmetik, birim dönüşümü ve (sympy varsa) cebir ifadeleri
+LLM'e gitmeden mikrosaniyeler içinde çözülür. Sadece gerçek sözel problemler LLMMathChain'e gider.
+
 Tool haline getirilir:
 """
 
 # Initialize the Math Tool with error handling
-math_chain = LLMMathChain.from_llm(llm=llm)
+math_chain = resources.get_or_create(("math_chain",) + llm_key, lambda: LLMMathChain.from_llm(llm=llm))
 
 def safe_calculator(expression):
     """Calculator with error handling for mathematical operations"""
     try:
-        result = math_chain.run(expression)
+        # Arithmetic, unit and algebra expressions never need the LLM round trip
+        result = local_math.evaluate(expression)
+        if result is None:
+            result = math_chain.run(expression)
         return result
+    except ZeroDivisionError:
+        return "Error: Division by zero is undefined in mathematics. Please try a different expression."
     except ValueError as e:
         if "division by zero" in str(e).lower():
             return "Error: Division by zero is undefined in mathematics. Please try a different expression."
@@ -148,10 +166,15 @@ prompt_template = PromptTemplate(
 Üç farklı Tool bağlanarak agent oluşturulur.
 
 ZERO_SHOT_REACT_DESCRIPTION: Agent, verilen açıklamaya göre doğru Tool’u kendisi seçer.
+
+executor_limits: iterasyon ve süre bütçesi (AGENT_MAX_ITERATIONS / AGENT_MAX_SECONDS, bkz. agent_telemetry.py).
 """
 
 # Combine all the tools into chain
-chain = LLMChain(llm=llm, prompt=prompt_template)  # Fixed typo: LLmChain -> LLMChain
+chain = resources.get_or_create(
+    ("reasoning_chain",) + llm_key,
+    lambda: LLMChain(llm=llm, prompt=prompt_template)  # Fixed typo: LLmChain -> LLMChain
+)
 reasoning_tool = Tool(
     name="Reasoning Tool",
     func=chain.run,
@@ -159,13 +182,23 @@ reasoning_tool = Tool(
 )
 
 # Initialize the agents
-assistant_agent = initialize_agent(
-    tools=[wikipedia_tool, calculator, reasoning_tool],
-    llm=llm,
-    agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
-    verbose=False,
-    handle_parsing_errors=True
+assistant_agent = resources.get_or_create(
+    ("assistant_agent",) + llm_key,
+    lambda: initialize_agent(
+        tools=[wikipedia_tool, calculator, reasoning_tool],
+        llm=llm,
+        agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
+        verbose=False,
+        handle_parsing_errors=True,
+        **executor_limits()
+    )
 )
+st.sidebar.caption(f"Setup this rerun: {(time.perf_counter() - setup_start) * 1000:.1f} ms")
+calc_stats = local_math.stats()
+st.sidebar.caption(f"Calculator fast path: {calc_stats['local']}/{calc_stats['local'] + calc_stats['llm']} "
+                   f"({calc_stats['hit_rate']:.0%}) solved locally")
+# Clear arithmetic and plain lookups skip the agent's planning round trips (see math_router.py)
+use_router = st.sidebar.checkbox("Route obvious questions without the agent", value=True)
 
 #9. CHAT MESAJLARINI SAKLAMA ve GÖRÜNTÜLEME
 """
@@ -190,6 +223,9 @@ for message in st.session_state.messages:
 
     Soruyu mesaj geçmişine ekler.
 
+    Yönlendirici (math_router) açıksa: açık bir hesap local_math ile, sayı içermeyen açık bir bilgi sorusu
+    doğrudan Wikipedia özetinin ilk cümleleriyle cevaplanır. Wikipedia sonuç bulamazsa veya soru karışıksa agent'a gidilir.
+
     StreamlitCallbackHandler oluşturulur (ajanın reasoning adımları canlı görünür).
 
     assistant_agent.run(question, callbacks=[st_cb]) → Agent soruyu işler ve doğru Tool’la çalışır.
@@ -209,11 +245,26 @@ if st.button("Find my answer"):
                 with st.chat_message("user"):
                     st.write(question)
                 
-                # Create callback handler
-                st_cb = StreamlitCallbackHandler(st.container(), expand_new_thoughts=False)
-                
-                # Get response from agent
-                response = assistant_agent.run(question, callbacks=[st_cb])  # Fixed: pass question directly
+                response = None
+                if use_router:
+                    route_start = time.perf_counter()
+                    intent, payload = math_router.route(question)
+                    if intent == math_router.CALCULATOR:
+                        response = payload
+                    elif intent == math_router.WIKIPEDIA:
+                        response = math_router.wikipedia_answer(payload)
+                    if response is not None:
+                        st.caption(f"Answered by the {intent} route in "
+                                   f"{(time.perf_counter() - route_start) * 1000:.0f} ms (agent skipped)")
+
+                if response is None:
+                    # Create callback handler
+                    st_cb = StreamlitCallbackHandler(st.container(), expand_new_thoughts=False)
+
+                    # Get response from agent
+                    # Runs under the iteration/time/token budgets and records per-step telemetry
+                    response, run_stats = run_with_budget(assistant_agent, question, "math", callbacks=[st_cb])
+                    st.sidebar.caption(describe(run_stats))
                 
                 # Add assistant response to session state
                 st.session_state.messages.append({'role': 'assistant', 'content': response})  # Fixed typo: assisttant -> assistant
@@ -0,0 +1,108 @@
+"""
+math_app için yerel niyet (intent) yönlendirici
+
+math_app'teki her soru assistant_agent'tan (Wikipedia, Calculator ve Reasoning araçları üzerinde
+ZERO_SHOT_REACT agent) geçiyordu. "what is 15% of 240" bile planlama için bir LLM çağrısı, bir araç çağrısı
+ve final cevap için bir LLM çağrısı harcıyordu.
+
+route(question) kural tabanlı ve yereldir (mikrosaniyeler):
+    calculator  local_math soruyu doğrudan çözebiliyorsa cevap hemen döner, hiç LLM çağrısı yapılmaz
+                ("convert ..." ve "how many X are in ..." önce local_math'in birim dönüşümü biçimine çevrilir)
+    wikipedia   sayı / matematik kelimesi içermeyen açık bilgi soruları ("who was ...", "what is a ...",
+                "tell me about ...", "capital of ...") doğrudan Wikipedia aramasına gider; cevap olarak
+                sadece ilk sayfanın özetinin ilk LOOKUP_SENTENCES cümlesi döner (wikipedia_answer)
+    agent       karışık veya belirsiz her şey (örn. "Atatürk kaç yaşında öldü?") tam agent'a gider
+
+Yanlış yönlendirmenin bedeli asimetrik olduğundan kurallar temkinlidir: emin olunmayan her soru agent'a gider.
+"""
+import re
+
+import local_math
+import resources
+
+CALCULATOR = "calculator"
+WIKIPEDIA = "wikipedia"
+AGENT = "agent"
+LOOKUP_SENTENCES = 3
+LOOKUP_CHARS = 1500
+NO_RESULT = "No good Wikipedia Search Result"
+
+_LOOKUPS = [
+    re.compile(r"^(?:who|what|where)\s+(?:is|was|were|are)\s+(?P<subject>.+)$", re.IGNORECASE),
+    re.compile(r"^(?:tell\s+me\s+about|define)\s+(?P<subject>.+)$", re.IGNORECASE),
+    re.compile(r"^(?:when|where)\s+(?:was|were|is|did)\s+(?P<subject>.+?)\s+"
+               r"(?:born|founded|invented|discovered|built|located|die|died|start|started)$", re.IGNORECASE),
+]
+# Anything numeric, comparative or computational needs reasoning beyond one lookup
+_NOT_A_LOOKUP = re.compile(
+    r"\d|[+*/=^%]|\b(how\s+(many|much|old|long|far)|sum|difference|product|average|mean|total|percent|"
+    r"calculate|compute|solve|equation|plus|minus|times|divided|age|older|younger|compare|between|"
+    r"if|then|should|why|prove|step)\b",
+    re.IGNORECASE)
+_ARTICLE = re.compile(r"^(a|an|the)\s+", re.IGNORECASE)
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'(])")
+# "Convert 5 km to miles", "How many minutes are in 3 hours?" -> local_math's "<value> <unit> in <unit>"
+_CONVERT = re.compile(r"^\s*convert\s+", re.IGNORECASE)
+_HOW_MANY_IN = re.compile(r"^\s*how\s+many\s+(?P<target>[a-z°]+)\s+(?:are\s+)?(?:there\s+)?in\s+"
+                          r"(?P<quantity>-?\d+(?:\.\d+)?\s*[a-z°]+)\s*\??\s*$", re.IGNORECASE)
+
+
+def calculator_expression(question):
+    """`question` rewritten into a form local_math understands (unit conversion phrasings)"""
+    match = _HOW_MANY_IN.match(question)
+    if match:
+        return f"{match.group('quantity')} in {match.group('target')}"
+    return _CONVERT.sub("", question)
+
+
+def wikipedia_subject(question):
+    """The search subject if `question` is a plain lookup, else None"""
+    text = question.strip().rstrip("?.! ").strip()
+    if not text or _NOT_A_LOOKUP.search(text):
+        return None
+    for pattern in _LOOKUPS:
+        match = pattern.match(text)
+        if match:
+            subject = _ARTICLE.sub("", match.group("subject").strip())
+            if subject and len(subject.split()) <= 8:
+                return subject
+    return None
+
+
+def lookup_wrapper():
+    """Wikipedia wrapper bounded to one page and LOOKUP_CHARS characters, shared per process"""
+    def build():
+        from langchain_community.utilities import WikipediaAPIWrapper
+        return WikipediaAPIWrapper(top_k_results=1, doc_content_chars_max=LOOKUP_CHARS)
+
+    return resources.get_or_create(("wikipedia_lookup", LOOKUP_CHARS), build)
+
+
+def wikipedia_answer(subject, sentences=LOOKUP_SENTENCES):
+    """The first sentences of the best matching page's summary, or None if Wikipedia has no page"""
+    text = lookup_wrapper().run(subject)
+    if text.startswith(NO_RESULT):
+        return None
+    header, _, summary = text.partition("\nSummary: ")
+    title = header.removeprefix("Page: ").strip()
+    summary = " ".join(summary.split())
+    if not summary:
+        return None
+    answer = " ".join(_SENTENCE_END.split(summary)[:sentences])
+    return f"{answer}\n\n(Wikipedia: {title})" if title else answer
+
+
+def route(question):
+    """Return (intent, payload): the calculator's answer, the Wikipedia subject, or None for the agent"""
+    try:
+        answer = local_math.evaluate(calculator_expression(question), count=False)
+    except ZeroDivisionError:
+        answer = "Error: Division by zero is undefined in mathematics. Please try a different expression."
+    if answer is not None:
+        local_math.record(local=True)
+        return CALCULATOR, answer
+
+    subject = wikipedia_subject(question)
+    if subject:
+        return WIKIPEDIA, subject
+    return AGENT, None
@@ -0,0 +1,114 @@
+"""
+Süreç genelinde kaynak kayıt defteri (resource registry)
+
+Streamlit her etkileşimde script'i baştan çalıştırır; LLM istemcisi, zincirler (chain) ve
+agent'lar her seferinde yeniden kuruluyordu.
+
+Burada bu nesneler (sağlayıcı, model, API anahtarının hash'i, parametreler) anahtarıyla
+süreç başına bir kez kurulur ve tüm oturumlar arasında paylaşılır. API anahtarının kendisi
+anahtar olarak saklanmaz, sadece SHA-256 özeti kullanılır.
+
+Aynı anahtar için eşzamanlı iki istek gelirse nesne yalnızca bir kez kurulur (anahtar bazlı kilit).
+
+Kayıt defteri sınırlıdır:
+    - en fazla RESOURCES_MAX_ENTRIES nesne tutulur; dolunca en uzun süredir kullanılmayan (LRU) düşer
+    - group: aynı gruptaki yeni bir anahtar eski girdinin yerini alır (örn. şema değişince aynı
+      veritabanının eski agent'ı)
+    - valid: mevcut nesne artık geçerli değilse (örn. bağlı olduğu bağlantı yenilendiyse) yeniden kurulur
+
+stats() kurulum sayısı, kurulum süresi, tekrar kullanım (hit) ve düşürülen (evicted) nesne sayısını verir.
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+MAX_ENTRIES = int(os.getenv("RESOURCES_MAX_ENTRIES", "256"))
+
+_registry = OrderedDict()  # key -> resource, least recently used first
+_groups = {}  # group -> the key currently registered for it
+_key_locks = {}
+_lock = threading.Lock()
+_stats = {"hits": 0, "builds": 0, "build_seconds": 0.0, "evictions": 0}
+
+
+def api_key_hash(api_key):
+    return hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:16]
+
+
+def resource_key(kind, provider, model, api_key=None, **params):
+    return (kind, provider, model, api_key_hash(api_key), tuple(sorted(params.items())))
+
+
+def _lookup(key, valid):
+    with _lock:
+        if key in _registry and (valid is None or valid(_registry[key])):
+            _registry.move_to_end(key)
+            _stats["hits"] += 1
+            return True, _registry[key]
+    return False, None
+
+
+def _evict(key):
+    # Caller holds _lock
+    _registry.pop(key, None)
+    _key_locks.pop(key, None)
+    _stats["evictions"] += 1
+
+
+def get_or_create(key, factory, group=None, valid=None):
+    """Return the resource registered under `key`, building it with `factory` on first use.
+
+    A new key in `group` replaces the group's previous entry; an entry failing `valid(resource)` is rebuilt.
+    """
+    found, value = _lookup(key, valid)
+    if found:
+        return value
+
+    with _lock:
+        key_lock = _key_locks.setdefault(key, threading.Lock())
+    with key_lock:
+        found, value = _lookup(key, valid)
+        if found:
+            return value
+        start = time.perf_counter()
+        value = factory()
+        with _lock:
+            _stats["builds"] += 1
+            _stats["build_seconds"] += time.perf_counter() - start
+            _registry[key] = value
+            _registry.move_to_end(key)
+            _key_locks.setdefault(key, key_lock)
+            if group is not None:
+                previous = _groups.get(group)
+                if previous is not None and previous != key and previous in _registry:
+                    _evict(previous)
+                _groups[group] = key
+            while len(_registry) > MAX_ENTRIES:
+                _evict(next(iter(_registry)))
+            live = set(_registry)
+            for name in [name for name, member in _groups.items() if member not in live]:
+                del _groups[name]
+        return value
+
+
+def get_llm(provider, model, api_key=None, **params):
+    """Shared chat/LLM client for (provider, model, api key, params)"""
+    def build():
+        if provider == "groq":
+            from langchain_groq import ChatGroq
+            return ChatGroq(groq_api_key=api_key, model_name=model, **params)
+        if provider == "huggingface":
+            from langchain_huggingface import HuggingFaceEndpoint
+            if api_key:
+                params["huggingfacehub_api_token"] = api_key
+            return HuggingFaceEndpoint(repo_id=model, **params)
+        raise ValueError(f"Unknown LLM provider '{provider}'")
+
+    return get_or_create(resource_key("llm", provider, model, api_key, **params), build)
+
+
+def stats():
+    with _lock:
+        return dict(_stats, resources=len(_registry))
@@ -0,0 +1,370 @@
+"""
+Async HTTP servisi (FastAPI + SSE)
+
+Uygulamaların hepsi Streamlit / Gradio script'iydi ve mantık modül seviyesindeydi: her oturum kendi script
+thread'inde çalışıyor, LLM çağrıları senkron bekliyordu.
+
+Bu servis aynı parçaları tek bir event loop üzerinde, async LLM istemcileriyle (ainvoke / astream /
+astream_events) sunar; tek bir worker süreci çok sayıda eşzamanlı isteğe hizmet eder:
+
+    POST /summarize   youtube_app'in process_url'i: load_document + summarizer.astream_summary
+    POST /sql         streamlit_db_app: anlamsal SQL önbelleği, hızlı yol (sql_fast_path), gerekirse SQL agent
+    POST /math        math_app: math_router ile yerel cevap veya Wikipedia, gerekirse ReAct agent
+    POST /code        code_assistant: Ollama'ya async akışlı istek, session_id başına ConversationHistory
+    GET  /health, GET /metrics (agent_telemetry'nin Prometheus metrikleri)
+
+Tüm POST uçları Server-Sent Events (SSE) döner; her olayın verisi JSON'dur:
+    token        üretilen metin parçası ({"text": ...})
+    progress     uzun dokümanların map adımı ({"fraction": ...})
+    tool / observation / sql / route / document   ara adımlar
+    result       son cevap ve süreler; error: hata mesajı (akış bu olayla biter)
+
+Senkron kalan I/O (sayfa indirme, SQLite, Wikipedia, embedding) asyncio.to_thread ile event loop'u
+bloklamadan çalıştırılır. Groq API anahtarı X-Groq-Api-Key başlığından, yoksa GROQ_API_KEY'den alınır;
+LLM istemcileri ve agent'lar resources kayıt defterinde paylaşılır.
+
+LangServe'in hazır uçları yerine doğrudan FastAPI kullanıldı: process_url'in ilerleme olayları ve
+code_assistant'ın oturum durumu tek bir Runnable'a sığmıyor, tüm uçlar aynı SSE protokolünü konuşuyor.
+
+Çalıştırma:
+    uvicorn service:app --host 0.0.0.0 --port 8000
+    curl -N -X POST localhost:8000/math -H 'Content-Type: application/json' -d '{"question": "15% of 240"}'
+"""
+import asyncio
+import json
+import os
+import uuid
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Optional
+
+import httpx
+import validators
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import PlainTextResponse
+from langchain.prompts import PromptTemplate
+from pydantic import BaseModel
+from sse_starlette.sse import EventSourceResponse
+
+import local_math
+import math_router
+import resources
+from agent_telemetry import astream_with_budget, executor_limits, prometheus_text
+from content_loader import load_document
+from summarizer import MAX_WORKERS, REQUESTS_PER_SECOND, TokenBucket, astream_summary
+from summary_cache import get_cache
+
+SUMMARY_MODEL = os.getenv("SERVICE_SUMMARY_MODEL", "llama3-8b-8192")
+SQL_MODEL = os.getenv("SERVICE_SQL_MODEL", "Llama3-8b-8192")
+MATH_MODEL = os.getenv("SERVICE_MATH_MODEL", "Gemma2-9b-It")
+CONTEXT_WINDOW = 8192
+MAX_OUTPUT_TOKENS = 1024
+SQLITE_PATH = os.getenv("SERVICE_SQLITE_PATH", str(Path(__file__).parent / "student.db"))
+MAX_CODE_SESSIONS = int(os.getenv("SERVICE_MAX_CODE_SESSIONS", "1000"))
+
+# Same template as youtube_app.py, so the UI and the service share summary cache entries
+summary_template = """
+Please provide a concise summary of the following content in about 300 words.
+Focus on key points and main ideas:
+
+Content:{text}
+
+SUMMARY:
+"""
+summary_prompt = PromptTemplate(template=summary_template, input_variables=["text"])
+
+state = {}
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # One pooled HTTP client for Ollama and one rate limiter for every summary request
+    state["http"] = httpx.AsyncClient(timeout=httpx.Timeout(600, connect=5))
+    state["summary_bucket"] = TokenBucket(REQUESTS_PER_SECOND, capacity=MAX_WORKERS)
+    state["code_sessions"] = OrderedDict()
+    yield
+    await state["http"].aclose()
+
+
+app = FastAPI(title="LangChain assistants", lifespan=lifespan)
+
+
+class SummarizeRequest(BaseModel):
+    url: str
+
+
+class QuestionRequest(BaseModel):
+    question: str
+
+
+class SQLRequest(QuestionRequest):
+    fast_path: bool = True
+
+
+class CodeRequest(BaseModel):
+    prompt: str
+    session_id: Optional[str] = None
+
+
+#1. ORTAK YARDIMCILAR
+def groq_key(request):
+    key = request.headers.get("X-Groq-Api-Key") or os.getenv("GROQ_API_KEY")
+    if not key:
+        raise HTTPException(status_code=401, detail="Send X-Groq-Api-Key or set GROQ_API_KEY")
+    return key
+
+
+def stream(events):
+    """Serve an async generator of (event, data) pairs as SSE; failures end the stream with an error event"""
+    async def publish():
+        try:
+            async for event, data in events:
+                yield {"event": event, "data": json.dumps(data, ensure_ascii=False, default=str)}
+        except Exception as e:
+            yield {"event": "error", "data": json.dumps({"error": f"{type(e).__name__}: {e}"})}
+
+    return EventSourceResponse(publish())
+
+
+@app.get("/health")
+async def health():
+    return {"status": "ok", "resources": resources.stats()}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return prometheus_text()
+
+
+#2. ÖZETLEME (process_url)
+"""
+İçerik thread'de bir kez çekilir (önbellekte varsa indirilmez), özet astream_summary ile akar.
+"""
+@app.post("/summarize")
+async def summarize(body: SummarizeRequest, request: Request):
+    if not validators.url(body.url):
+        raise HTTPException(status_code=422, detail="Please enter a valid URL")
+    llm = resources.get_llm("groq", SUMMARY_MODEL, groq_key(request), temperature=0.3,
+                            max_tokens=MAX_OUTPUT_TOKENS)
+
+    async def events():
+        cache = get_cache()
+        result = await asyncio.to_thread(load_document, body.url, cache)
+        if not result.document or not result.document.page_content.strip():
+            raise ValueError("No content found")
+        yield "document", {"source_type": result.source_type, "characters": len(result.document.page_content),
+                           "cached": result.document_cached}
+        async for event, value in astream_summary(result, llm, summary_prompt, SUMMARY_MODEL, cache=cache,
+                                                  context_window=CONTEXT_WINDOW,
+                                                  max_output_tokens=MAX_OUTPUT_TOKENS,
+                                                  bucket=state["summary_bucket"]):
+            yield event, {"fraction": value} if event == "progress" else {"text": value}
+        yield "result", {"summary": result.summary, "source_type": result.source_type,
+                         "summary_cached": result.summary_cached, "timings": result.timings}
+
+    return stream(events())
+
+
+#3. SQL
+"""
+streamlit_db_app ile aynı sıra: anlamsal önbellek -> hızlı yol (tek LLM çağrısı) -> SQL agent (akışlı).
+Servis yerel SQLite veritabanını (SERVICE_SQLITE_PATH) salt okunur havuzla kullanır.
+"""
+def sql_resources(api_key):
+    from db_pool import sqlite_engine
+    from sql_guard import GuardedSQLDatabase
+    from sql_result_cache import SQLResultCache
+    from sql_schema import SchemaCache
+
+    def build():
+        engine = sqlite_engine(Path(SQLITE_PATH).absolute())
+        return GuardedSQLDatabase(engine), SchemaCache(engine), SQLResultCache(engine)
+
+    db, schema, sql_cache = resources.get_or_create(("service_sql", SQLITE_PATH), build)
+    llm = resources.get_llm("groq", SQL_MODEL, api_key, streaming=True)
+    return db, schema, sql_cache, llm
+
+
+def sql_agent(db, schema_version, schema_text, llm, api_key):
+    from langchain.agents import create_sql_agent
+    from langchain.agents.agent_toolkits import SQLDatabaseToolkit
+    from langchain.agents.agent_types import AgentType
+    from sql_schema import agent_prompt
+
+    def build():
+        return create_sql_agent(llm=llm, toolkit=SQLDatabaseToolkit(db=db, llm=llm),
+                                agent_type=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
+                                prompt=agent_prompt(schema_text), **executor_limits("force"))
+
+    key = ("service_sql_agent", SQLITE_PATH, schema_version, resources.api_key_hash(api_key))
+    return resources.get_or_create(key, build)
+
+
+@app.post("/sql")
+async def sql_question(body: SQLRequest, request: Request):
+    api_key = groq_key(request)
+
+    async def events():
+        from sql_fast_path import InvalidSQL, fast_answer
+        from sql_result_cache import SQLCapture
+
+        # Building the engine and caches is synchronous (first request only), keep it off the loop
+        db, schema, sql_cache, llm = await asyncio.to_thread(sql_resources, api_key)
+        schema_version, schema_text = await asyncio.to_thread(schema.current)
+        hit = await asyncio.to_thread(sql_cache.lookup, body.question)
+        if hit:
+            yield "route", {"route": "cache", "question": hit["question"], "similarity": hit["similarity"]}
+            yield "result", {"answer": hit["answer"], "sql": hit["sql"]}
+            return
+        if body.fast_path:
+            try:
+                fast = await asyncio.to_thread(fast_answer, llm, schema.engine, schema_text, body.question)
+                yield "sql", {"sql": fast["sql"]}
+                await asyncio.to_thread(sql_cache.store, body.question, fast["sql"], fast["result"], fast["answer"])
+                yield "result", {"answer": fast["answer"], "sql": fast["sql"], "llm_calls": fast["llm_calls"]}
+                return
+            except InvalidSQL as e:
+                yield "route", {"route": "agent", "reason": f"fast path SQL rejected: {e}"}
+
+        capture = SQLCapture()
+        agent = sql_agent(db, schema_version, schema_text, llm, api_key)
+        async for event, data in astream_with_budget(agent, body.question, "sql", callbacks=[capture]):
+            if event == "result":
+                data["sql"] = capture.sql
+                if capture.sql and not data["telemetry"]["stopped"]:
+                    await asyncio.to_thread(sql_cache.store, body.question, capture.sql, capture.result,
+                                            data["answer"])
+            yield event, data
+
+    return stream(events())
+
+
+#4. MATEMATİK
+"""
+Önce math_router: açık hesaplar local_math ile, düz bilgi soruları doğrudan Wikipedia ile cevaplanır.
+Kalanlar math_app'teki araçlarla (Wikipedia, Calculator, Reasoning Tool) kurulan ReAct agent'a gider.
+"""
+def wikipedia_wrapper():
+    from langchain_community.utilities import WikipediaAPIWrapper
+
+    return resources.get_or_create(("wikipedia_wrapper",), WikipediaAPIWrapper)
+
+
+def math_agent(api_key):
+    from langchain.agents import AgentType, Tool, initialize_agent
+    from langchain.chains import LLMChain, LLMMathChain
+
+    llm_key = resources.resource_key("llm", "groq", MATH_MODEL, api_key)
+    llm = resources.get_llm("groq", MATH_MODEL, api_key)
+
+    def build():
+        math_chain = LLMMathChain.from_llm(llm=llm)
+
+        def calculator(expression):
+            try:
+                return local_math.evaluate(expression) or math_chain.run(expression)
+            except ZeroDivisionError:
+                return "Error: Division by zero is undefined in mathematics. Please try a different expression."
+            except Exception as e:
+                return f"Calculation error: {str(e)}"
+
+        reasoning = LLMChain(llm=llm, prompt=PromptTemplate(input_variables=["question"], template="""
+You are agent tasked for solving mathematical questions. Logically arrive at the solution and provide a detailed explanation
+and display it point wise for the question below
+Question:{question}
+Answer:
+"""))
+        tools = [
+            Tool(name="Wikipedia", func=wikipedia_wrapper().run,
+                 description="A tool searching the internet to find various information"),
+            Tool(name="Calculator", func=calculator,
+                 description="A tool answering math related questions. Only input mathematical expressions. "
+                             "Handles division by zero gracefully."),
+            Tool(name="Reasoning Tool", func=reasoning.run,
+                 description="A tool for answering logic-based and reasoning questions."),
+        ]
+        return initialize_agent(tools=tools, llm=llm, agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
+                                handle_parsing_errors=True, **executor_limits())
+
+    return resources.get_or_create(("service_math_agent",) + llm_key, build)
+
+
+@app.post("/math")
+async def math_question(body: QuestionRequest, request: Request):
+    api_key = groq_key(request)
+
+    async def events():
+        # sympy / numexpr evaluation can take a while; other streams keep flowing meanwhile
+        intent, payload = await asyncio.to_thread(math_router.route, body.question)
+        if intent == math_router.CALCULATOR:
+            yield "route", {"route": intent}
+            yield "result", {"answer": payload}
+            return
+        if intent == math_router.WIKIPEDIA:
+            answer = await asyncio.to_thread(math_router.wikipedia_answer, payload)
+            if answer is not None:
+                yield "route", {"route": intent, "subject": payload}
+                yield "result", {"answer": answer}
+                return
+        yield "route", {"route": math_router.AGENT}
+        async for event, data in astream_with_budget(math_agent(api_key), body.question, "math"):
+            yield event, data
+
+    return stream(events())
+
+
+#5. KOD ASİSTANI
+"""
+code_generation'ın (code_assistant'ın arayüzsüz çekirdeği) ConversationHistory'si session_id başına tutulur (en fazla SERVICE_MAX_CODE_SESSIONS,
+en uzun süredir kullanılmayan düşer). Ollama NDJSON akışı httpx.AsyncClient ile okunur.
+"""
+def code_session(session_id):
+    from code_generation import ConversationHistory
+
+    sessions = state["code_sessions"]
+    if session_id not in sessions:
+        sessions[session_id] = ConversationHistory()
+        while len(sessions) > MAX_CODE_SESSIONS:
+            sessions.popitem(last=False)
+    sessions.move_to_end(session_id)
+    return sessions[session_id]
+
+
+@app.post("/code")
+async def code_prompt(body: CodeRequest):
+    import code_generation
+
+    session_id = body.session_id or uuid.uuid4().hex
+    session = code_session(session_id)
+
+    async def events():
+        # Building the request may summarize evicted turns with a blocking call
+        final_prompt, context = await asyncio.to_thread(session.build_request, body.prompt)
+        data = {"model": "codeguru", "prompt": final_prompt, "stream": True}
+        if context:
+            data["context"] = context
+        yield "session", {"session_id": session_id}
+
+        pieces, new_context = [], None
+        async with state["http"].stream("POST", code_generation.url, headers=code_generation.headers,
+                                        content=json.dumps(data)) as response:
+            if response.status_code != 200:
+                raise RuntimeError((await response.aread()).decode("utf-8", errors="replace"))
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if chunk.get("error"):
+                    raise RuntimeError(chunk["error"])
+                if chunk.get("response"):
+                    pieces.append(chunk["response"])
+                    yield "token", {"text": chunk["response"]}
+                if chunk.get("done"):
+                    new_context = chunk.get("context")
+                    break
+        text = "".join(pieces)
+        session.record(body.prompt, text, new_context)
+        yield "result", {"answer": text, "session_id": session_id}
+
+    return stream(events())
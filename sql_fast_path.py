@@ -0,0 +1,106 @@
+"""
+Tek atışlık (single-shot) text-to-SQL hızlı yolu
+
+ZERO_SHOT_REACT_DESCRIPTION agent'ı her soru için list-tables -> schema -> query-checker -> query -> cevap
+zincirini yürütüyordu; bu soru başına 4-6 ardışık LLM çağrısı demek.
+
+Hızlı yol:
+    1. şema (sql_schema.SchemaCache) prompt'ta hazır, tek LLM çağrısı ile SQL üretilir
+    2. SQL yerelde doğrulanır: tek bir SELECT/WITH ifadesi olmalı, string / tırnaklı isim / yorum dışında
+       hiçbir yazma (DML/DDL) anahtar kelimesi içermemeli ("WITH x AS (...) UPDATE ..." MySQL 8'de geçerli
+       bir yazma sorgusudur ve EXPLAIN onu çalıştırmadan onaylar) ve EXPLAIN'den geçmeli
+       (SQLite: EXPLAIN QUERY PLAN, MySQL: EXPLAIN); yani sorgu çalıştırılmadan tablo/sütun hataları yakalanır
+    3. sorgu salt okunur bir transaction içinde çalıştırılır (run_sql, sql_guard.guarded_run(read_only=True))
+    4. istenirse (phrase=True) ikinci bir LLM çağrısı sadece sonucu cümleye döker
+
+Doğrulama başarısız olursa InvalidSQL fırlatılır; çağıran taraf tam agent'a geri döner (fallback).
+"""
+import re
+import time
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from sql_result_cache import run_sql
+
+TOP_K = 10
+
+SQL_PROMPT = """You are a {dialect} expert. Given the database below, write one {dialect} query that answers the question.
+Only select the columns needed to answer, and return at most {top_k} rows unless the question asks for a specific number.
+Never write INSERT, UPDATE, DELETE, DROP or any other statement that changes the database.
+Return only the SQL query, without explanation or markdown.
+
+{schema}
+
+Question: {question}
+SQL:"""
+
+ANSWER_PROMPT = """Question: {question}
+SQL query: {sql}
+Query result: {result}
+
+Answer the question in one or two sentences using only the query result."""
+
+_FENCE = re.compile(r"```(?:sql)?\s*(.*?)```", re.DOTALL | re.IGNORECASE)
+_READ_ONLY = re.compile(r"^\s*(SELECT|WITH)\b", re.IGNORECASE)
+# String literals, quoted identifiers and comments, removed before looking for write keywords
+_QUOTED = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|`(?:[^`]|``)*`|--[^\n]*|#[^\n]*|/\*.*?\*/", re.DOTALL)
+_WRITE = re.compile(
+    r"\b(INSERT|UPDATE|DELETE|MERGE|UPSERT|CREATE|ALTER|DROP|TRUNCATE|RENAME|GRANT|REVOKE|ATTACH|DETACH|PRAGMA|"
+    r"VACUUM|REINDEX|CALL|EXEC|EXECUTE|LOAD|HANDLER|LOCK|UNLOCK|SET|INTO|REPLACE(?!\s*\())\b", re.IGNORECASE)
+
+
+class InvalidSQL(Exception):
+    """Generated SQL failed local validation"""
+
+
+def _invoke(llm, prompt):
+    response = llm.invoke(prompt)
+    return getattr(response, "content", response).strip()
+
+
+def extract_sql(text):
+    """Strip markdown fences, a leading 'SQL:' label and the trailing semicolon"""
+    fenced = _FENCE.search(text)
+    sql = fenced.group(1) if fenced else text
+    sql = re.sub(r"^\s*SQL\s*:", "", sql, flags=re.IGNORECASE).strip()
+    return sql.rstrip(";").strip()
+
+
+def validate_sql(engine, sql):
+    """Raise InvalidSQL unless `sql` is a single read-only statement the database can plan"""
+    if not sql:
+        raise InvalidSQL("empty query")
+    if ";" in sql:
+        raise InvalidSQL("more than one statement")
+    if not _READ_ONLY.match(sql):
+        raise InvalidSQL("not a SELECT query")
+    write = _WRITE.search(_QUOTED.sub(" ", sql))
+    if write:
+        raise InvalidSQL(f"{write.group(1).upper()} is not allowed in a read-only query")
+    explain = "EXPLAIN QUERY PLAN " if engine.dialect.name == "sqlite" else "EXPLAIN "
+    try:
+        with engine.connect() as conn:
+            conn.exec_driver_sql(explain + sql).fetchall()
+    except SQLAlchemyError as e:
+        raise InvalidSQL(str(getattr(e, "orig", e)).splitlines()[0]) from e
+
+
+def fast_answer(llm, engine, schema_text, question, phrase=True, top_k=TOP_K):
+    """Answer `question` with one SQL-writing LLM call (plus one phrasing call if `phrase`)"""
+    start = time.perf_counter()
+    prompt = SQL_PROMPT.format(dialect=engine.dialect.name, top_k=top_k, schema=schema_text, question=question)
+    sql = extract_sql(_invoke(llm, prompt))
+    validate_sql(engine, sql)
+    try:
+        result = run_sql(engine, sql)
+    except SQLAlchemyError as e:
+        raise InvalidSQL(str(getattr(e, "orig", e)).splitlines()[0]) from e
+
+    llm_calls = 1
+    if phrase:
+        answer = _invoke(llm, ANSWER_PROMPT.format(question=question, sql=sql, result=result))
+        llm_calls += 1
+    else:
+        answer = f"Query result: {result}"
+    return {"answer": answer, "sql": sql, "result": result, "llm_calls": llm_calls,
+            "seconds": time.perf_counter() - start}
@@ -0,0 +1,177 @@
+"""
+SQL sonuç boyutu koruması (result-size guard)
+
+SQL agent büyük bir tabloya 'SELECT *' yazdığında toolkit tüm sonucu tek bir string gözleme (observation)
+dönüştürüyordu: bellek, LLM context'i ve gecikme patlıyordu.
+
+guarded_run sorguyu şu kurallarla çalıştırır:
+    - LIMIT: sorguda LIMIT yoksa sona SCAN_MAX_ROWS+1 limiti eklenir, veritabanı taramayı erken bitirir
+    - akış (streaming): satırlar fetchmany ile parça parça okunur, hepsi belleğe alınmaz
+    - zaman sınırı: SQLite'ta progress handler, MySQL'de MAX_EXECUTION_TIME; fetch döngüsü de süreyi kontrol eder
+    - read_only=True: SQLite'ta PRAGMA query_only, diğerlerinde SET TRANSACTION READ ONLY; doğrulamadan
+      kaçan bir yazma ifadesi de veritabanında hata verir (hızlı yol ve önbellekten yeniden çalıştırma)
+    - özet: sonuç MAX_ROWS satırdan büyükse satırlar yerine satır sayısı, sütun özetleri (null sayısı,
+      min / max / ortalama, örnek değerler) ve ilk birkaç satır döner; agent'a sorguyu daraltması
+      veya LIMIT/OFFSET ile sayfalaması söylenir
+
+GuardedSQLDatabase, SQLDatabase.run'ı bu katmanla değiştirir; agent'ın sql_db_query aracı otomatik olarak korunur.
+"""
+import os
+import re
+import time
+
+from langchain_community.utilities import SQLDatabase
+from sqlalchemy.exc import SQLAlchemyError
+
+MAX_ROWS = int(os.getenv("SQL_MAX_ROWS", "50"))
+SCAN_MAX_ROWS = int(os.getenv("SQL_SCAN_MAX_ROWS", "100000"))
+TIME_LIMIT_SECONDS = float(os.getenv("SQL_TIME_LIMIT_SECONDS", "10"))
+FETCH_SIZE = 1000
+PREVIEW_ROWS = 5
+MAX_STRING_LENGTH = 300  # same cut-off SQLDatabase.run applies to long values
+MAX_SAMPLE_VALUES = 5
+
+_HAS_LIMIT = re.compile(r"\bLIMIT\s+\d+(\s*(,|OFFSET)\s*\d+)?\s*$", re.IGNORECASE)
+_SELECT = re.compile(r"^\s*(SELECT|WITH)\b", re.IGNORECASE)
+
+
+class QueryTimeout(SQLAlchemyError):
+    """The query ran past the time limit"""
+
+
+def apply_limit(sql, limit):
+    """Append LIMIT to a SELECT that has none at the end"""
+    sql = sql.strip().rstrip(";").strip()
+    if not _SELECT.match(sql) or _HAS_LIMIT.search(sql):
+        return sql
+    return f"{sql}\nLIMIT {limit}"
+
+
+def _truncate(value):
+    if isinstance(value, str) and len(value) > MAX_STRING_LENGTH:
+        return value[:MAX_STRING_LENGTH] + "..."
+    return value
+
+
+class _ColumnSummary:
+    def __init__(self, name):
+        self.name = name
+        self.nulls = 0
+        self.count = 0
+        self.low = self.high = None
+        self.total = 0.0
+        self.numeric = True
+        self.samples = []
+
+    def add(self, value):
+        if value is None:
+            self.nulls += 1
+            return
+        self.count += 1
+        if self.numeric and isinstance(value, (int, float)) and not isinstance(value, bool):
+            self.total += value
+        else:
+            self.numeric = False
+        try:
+            self.low = value if self.low is None or value < self.low else self.low
+            self.high = value if self.high is None or value > self.high else self.high
+        except TypeError:
+            pass
+        if len(self.samples) < MAX_SAMPLE_VALUES and value not in self.samples:
+            self.samples.append(_truncate(value))
+
+    def describe(self):
+        text = f"{self.name}: {self.nulls} null"
+        if self.count and self.numeric:
+            text += f", min {self.low}, max {self.high}, mean {self.total / self.count:.2f}"
+        elif self.count:
+            text += f", e.g. {', '.join(repr(value) for value in self.samples)}"
+        return text
+
+
+def _arm_time_limit(conn, deadline):
+    """Make the database itself abort the statement after the deadline; returns a disarm function"""
+    dialect = conn.engine.dialect.name
+    if dialect == "sqlite":
+        raw = conn.connection.dbapi_connection
+        # Called every 10k VM instructions; a non-zero return interrupts the statement
+        raw.set_progress_handler(lambda: int(time.monotonic() > deadline), 10000)
+        return lambda: raw.set_progress_handler(None, 0)
+    if dialect == "mysql":
+        milliseconds = max(int((deadline - time.monotonic()) * 1000), 1)
+        conn.exec_driver_sql(f"SET SESSION MAX_EXECUTION_TIME = {milliseconds}")
+        return lambda: conn.exec_driver_sql("SET SESSION MAX_EXECUTION_TIME = 0")
+    return lambda: None
+
+
+def _make_read_only(conn):
+    """Refuse writes for the rest of this connection's transaction; returns an undo function"""
+    if conn.engine.dialect.name == "sqlite":
+        previous = conn.exec_driver_sql("PRAGMA query_only").scalar()
+        conn.exec_driver_sql("PRAGMA query_only = ON")
+        return lambda: conn.exec_driver_sql(f"PRAGMA query_only = {int(previous or 0)}")
+    # Applies to the transaction the query is about to run in; it is rolled back when the connection closes
+    conn.exec_driver_sql("SET TRANSACTION READ ONLY")
+    return lambda: None
+
+
+def guarded_run(engine, sql, max_rows=MAX_ROWS, scan_max_rows=SCAN_MAX_ROWS, time_limit=TIME_LIMIT_SECONDS,
+                read_only=False):
+    """Run `sql` and return its rows as text, or a summary when there are more than `max_rows`"""
+    deadline = time.monotonic() + time_limit
+    limited = apply_limit(sql, scan_max_rows + 1)
+    kept, total, columns, summaries = [], 0, [], []
+    stopped = False
+    with engine.connect() as conn:
+        disarm = _arm_time_limit(conn, deadline)
+        undo_read_only = _make_read_only(conn) if read_only else (lambda: None)
+        try:
+            result = conn.exec_driver_sql(limited)
+            if not result.returns_rows:
+                return ""
+            columns = list(result.keys())
+            summaries = [_ColumnSummary(name) for name in columns]
+            while True:
+                batch = result.fetchmany(FETCH_SIZE)
+                if not batch:
+                    break
+                for row in batch:
+                    total += 1
+                    if total <= max_rows:
+                        kept.append(tuple(_truncate(value) for value in row))
+                    for summary, value in zip(summaries, row):
+                        summary.add(value)
+                if total > scan_max_rows or time.monotonic() > deadline:
+                    stopped = True
+                    result.close()
+                    break
+        except SQLAlchemyError as e:
+            if "interrupted" in str(e).lower() or "max_execution_time" in str(e).lower():
+                raise QueryTimeout(f"query exceeded the {time_limit:.0f}s time limit; "
+                                   "add filters or aggregate in SQL") from e
+            raise
+        finally:
+            undo_read_only()
+            disarm()
+
+    if total <= max_rows:
+        return str(kept) if kept else ""
+
+    count = f"more than {min(total, scan_max_rows)} rows (scan stopped)" if stopped else f"{total} rows"
+    lines = [f"Result too large to show: {count}, {len(columns)} columns."]
+    lines.append("Column summary:")
+    lines.extend("  " + summary.describe() for summary in summaries)
+    lines.append(f"First {PREVIEW_ROWS} rows: {kept[:PREVIEW_ROWS]}")
+    lines.append("Narrow the query with WHERE, aggregate with GROUP BY / COUNT / AVG, "
+                 f"or page through it with LIMIT {max_rows} OFFSET n.")
+    return "\n".join(lines)
+
+
+class GuardedSQLDatabase(SQLDatabase):
+    """SQLDatabase whose query tool output goes through guarded_run"""
+
+    def run(self, command, fetch="all", include_columns=False, *, parameters=None, execution_options=None):
+        if fetch != "all" or include_columns or parameters or execution_options or not isinstance(command, str):
+            return super().run(command, fetch, include_columns, parameters=parameters,
+                               execution_options=execution_options)
+        return guarded_run(self._engine, command)
@@ -0,0 +1,233 @@
+"""
+Doğal dil -> SQL sonuç önbelleği (anlamsal eşleştirme)
+
+Student.db sohbetinde kullanıcılar aynı birkaç soruyu farklı cümlelerle soruyor ve her biri tüm
+agent'ı (birkaç LLM turu) yeniden çalıştırıyordu.
+
+SQLResultCache her cevaplanan soru için (soru embedding'i, agent'ın ürettiği SQL, sonuç, cevap) saklar.
+Yeni soru embedding benzerliği eşiğin (SQL_CACHE_THRESHOLD) üzerindeyse LLM çağrılmaz;
+önbellekteki SQL yeniden çalıştırılır:
+    - sonuç aynıysa saklanan cevap döner
+    - farklıysa güncel satırlar döner
+
+Sorudaki sayılar ve tırnaklı değerler birebir aynı olmalıdır;
+"90 üstü" ile "95 üstü" embedding olarak çok benzer ama farklı SQL ister.
+
+Geçersiz kılma (invalidation): kayıt, sorgunun okuduğu tabloların veri versiyonunu saklar.
+    SQLite  -> veritabanı (ve -wal) dosyasının değişim zamanı ve boyutu
+    MySQL   -> information_schema.tables UPDATE_TIME / TABLE_ROWS
+    ayrıca  -> şema versiyonu (sql_schema.schema_version)
+Versiyon değiştiyse kayıt silinir ve agent normal şekilde çalışır.
+
+Önbellek hiçbir zaman soruyu bozmaz: embedding modeli yüklenemezse / hata verirse veya önbellekteki SQL
+artık çalışmıyorsa hata loglanır, lookup ıska (miss), store işlemsiz (no-op) sayılır; hızlı yol ve agent
+normal şekilde çalışır. Embedding hatasından sonra EMBED_RETRY_SECONDS boyunca model tekrar denenmez.
+
+SQLCapture callback'i agent'ın sql_db_query aracıyla çalıştırdığı son başarılı sorguyu yakalar.
+"""
+import logging
+import os
+import re
+import threading
+import time
+
+import numpy as np
+from langchain_core.callbacks import BaseCallbackHandler
+from sqlalchemy import inspect, text
+
+from sql_guard import guarded_run
+from sql_schema import schema_version
+
+logger = logging.getLogger(__name__)
+
+SIMILARITY_THRESHOLD = float(os.getenv("SQL_CACHE_THRESHOLD", "0.92"))
+MAX_ENTRIES = 256
+EMBED_RETRY_SECONDS = 60
+EMBEDDING_MODEL = os.getenv("SQL_CACHE_EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+
+_TABLE_REFERENCE = re.compile(r"\b(?:FROM|JOIN)\s+[`\"\[]?(\w+)", re.IGNORECASE)
+_LITERAL = re.compile(r"\d+(?:\.\d+)?|'[^']*'|\"[^\"]*\"")
+
+
+def default_embedder():
+    """Local sentence-transformers model (shared per process) as an embed(text) -> vector function"""
+    import resources
+
+    def build():
+        from langchain_huggingface import HuggingFaceEmbeddings
+        return HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL)
+
+    return resources.get_or_create(("embeddings", EMBEDDING_MODEL), build).embed_query
+
+
+def _literals(question):
+    return sorted(_LITERAL.findall(question.lower()))
+
+
+def data_version(engine, tables):
+    """Token that changes when the data of `tables` (or the schema) changes"""
+    with engine.connect() as conn:
+        if engine.dialect.name == "sqlite":
+            files = [row[2] for row in conn.exec_driver_sql("PRAGMA database_list") if row[1] == "main"]
+            version = []
+            for path in filter(None, files):
+                for name in (path, path + "-wal"):
+                    if os.path.exists(name):
+                        stat = os.stat(name)
+                        version.append((stat.st_mtime_ns, stat.st_size))
+        elif engine.dialect.name == "mysql" and tables:
+            names = ", ".join(f":t{i}" for i in range(len(tables)))
+            version = conn.execute(text(
+                "SELECT table_name, update_time, table_rows FROM information_schema.tables "
+                f"WHERE table_schema = DATABASE() AND table_name IN ({names}) ORDER BY table_name"
+            ), {f"t{i}": table for i, table in enumerate(tables)}).fetchall()
+        else:
+            version = []
+    return repr(version), schema_version(engine)
+
+
+def run_sql(engine, sql):
+    """Execute `sql` read-only, with the same size/time guard and formatting as the agent's query tool"""
+    return guarded_run(engine, sql, read_only=True)
+
+
+class SQLCapture(BaseCallbackHandler):
+    """Remember the last query the SQL agent ran successfully, and its result"""
+
+    def __init__(self):
+        self.sql = None
+        self.result = None
+        self._pending = {}
+
+    def on_tool_start(self, serialized, input_str, *, run_id, **kwargs):
+        if (serialized or {}).get("name") == "sql_db_query":
+            self._pending[run_id] = input_str
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        sql = self._pending.pop(run_id, None)
+        output = str(getattr(output, "content", output))
+        if sql and not output.startswith("Error"):
+            self.sql, self.result = sql.strip(), output
+
+
+class SQLResultCache:
+    """Question -> (SQL, result, answer) cache matched by embedding similarity"""
+
+    def __init__(self, engine, embed=None, threshold=SIMILARITY_THRESHOLD, max_entries=MAX_ENTRIES):
+        self.engine = engine
+        self._embed = embed
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.entries = []
+        self.vectors = np.zeros((0, 0), dtype=np.float32)
+        self.lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidated = 0
+        self.errors = 0
+        self._embed_retry_at = 0.0
+
+    def _failed(self, action, error):
+        with self.lock:
+            self.errors += 1
+        logger.warning("SQL result cache %s failed, continuing without it: %s", action, error)
+
+    def embed(self, question):
+        if self._embed is None:
+            self._embed = default_embedder()
+        vector = np.asarray(self._embed(question), dtype=np.float32)
+        return vector / (np.linalg.norm(vector) or 1.0)
+
+    def _tables(self, sql):
+        known = {name.lower(): name for name in inspect(self.engine).get_table_names()}
+        return sorted({known[name.lower()] for name in _TABLE_REFERENCE.findall(sql) if name.lower() in known})
+
+    def _drop(self, index):
+        del self.entries[index]
+        self.vectors = np.delete(self.vectors, index, axis=0)
+
+    def _embed_safely(self, question, action):
+        """embed(question), or None (logged) while the embedding model is unavailable"""
+        if time.monotonic() < self._embed_retry_at:
+            return None
+        try:
+            return self.embed(question)
+        except Exception as e:
+            self._embed_retry_at = time.monotonic() + EMBED_RETRY_SECONDS
+            self._failed(action, e)
+            return None
+
+    def lookup(self, question):
+        """Answer `question` from the cache, or return None on a miss (also when the cache itself fails)"""
+        start = time.perf_counter()
+        vector = self._embed_safely(question, "lookup")
+        if vector is None:
+            with self.lock:
+                self.misses += 1
+            return None
+        with self.lock:
+            if not self.entries:
+                self.misses += 1
+                return None
+            scores = self.vectors @ vector
+            literals = _literals(question)
+            best = None
+            for index in np.argsort(-scores):
+                if scores[index] < self.threshold:
+                    break
+                if self.entries[index]["literals"] == literals:
+                    best = int(index)
+                    break
+            if best is None:
+                self.misses += 1
+                return None
+            entry = self.entries[best]
+            try:
+                version = data_version(self.engine, entry["tables"])
+            except Exception as e:
+                version = None
+                self._failed("version check", e)
+            if version != entry["version"]:
+                self._drop(best)
+                self.invalidated += 1
+                self.misses += 1
+                return None
+
+        try:
+            result = run_sql(self.engine, entry["sql"])
+        except Exception as e:
+            self._failed("re-run", e)
+            with self.lock:
+                self.misses += 1
+            return None
+        with self.lock:
+            self.hits += 1
+        answer = entry["answer"] if result == entry["result"] else f"Query result: {result}"
+        return {"answer": answer, "sql": entry["sql"], "question": entry["question"],
+                "similarity": float(scores[best]), "seconds": time.perf_counter() - start}
+
+    def store(self, question, sql, result, answer):
+        """Remember an answered question; a failure is logged and the entry skipped"""
+        vector = self._embed_safely(question, "store")
+        if vector is None:
+            return
+        try:
+            tables = self._tables(sql)
+            entry = {"question": question, "sql": sql, "result": result, "answer": answer,
+                     "tables": tables, "literals": _literals(question),
+                     "version": data_version(self.engine, tables)}
+        except Exception as e:
+            self._failed("store", e)
+            return
+        with self.lock:
+            if not self.entries:
+                self.vectors = np.zeros((0, vector.shape[0]), dtype=np.float32)
+            self.entries.append(entry)
+            self.vectors = np.vstack([self.vectors, vector])
+            if len(self.entries) > self.max_entries:
+                self._drop(0)
+
+    def stats(self):
+        with self.lock:
+            return {"entries": len(self.entries), "hits": self.hits, "misses": self.misses,
+                    "invalidated": self.invalidated, "errors": self.errors}
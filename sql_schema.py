@@ -0,0 +1,176 @@
+"""
+SQL şema önbelleği (schema introspection cache)
+
+create_sql_agent her soruda birkaç LLM turunu sql_db_list_tables ve sql_db_schema çağrılarına harcıyordu;
+şema bilgisi her soru için yeniden keşfediliyordu.
+
+SchemaCache bağlantı başına bir kez şunları hazırlar:
+    - tabloların DDL'i (CREATE TABLE)
+    - her tablodan birkaç örnek satır
+    - sütun istatistikleri: satır sayısı, farklı değer / null sayısı, min-max,
+      az sayıda farklı değeri olan metin sütunları için değer listesi (WHERE koşulları için çok faydalı);
+      istatistikler tablonun ilk STATS_SAMPLE_ROWS satırlık örneğinden hesaplanır, tam tablo taraması yapılmaz
+
+Metin SCHEMA_MAX_TOKENS token bütçesine sığdırılır (8k context'li modeller için): aşılırsa önce sütun
+istatistikleri, sonra örnek satırlar, en son sondaki tablolar çıkarılır. Çıkarılan tablolar için agent
+sql_db_list_tables / sql_db_schema araçlarıyla keşif yapar.
+
+Önbellek şema versiyonu değişince yeniden kurulur:
+    SQLite  -> PRAGMA schema_version
+    MySQL   -> information_schema.columns özetinin hash'i
+    diğer   -> SQLAlchemy inspector ile okunan tablo/sütun listesinin hash'i
+
+agent_prompt() bu metni doğrudan agent prompt'una koyar; böylece agent araçlarla şema keşfi yapmadan
+doğrudan sorguyu yazabilir.
+"""
+import hashlib
+import os
+import threading
+import time
+
+from sqlalchemy import MetaData, distinct, func, inspect, literal, select, text
+from sqlalchemy.schema import CreateTable
+from sqlalchemy.types import Date, DateTime, Float, Integer, Numeric
+
+from chunker import count_tokens
+
+SAMPLE_ROWS = 3
+MAX_LISTED_VALUES = 10
+# Column statistics read at most this many rows per table instead of scanning it
+STATS_SAMPLE_ROWS = int(os.getenv("SQL_SCHEMA_STATS_SAMPLE_ROWS", "10000"))
+# Room for the schema inside an 8k context next to the agent's instructions, tools and scratchpad
+SCHEMA_MAX_TOKENS = int(os.getenv("SQL_SCHEMA_MAX_TOKENS", "2500"))
+
+_ORDERED_TYPES = (Integer, Numeric, Float, Date, DateTime)
+
+SCHEMA_SECTION = """The database schema, sample rows and column statistics are already known:
+
+{schema}
+
+Use this information directly. Only call sql_db_list_tables or sql_db_schema if a table you need is missing above."""
+
+SCHEMA_SUFFIX = """Begin!
+
+Question: {input}
+Thought: The schema is given above, so I can write the query directly.
+{agent_scratchpad}"""
+
+
+def schema_version(engine):
+    """Cheap token that changes whenever tables or columns change"""
+    with engine.connect() as conn:
+        if engine.dialect.name == "sqlite":
+            return str(conn.exec_driver_sql("PRAGMA schema_version").scalar())
+        if engine.dialect.name == "mysql":
+            rows = conn.execute(text(
+                "SELECT table_name, column_name, column_type FROM information_schema.columns "
+                "WHERE table_schema = DATABASE() ORDER BY table_name, ordinal_position"
+            )).fetchall()
+        else:
+            inspector = inspect(conn)
+            rows = [(table, [(column["name"], str(column["type"])) for column in inspector.get_columns(table)])
+                    for table in sorted(inspector.get_table_names())]
+    return hashlib.sha256(repr(rows).encode("utf-8")).hexdigest()[:16]
+
+
+def _short(value, limit=100):
+    value = str(value)
+    return value if len(value) <= limit else value[:limit] + "..."
+
+
+def _column_stats(conn, table):
+    # Every aggregate runs over the first STATS_SAMPLE_ROWS rows only
+    sample = select(table).limit(STATS_SAMPLE_ROWS + 1).subquery()
+    row_count = conn.execute(select(func.count()).select_from(sample)).scalar()
+    if row_count > STATS_SAMPLE_ROWS:
+        sample = select(table).limit(STATS_SAMPLE_ROWS).subquery()
+        lines = [f"{table.name}: more than {STATS_SAMPLE_ROWS} rows (statistics from the first {STATS_SAMPLE_ROWS})"]
+    else:
+        lines = [f"{table.name}: {row_count} rows"]
+
+    for column in sample.columns:
+        distinct_count, nulls, low, high = conn.execute(select(
+            func.count(distinct(column)), func.count(literal(1)) - func.count(column), func.min(column),
+            func.max(column)
+        ).select_from(sample)).one()
+        line = f"  {column.name}: {distinct_count} distinct, {nulls} null"
+        if isinstance(column.type, _ORDERED_TYPES):
+            line += f", range {low} .. {high}"
+        elif 0 < distinct_count <= MAX_LISTED_VALUES:
+            values = conn.execute(select(column).distinct().where(column.is_not(None)).order_by(column)).scalars()
+            line += ", values " + ", ".join(repr(_short(value, 40)) for value in values)
+        lines.append(line)
+    return lines
+
+
+def _fit(tables, max_tokens):
+    """Schema text within max_tokens: drop statistics, then sample rows, then trailing tables"""
+    def render(count, samples, stats):
+        parts = [ddl + ("\n\n" + sample if samples else "") for _, ddl, sample, _ in tables[:count]]
+        text = "\n\n".join(parts)
+        if stats:
+            text += "\n\nColumn statistics:\n" + "\n".join(line for *_, lines in tables[:count] for line in lines)
+        if count < len(tables):
+            text += "\n\nNot shown (use sql_db_schema): " + ", ".join(name for name, *_ in tables[count:])
+        return text
+
+    for samples, stats in ((True, True), (True, False), (False, False)):
+        text = render(len(tables), samples, stats)
+        if count_tokens(text) <= max_tokens:
+            return text
+    for count in range(len(tables) - 1, 0, -1):
+        text = render(count, False, False)
+        if count_tokens(text) <= max_tokens:
+            return text
+    return render(0, False, False)
+
+
+def describe_schema(engine, max_tokens=SCHEMA_MAX_TOKENS):
+    """DDL, sample rows and column statistics of every table, as prompt text of at most max_tokens"""
+    metadata = MetaData()
+    metadata.reflect(bind=engine)
+    tables = []  # (name, DDL, sample rows, statistics lines)
+    with engine.connect() as conn:
+        for table in metadata.sorted_tables:
+            ddl = str(CreateTable(table).compile(engine)).strip()
+            rows = conn.execute(select(table).limit(SAMPLE_ROWS)).fetchall()
+            sample = "\n".join("\t".join(_short(value) for value in row) for row in rows)
+            header = "\t".join(column.name for column in table.columns)
+            tables.append((table.name, ddl, f"/*\n{len(rows)} rows from {table.name} table:\n{header}\n{sample}\n*/",
+                           _column_stats(conn, table)))
+    return _fit(tables, max_tokens)
+
+
+class SchemaCache:
+    """Schema description of one engine, rebuilt only when the schema version changes"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.lock = threading.Lock()
+        self.version = None
+        self.text = ""
+        self.builds = 0
+        self.build_seconds = 0.0
+
+    def current(self):
+        """Return (schema version, schema text), re-introspecting if the schema changed"""
+        version = schema_version(self.engine)
+        with self.lock:
+            if version != self.version:
+                start = time.perf_counter()
+                self.text = describe_schema(self.engine)
+                self.version = version
+                self.builds += 1
+                self.build_seconds = time.perf_counter() - start
+            return self.version, self.text
+
+
+def agent_prompt(schema_text):
+    """ReAct prompt for create_sql_agent with the cached schema already filled in"""
+    from langchain.agents.mrkl.prompt import FORMAT_INSTRUCTIONS
+    from langchain_community.agent_toolkits.sql.prompt import SQL_PREFIX
+    from langchain_core.prompts import PromptTemplate
+
+    template = "\n\n".join([SQL_PREFIX, SCHEMA_SECTION, "{tools}", FORMAT_INSTRUCTIONS, SCHEMA_SUFFIX])
+    # Partial values are not re-formatted, so braces inside sample rows are safe
+    return PromptTemplate.from_template(template).partial(schema=schema_text)
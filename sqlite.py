@@ -1,129 +1,247 @@
+import argparse
+import csv
+import hashlib
+import json
+import random
 import sqlite3
+import time
+from itertools import islice
+from pathlib import Path
 
 """
-1. import sqlite3
-Bu satır, Python'un standart kütüphanesindeki SQLite veritabanı modülünü içeri aktarır.
+Veritabanı kurulum ve toplu yükleme (seeding) aracı
 
-sqlite3, dosya tabanlı (embedded) bir veritabanı sistemidir.
+Eski script her çalıştırmada 'create table STUDENT' çalıştırıyordu (ikinci çalıştırmada
+"table STUDENT already exists" hatası) ve kayıtları tek tek cursor.execute ile ekliyordu.
 
-Ekstra kurulum gerekmez, Python ile birlikte gelir.
+Bu araç:
+    - şemayı idempotent kurar (CREATE TABLE IF NOT EXISTS)
+    - CSV / JSONL dosyalarından veya sentetik olarak üretilen satırları executemany ile,
+      tek bir transaction içinde, parça parça (batch) yükler; bellek kullanımı satır sayısından bağımsızdır
+    - yükleme sırasında WAL ve synchronous=NORMAL gibi pragmaları ayarlar
+    - indeksleri yüklemeden sonra kurar (her satırda indeks güncellemek yerine tek seferde sıralayarak)
+    - aynı kaynağı ikinci kez yüklemez: yüklenen kaynaklar içerik özetiyle (dosyalar için sha256) _SEED_LOG
+      tablosunda tutulur; içeriği değişen dosya yeniden yüklenir, eski satırları silinir
+    - --replace sadece o kaynağın kendi satırlarını (ve _SEED_LOG kaydını) siler, diğer kaynaklara dokunmaz
 
-Bu modül sayesinde veritabanı dosyası oluşturabilir, tablo açabilir, kayıt ekleyebilir ve sorgu yapabilirsin.
+Kullanım:
+    python sqlite.py                              # şema + iki örnek kayıt
+    python sqlite.py --csv students.csv
+    python sqlite.py --jsonl students.jsonl
+    python sqlite.py --synthetic 2000000          # SQL agent'ı gerçekçi veri hacmiyle test etmek için
+    python sqlite.py --synthetic 2000000 --replace --db /tmp/load_test.db
 """
 
-# connect to sqlite 
-connection = sqlite3.connect("student.db")
-
-"""
-2. sqlite3.connect("student.db")
-student.db adında bir veritabanı dosyasına bağlantı açar.
-
-Eğer dosya yoksa, otomatik olarak oluşturulur.
-
-connection nesnesi üzerinden:
-
-    tablo yaratabilir,
-
-    veri ekleyebilir,
-
-    sorgular çalıştırabilirsin.
-
-Bu nesne, dosyaya erişim ve işlem için bir veritabanı oturumu (session) başlatır.
-"""
-
-# create a cursor object to insert record, create table
-cursor = connection.cursor()
-
-"""
-3. connection.cursor()
-cursor, veritabanı işlemlerini gerçekleştiren bir nesnedir.
-
-SQL komutlarını (CREATE, INSERT, SELECT, UPDATE, DELETE gibi) çalıştırmak için kullanılır.
-
-Veritabanı ile etkileşimde bu ara yüz üzerinden çalışılır.
-"""
-
-# create the table
-
-table_info = """
-create table STUDENT(NAME VARCHAR(25), CLASS VARCHAR(25),
-SECTION VARCHAR(25), MARKS INT)
-"""
-
-"""
-4. SQL tablo oluşturma sorgusu
-    STUDENT adında bir tablo oluşturacak bir SQL komutudur.
-
-    Sütunlar şunlardır:
-
-        NAME: Öğrenci adı (25 karaktere kadar yazı)
-
-        CLASS: Öğrencinin okuduğu alan veya sınıf
-
-        SECTION: Hangi şube/şube kodu (örneğin A, B vs.)
-
-        MARKS: Alınan not (tamsayı)
-
-Eğer bu tablo daha önce oluşturulmuşsa, bu kod OperationalError verebilir: "table STUDENT already exists".
+#1. ŞEMA
 """
-
-cursor.execute(table_info)
-
+STUDENT tablosu eskisiyle aynı (NAME, CLASS, SECTION, MARKS); uygulamalar ve prompt'lar bu şemayı bekliyor.
+_SEED_LOG hangi kaynağın ne zaman, hangi içerikle (DIGEST) ve kaç satırla yüklendiğini tutar. FIRST_ID / LAST_ID
+kaynağın STUDENT'taki rowid aralığıdır (tek transaction'da eklenen satırlar ardışık rowid alır); bir kaynak
+yeniden yüklenirken sadece bu aralık silinir. Aralığı olmayan eski kayıtlar (önceki sürümün _SEED_LOG'u)
+yeniden yüklenirken, hiçbir kaynağın aralığına düşmeyen satırlar o kaynağa ait sayılır.
 """
-✅ 5. cursor.execute(table_info)
-Yukarıda yazdığımız SQL komutunu çalıştırır.
+DEFAULT_DB = Path(__file__).parent / "student.db"
+BATCH_SIZE = 50_000
 
-Yani veritabanında STUDENT adında bir tablo oluşturur.
+SCHEMA = """
+create table if not exists STUDENT(NAME VARCHAR(25), CLASS VARCHAR(25),
+SECTION VARCHAR(25), MARKS INT);
+create table if not exists _SEED_LOG(SOURCE TEXT PRIMARY KEY, ROWS INT, LOADED_AT TEXT,
+DIGEST TEXT, FIRST_ID INT, LAST_ID INT);
 """
+SEED_LOG_COLUMNS = {"DIGEST": "TEXT", "FIRST_ID": "INT", "LAST_ID": "INT"}
 
-# Insert some records
+INDEXES = {
+    "IDX_STUDENT_CLASS": "STUDENT(CLASS)",
+    "IDX_STUDENT_SECTION": "STUDENT(SECTION)",
+    "IDX_STUDENT_MARKS": "STUDENT(MARKS)",
+    "IDX_STUDENT_NAME": "STUDENT(NAME)",
+}
 
-cursor.execute('''Insert Into STUDENT values('Murat','Data Science','A',90) ''')
-cursor.execute('''Insert Into STUDENT values('Puji','Property Advisor','A',100) ''')
+SAMPLE_ROWS = [
+    ("Murat", "Data Science", "A", 90),
+    ("Puji", "Property Advisor", "A", 100),
+]
 
+#2. KAYNAKLAR (CSV, JSONL, SENTETİK)
 """
-➕ 6. Veri ekleme
-STUDENT tablosuna iki öğrenci kaydı ekler.
-Henüz veritabanına kalıcı olarak yazılmaz, commit() çağrısı gerekir.
-"""
-# Display all records
-print("The inserted records are")
-data = cursor.execute('''Select * from STUDENT''')
-
+Her kaynak (NAME, CLASS, SECTION, MARKS) tuple'ları üreten bir generator'dır; dosya satır satır okunur.
+Sütun adları büyük/küçük harf duyarsızdır.
 """
-7. Kayıtları görüntüleme
-SELECT * FROM STUDENT: Tablodaki tüm kayıtları alır.
 
-data, bir iterator’dır; her satır için bir tuple döner.
-
-print(...) ile kullanıcıya gösterilir.
-"""
 
-for row in data:
-    print (row)
+def _row(record):
+    record = {key.strip().upper(): value for key, value in record.items()}
+    return (record["NAME"], record["CLASS"], record["SECTION"], int(record["MARKS"]))
 
-"""
-8. Kayıtların satır satır yazdırılması
-Veritabanından gelen her bir row tuple'ını yazdırır.
-"""
-
-# Commit your changes in the database
-connection.commit()
-
-"""
-9. Değişiklikleri kaydetme
-Veritabanına yapılan değişiklikleri kalıcı olarak yazmak için kullanılır.
-
-Eğer çağrılmazsa, INSERT işlemleri dosyaya yazılmaz, program kapanınca veri kaybolur.
-"""
-
-connection.close()
-
-"""
-10. Veritabanı bağlantısını kapatma
-Veritabanı dosyasıyla olan bağlantıyı düzgünce kapatır.
 
-Kaynakları serbest bırakır, dosya kilitlenmez.
+def read_csv(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        for record in csv.DictReader(f):
+            yield _row(record)
+
 
-En son adımda yapılmalıdır.
-"""
\ No newline at end of file
+def read_jsonl(path):
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield _row(json.loads(line))
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+FIRST_NAMES = ["Murat", "Puji", "Ayse", "Mehmet", "Elif", "Can", "Zeynep", "Emre", "Deniz", "Selin",
+               "Arjun", "Priya", "Liam", "Emma", "Noah", "Olivia", "Lucas", "Mia", "Kenji", "Yuki"]
+CLASSES = ["Data Science", "Property Advisor", "Machine Learning", "DevOps", "Web Development",
+           "Cyber Security", "Cloud Computing", "Mobile Development"]
+SECTIONS = ["A", "B", "C", "D"]
+
+
+def synthetic_rows(count, seed=42):
+    """Reproducible student rows; marks are roughly normal around 70 and clipped to 0-100"""
+    rng = random.Random(seed)
+    for i in range(count):
+        marks = min(100, max(0, int(rng.gauss(70, 15))))
+        yield (f"{rng.choice(FIRST_NAMES)} {i:07d}", rng.choice(CLASSES), rng.choice(SECTIONS), marks)
+
+
+#3. TOPLU YÜKLEME
+"""
+- journal_mode=WAL + synchronous=NORMAL: commit başına fsync maliyeti düşer, tek transaction ile birlikte
+  yükleme diske sadece bir kez senkronlanır.
+- cache_size / temp_store: indeks kurulurken sıralama bellekte yapılır.
+- İndeksler yüklemeden önce silinir, sonra tek seferde yeniden kurulur ve ANALYZE çalıştırılır.
+- Yükleme bitince journal_mode=DELETE'e dönülür: uygulamalar dosyayı salt okunur (mode=ro) açıyor,
+  tek dosya halindeki veritabanı -wal/-shm dosyalarına ihtiyaç duymaz.
+"""
+
+
+def connect(db_path):
+    connection = sqlite3.connect(db_path, isolation_level=None)  # explicit BEGIN / COMMIT below
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.execute("PRAGMA cache_size=-262144")  # 256 MB
+    connection.execute("PRAGMA temp_store=MEMORY")
+    connection.executescript(SCHEMA)
+    columns = {row[1] for row in connection.execute("PRAGMA table_info(_SEED_LOG)")}
+    for column, kind in SEED_LOG_COLUMNS.items():
+        if column not in columns:  # _SEED_LOG written by an older version of this script
+            connection.execute(f"alter table _SEED_LOG add column {column} {kind}")
+    return connection
+
+
+def previous_load(connection, source):
+    """(DIGEST, FIRST_ID, LAST_ID) of the last load of `source`, or None"""
+    return connection.execute("select DIGEST, FIRST_ID, LAST_ID from _SEED_LOG where SOURCE = ?",
+                              (source,)).fetchone()
+
+
+def delete_source(connection, source, previous):
+    """Delete the rows and the log entry of `source` only"""
+    _, first_id, last_id = previous
+    if first_id is None:  # logged before rowid ranges: its rows are the ones no other source owns
+        connection.execute("delete from STUDENT where not exists (select 1 from _SEED_LOG where "
+                           "FIRST_ID is not null and STUDENT.rowid between FIRST_ID and LAST_ID)")
+    else:
+        connection.execute("delete from STUDENT where rowid between ? and ?", (first_id, last_id))
+    connection.execute("delete from _SEED_LOG where SOURCE = ?", (source,))
+
+
+def bulk_load(connection, source, rows, replace=False, batch_size=BATCH_SIZE, digest=None):
+    """Load `rows` in one transaction unless `source` was loaded before with the same `digest`; returns the row count
+
+    A source loaded before with another digest (a changed file) or with `replace` has its own old rows deleted first.
+    """
+    previous = previous_load(connection, source)
+    if previous is not None and previous[0] == digest and not replace:
+        print(f"{source}: already loaded, skipping (use --replace to reload)")
+        return 0
+
+    start = time.perf_counter()
+    loaded = 0
+    connection.execute("BEGIN")
+    try:
+        if previous is not None:
+            delete_source(connection, source, previous)
+        first_id = connection.execute("select coalesce(max(rowid), 0) + 1 from STUDENT").fetchone()[0]
+        for name in INDEXES:
+            connection.execute(f"drop index if exists {name}")
+
+        rows = iter(rows)
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+            connection.executemany("insert into STUDENT(NAME, CLASS, SECTION, MARKS) values (?, ?, ?, ?)", batch)
+            loaded += len(batch)
+
+        connection.execute("insert or replace into _SEED_LOG(SOURCE, ROWS, LOADED_AT, DIGEST, FIRST_ID, LAST_ID) "
+                           "values (?, ?, datetime('now'), ?, ?, ?)",
+                           (source, loaded, digest, first_id, first_id + loaded - 1))
+        connection.execute("COMMIT")
+    except BaseException:
+        connection.execute("ROLLBACK")
+        raise
+    load_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    build_indexes(connection)
+    index_seconds = time.perf_counter() - start
+    print(f"{source}: {loaded} rows in {load_seconds:.1f}s ({loaded / max(load_seconds, 1e-9):,.0f} rows/s), "
+          f"indexes in {index_seconds:.1f}s")
+    return loaded
+
+
+def missing_rows(connection, rows):
+    """Rows not in STUDENT yet, so databases created by the old script are not seeded twice"""
+    return [row for row in rows if connection.execute(
+        "select 1 from STUDENT where NAME = ? and CLASS = ? and SECTION = ? and MARKS = ?", row).fetchone() is None]
+
+
+def build_indexes(connection):
+    for name, target in INDEXES.items():
+        connection.execute(f"create index if not exists {name} on {target}")
+    connection.execute("ANALYZE")
+
+
+def finish(connection):
+    connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    connection.execute("PRAGMA journal_mode=DELETE")
+    count = connection.execute("select count(*) from STUDENT").fetchone()[0]
+    connection.close()
+    return count
+
+
+#4. KOMUT SATIRI
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create and bulk-load the STUDENT database")
+    parser.add_argument("--db", default=str(DEFAULT_DB))
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--csv", help="CSV file with NAME, CLASS, SECTION, MARKS columns")
+    source.add_argument("--jsonl", help="JSON Lines file with NAME, CLASS, SECTION, MARKS keys")
+    source.add_argument("--synthetic", type=int, metavar="ROWS", help="generate this many synthetic students")
+    parser.add_argument("--seed", type=int, default=42, help="random seed for --synthetic")
+    parser.add_argument("--replace", action="store_true", help="reload the source even if unchanged (only its own rows are deleted)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    connection = connect(args.db)
+    if args.csv:
+        bulk_load(connection, f"csv:{Path(args.csv).resolve()}", read_csv(args.csv), args.replace, args.batch_size,
+                  file_hash(args.csv))
+    elif args.jsonl:
+        bulk_load(connection, f"jsonl:{Path(args.jsonl).resolve()}", read_jsonl(args.jsonl), args.replace,
+                  args.batch_size, file_hash(args.jsonl))
+    elif args.synthetic:
+        bulk_load(connection, f"synthetic:{args.synthetic}:{args.seed}", synthetic_rows(args.synthetic, args.seed),
+                  args.replace, args.batch_size)
+    else:
+        rows = SAMPLE_ROWS if args.replace else missing_rows(connection, SAMPLE_ROWS)
+        bulk_load(connection, "sample", rows, args.replace, args.batch_size)
+    print(f"STUDENT now holds {finish(connection)} rows")
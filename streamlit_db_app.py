@@ -11,13 +11,18 @@ from openai import api_key
 import streamlit as st
 from pathlib import Path
 from langchain.agents import create_sql_agent
-from langchain.sql_database import SQLDatabase
 from langchain.agents.agent_types import AgentType
 from langchain.callbacks import StreamlitCallbackHandler
 from langchain.agents.agent_toolkits import SQLDatabaseToolkit
-from sqlalchemy import create_engine
-import sqlite3
+from db_pool import mysql_engine, pool_stats, sqlite_engine
+from sql_guard import GuardedSQLDatabase
 from langchain_groq import ChatGroq
+import time
+import resources
+from sql_schema import SchemaCache, agent_prompt
+from sql_result_cache import SQLCapture, SQLResultCache
+from sql_fast_path import InvalidSQL, fast_answer
+from agent_telemetry import describe, executor_limits, run_with_budget
 """
 streamlit: Web tabanlı kullanıcı arayüzü.
 
@@ -25,17 +30,18 @@ Path: Dosya yollarını platform bağımsız kullanmak için.
 
 create_sql_agent: LangChain’in SQL veritabanlarıyla konuşabilen agent’ı.
 
-SQLDatabase: SQLAlchemy motoru üzerinden DB bağlantısı.
+GuardedSQLDatabase: SQLAlchemy motoru üzerinden DB bağlantısı; sorgu sonuçları boyut ve süre korumasından geçer (sql_guard.py).
 
 SQLDatabaseToolkit: DB + LLM’yi araç haline getiriyor.
 
-create_engine: SQLAlchemy motorunu oluşturur.
-
-sqlite3: SQLite bağlantısı için.
+db_pool: SQLite / MySQL için havuzlu SQLAlchemy motorlarını oluşturur ve havuz metriklerini verir.
 
 ChatGroq: Groq API ile LLM erişimi.
+
+resources: LLM, toolkit ve agent'ı süreç başına bir kez kurup oturumlar arasında paylaşmak için.
 """
 
+setup_start = time.perf_counter()
 st.set_page_config(page_title="Langchain: Chat with Sql Db")
 st.title("Langchain: Chat with Sql Db")
 
@@ -71,6 +77,9 @@ else:
     db_uri=LocalDb
 
 api_key = st.sidebar.text_input(label="Groq Api Key", type="password")
+FastPath = "Fast path (one LLM call for SQL)"
+engine_opt = st.sidebar.radio(label="Answer engine", options=[FastPath, "Agent (ReAct loop)"])
+phrase_answer = st.sidebar.checkbox("Phrase the fast-path answer with the LLM", value=True)
 """
 5. Groq API anahtarı
 Groq API ile LLM'ye bağlanmak için gerekli anahtar.
@@ -92,8 +101,11 @@ Bilgiler girilmeden ilerlenirse kullanıcıya uyarı mesajı gösterilir.
 ChatGroq nesnesi oluşturuluyor.
 
 streaming=True demek: Model yanıtı kelime kelime verir (daha doğal bir etki yaratır).
+
+resources.get_llm aynı (model, API anahtarı, parametreler) için süreç başına tek bir istemci döndürür.
 """
-llm = ChatGroq(groq_api_key=api_key,model_name="Llama3-8b-8192",streaming=True)
+llm_key = resources.resource_key("llm", "groq", "Llama3-8b-8192", api_key, streaming=True)
+llm = resources.get_llm("groq", "Llama3-8b-8192", api_key, streaming=True)
 
 """
 8️⃣ Veritabanı yapılandırma fonksiyonu
@@ -101,29 +113,40 @@ Bu fonksiyon veritabanı bağlantısını kurar ve 2 saat boyunca cache’ler.
 
 mode=ro: Read-only modda açar. Güvenlik açısından iyi.
 
+Bağlantılar db_pool.py'deki havuzlardan gelir: SQLite için thread'ler arasında paylaşılan salt okunur
+bağlantı havuzu (mmap/cache_size pragmaları ile), MySQL için pre-ping ve recycle ayarlı QueuePool.
+
 SQLDatabase: Veritabanını LangChain'e uygun hale getirir.
+
+SchemaCache: tabloların DDL'i, örnek satırlar ve sütun istatistikleri bağlantı başına bir kez hazırlanır
+(bkz. sql_schema.py); şema versiyonu değişince yeniden okunur.
 """
 @st.cache_resource(ttl="2h")
 def configure_db(db_uri,mysql_host=None,mysql_user=None,mysql_password=None,mysql_db=None):
     if db_uri==LocalDb:
         dbfilepath = (Path(__file__).parent/"student.db").absolute()
         print(dbfilepath)
-        creator = lambda: sqlite3.connect(f"file:{dbfilepath}?mode=ro",uri=True)
-        return SQLDatabase(create_engine("sqlite:///",creator=creator))
+        engine = sqlite_engine(dbfilepath)
     elif db_uri==Mysql:
         if not (mysql_host and mysql_user and mysql_password and mysql_db):
             st.error("Please provide all MySQL connection details.")
             st.stop()
-        return SQLDatabase(create_engine(f"mysql+mysqlconnector://{mysql_user}:{mysql_password}@{mysql_host}/{mysql_db}"))
+        engine = mysql_engine(mysql_host, mysql_user, mysql_password, mysql_db)
+
+    schema = SchemaCache(engine)
+    schema.current()  # introspect once up front
+    return GuardedSQLDatabase(engine), schema
     
 """
 9️⃣ Veritabanı nesnesini oluştur
 
 """
 if db_uri == Mysql:
-    db = configure_db(db_uri,mysql_host,mysql_user,mysql_password,mysql_db)
+    db, schema = configure_db(db_uri,mysql_host,mysql_user,mysql_password,mysql_db)
 else:
-    db = configure_db(db_uri)
+    db, schema = configure_db(db_uri)
+# Only a PRAGMA / information_schema lookup unless the schema actually changed
+schema_version, schema_text = schema.current()
 
 # toolkit
 """
@@ -133,15 +156,45 @@ Veritabanını LLM ile birlikte bir toolkit haline getiriyor.
 Bu agent sayesinde LLM, doğal dil sorgusunu SQL'e dönüştürüp çalıştırabiliyor.
 
 ZERO_SHOT_REACT_DESCRIPTION: Prompt’tan yola çıkarak ne yapması gerektiğini anlıyor.
-"""
-toolkit = SQLDatabaseToolkit(db=db,llm=llm)
 
-agent = create_sql_agent(
-    llm=llm,
-    toolkit=toolkit,
-    verbose=True,
-    agent_type=AgentType.ZERO_SHOT_REACT_DESCRIPTION
-)
+Toolkit ve agent, veritabanı bağlantı bilgileri + LLM anahtarıyla bir kez kurulur ve paylaşılır.
+
+Önbellekteki şema metni agent prompt'una gömülür; agent tablo listesi ve şema için ayrı LLM turu harcamaz.
+Şema versiyonu agent anahtarının parçasıdır, şema değişince agent yeni şemayla yeniden kurulur.
+Anahtarlar veritabanının kalıcı kimliğiyle (URI / bağlantı bilgileri) kurulur; aynı veritabanı ve API anahtarı
+için kayıt defterinde tek bir agent kalır. configure_db'nin TTL'i yeni bir bağlantı verdiğinde eski agent ve
+önbellek yenisiyle değiştirilir, eskileri bellekte tutulmaz.
+"""
+if db_uri == Mysql:
+    db_key = (db_uri, mysql_host, mysql_user, resources.api_key_hash(mysql_password), mysql_db)
+else:
+    db_key = (db_uri,)
+
+def build_agent():
+    toolkit = SQLDatabaseToolkit(db=db,llm=llm)
+
+    return create_sql_agent(
+        llm=llm,
+        toolkit=toolkit,
+        verbose=True,
+        agent_type=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
+        prompt=agent_prompt(schema_text),
+        # The runnable SQL agent only supports "force"; run_with_budget turns that into an early answer
+        **executor_limits("force")
+    )
+
+# configure_db may hand out a fresh SQLDatabase after its TTL; an agent bound to an older one is rebuilt
+_, agent = resources.get_or_create(("sql_agent", schema_version) + db_key + llm_key,
+                                   lambda: (db, build_agent()),
+                                   group=("sql_agent",) + db_key + llm_key,
+                                   valid=lambda entry: entry[0] is db)
+# Semantic question -> SQL cache, one per database (see sql_result_cache.py)
+sql_cache = resources.get_or_create(("sql_result_cache",) + db_key, lambda: SQLResultCache(schema.engine),
+                                    valid=lambda cache: cache.engine is schema.engine)
+st.sidebar.caption(f"Setup this rerun: {(time.perf_counter() - setup_start) * 1000:.1f} ms")
+pool = pool_stats(schema.engine)
+st.sidebar.caption(f"DB pool: {pool['checked_out']}/{pool['size']} in use · {pool['hits']} hits · "
+                   f"{pool['misses']} new connections · {pool['wait_seconds'] * 1000:.0f} ms waited")
 
 """
 11. Chat geçmişi kontrolü
@@ -168,19 +221,46 @@ user_query = st.chat_input(placeholder="Ask anything from the database")
 """
 14. Agent ile çalıştır
 LLM gelen input’u işler → SQL üretir → SQL çalıştırılır → Yanıt doğal dile çevrilip gösterilir
+
+Önce anlamsal önbelleğe bakılır: benzer bir soru daha önce cevaplandıysa onun SQL'i yeniden çalıştırılır,
+LLM hiç çağrılmaz. Aksi halde agent çalışır ve ürettiği SQL (SQLCapture) önbelleğe yazılır.
+
+Hızlı yol seçiliyse (bkz. sql_fast_path.py) SQL tek LLM çağrısıyla üretilir, EXPLAIN ile doğrulanır ve çalıştırılır;
+doğrulama başarısız olursa tam agent'a geri dönülür.
 """
 if user_query:
     st.session_state.messages.append({"role": "user", "content": user_query})
     st.chat_message("user").write(user_query)
 
     with st.chat_message("assistant"):
-        streamlit_callback = StreamlitCallbackHandler(st.container())
-        """
-        Bu satır, LLM'in adım adım düşünme sürecini (LangChain "Agent" mantığında Thought, Action, Action Input, Observation gibi yapıları)
-        Streamlit arayüzünde canlı olarak göstermeye yarayan bir geri çağırıcı (callback) tanımlar.
-
-        """
-        response = agent.run(user_query,callbacks=[streamlit_callback])
+        response = None
+        hit = sql_cache.lookup(user_query)
+        if hit:
+            response = hit["answer"]
+            st.caption(f"Answered from cache in {hit['seconds'] * 1000:.0f} ms "
+                       f"(matched \"{hit['question']}\", similarity {hit['similarity']:.2f})")
+        elif engine_opt == FastPath:
+            try:
+                fast = fast_answer(llm, schema.engine, schema_text, user_query, phrase=phrase_answer)
+                response = fast["answer"]
+                st.caption(f"Fast path: {fast['llm_calls']} LLM calls, {fast['seconds']:.2f} s")
+                st.code(fast["sql"], language="sql")
+                sql_cache.store(user_query, fast["sql"], fast["result"], response)
+            except InvalidSQL as e:
+                st.caption(f"Fast path SQL rejected ({e}), falling back to the agent")
+
+        if response is None:
+            streamlit_callback = StreamlitCallbackHandler(st.container())
+            """
+            Bu satır, LLM'in adım adım düşünme sürecini (LangChain "Agent" mantığında Thought, Action, Action Input, Observation gibi yapıları)
+            Streamlit arayüzünde canlı olarak göstermeye yarayan bir geri çağırıcı (callback) tanımlar.
+
+            """
+            capture = SQLCapture()
+            response, run_stats = run_with_budget(agent, user_query, "sql", callbacks=[streamlit_callback, capture])
+            st.sidebar.caption(describe(run_stats))
+            if capture.sql and not run_stats["stopped"]:
+                sql_cache.store(user_query, capture.sql, capture.result, response)
         st.session_state.messages.append({"role" :"assistant", "content" :response})
         st.write(response)
 
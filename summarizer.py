@@ -0,0 +1,351 @@
+"""
+Paralel map-reduce özetleme motoru
+
+Map adımı: parçalar bir thread havuzunda eşzamanlı özetlenir. Sabit time.sleep yerine
+token-bucket hız sınırlayıcı (rate limiter) kullanılır, böylece API limitine takılmadan
+mümkün olduğunca çok istek aynı anda yapılır.
+
+Özet zinciri (load_summarize_chain) her parça için yeniden kurulmaz, bir kere oluşturulur.
+
+Reduce adımı: parça özetleri gruplar halinde birleştirilir; tek bir özet kalana kadar
+hiyerarşik olarak tekrarlanır (text_summarization.ipynb içindeki map_reduce denemesi gibi).
+
+cache verilirse (summary_cache.SummaryCache) önceden özetlenmiş parçalar LLM'e gönderilmez.
+
+Parçalama chunker ile token bazlı yapılır: parçalar modelin context penceresinin
+SUMMARIZE_CONTEXT_FRACTION oranına kadar, cümle/paragraf sınırlarında ve overlap ile doldurulur.
+
+YouTube videolarında parçalar chunker yerine transcript'in zaman pencerelerinden gelir (youtube_transcript).
+Map adımı parçaları bir generator'dan tüketebilir: aynı anda en fazla 2 * max_workers parça bellekte tutulur.
+
+astream_summary aynı map-reduce'u async LLM istemcisiyle tek bir event loop üzerinde çalıştırır (service.py);
+ilerlemeyi ve son (reduce) çağrının token'larını akış olarak verir.
+
+SummaryResult: çıkarılan Document, kaynak tipi, fetch/parse/summarize süreleri ve özeti tek nesnede taşır.
+"""
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from dataclasses import dataclass, field
+
+from langchain.chains.summarize import load_summarize_chain
+from langchain.prompts import PromptTemplate
+from langchain_core.documents import Document
+
+from chunker import chunk_budget, chunk_text, count_tokens
+
+CONTEXT_FRACTION = float(os.getenv("SUMMARIZE_CONTEXT_FRACTION", "0.5"))
+OVERLAP_TOKENS = 100
+MAX_WORKERS = int(os.getenv("SUMMARIZE_WORKERS", "4"))
+REQUESTS_PER_SECOND = float(os.getenv("SUMMARIZE_RPS", "2"))
+# Upper bound for the text handed to one reduce call
+REDUCE_MAX_TOKENS = 1500
+
+combine_template = """
+Combine the following partial summaries into one concise summary of about 300 words.
+Keep the key points and main ideas, and drop repetitions:
+
+Summaries:{text}
+
+SUMMARY:
+"""
+combine_prompt = PromptTemplate(template=combine_template, input_variables=["text"])
+
+
+@dataclass
+class SummaryResult:
+    """One URL's extracted document, its summary and where the time went"""
+    url: str
+    source_type: str
+    document: Document = None
+    summary: str = ""
+    document_cached: bool = False
+    summary_cached: bool = False
+    timings: dict = field(default_factory=dict)  # seconds for "fetch", "parse", "summarize"
+    transcript: object = None  # youtube_transcript.Transcript with the timed segments, for videos
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` calls per second with bursts up to `capacity`"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    async def aacquire(self):
+        """acquire() for coroutines: waits without blocking the event loop"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            await asyncio.sleep(wait)
+
+
+def _run_all(chain, prompt, texts, bucket, max_workers, on_done=None, cache=None, model_name=""):
+    """Run `chain` over every text concurrently, keeping the input order.
+
+    `texts` can be any iterable, e.g. a generator; at most 2 * max_workers texts are in flight at once.
+    Cache lookups and writes happen on the calling thread; only misses reach the LLM.
+    """
+    def run(text):
+        bucket.acquire()
+        return chain.run([Document(page_content=text)])
+
+    results = []
+    in_flight = {}  # future -> (index, cache key)
+
+    def collect(futures):
+        for future in futures:
+            i, key = in_flight.pop(future)
+            results[i] = future.result()
+            if cache:
+                cache.put_summary(key, results[i])
+            if on_done:
+                on_done()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for i, text in enumerate(texts):
+            results.append(None)
+            key = cache.chunk_key(text, model_name, prompt) if cache else None
+            cached = cache.get_summary(key) if cache else None
+            if cached is not None:
+                results[i] = cached
+                if on_done:
+                    on_done()
+                continue
+            if len(in_flight) >= 2 * max_workers:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                collect(done)
+            in_flight[pool.submit(run, text)] = (i, key)
+        collect(as_completed(list(in_flight)))
+    return results
+
+
+def _group(summaries, max_tokens):
+    """Pack consecutive summaries into groups of at most max_tokens (two or more per group)"""
+    groups, current, size = [], [], 0
+    for summary in summaries:
+        tokens = count_tokens(summary)
+        if len(current) >= 2 and size + tokens > max_tokens:
+            groups.append(current)
+            current, size = [], 0
+        current.append(summary)
+        size += tokens
+    if len(current) == 1 and groups:
+        groups[-1].append(current[0])
+    elif current:
+        groups.append(current)
+    return groups
+
+
+def map_reduce_summarize(chunks, llm, map_prompt, reduce_prompt=combine_prompt,
+                         max_workers=MAX_WORKERS, rate=REQUESTS_PER_SECOND, progress=None,
+                         cache=None, model_name="", reduce_max_tokens=REDUCE_MAX_TOKENS, total=None,
+                         bucket=None):
+    """Summarize `chunks` concurrently, then reduce the partial summaries to one.
+
+    `chunks` can be a generator; pass `total` (an estimate is fine) to get progress for it.
+    `bucket` shares one TokenBucket between concurrent documents (e.g. a batch run).
+    `progress` is called with a fraction between 0 and 1 from the calling thread,
+    so it can safely drive a Streamlit progress bar. With a `cache`, map and reduce
+    results are looked up by content hash, `model_name` and prompt before calling the LLM.
+    """
+    total = len(chunks) if total is None else total
+    bucket = bucket or TokenBucket(rate, capacity=max_workers)
+    map_chain = load_summarize_chain(llm, chain_type="stuff", prompt=map_prompt)
+    reduce_chain = load_summarize_chain(llm, chain_type="stuff", prompt=reduce_prompt)
+
+    done = 0
+
+    def on_done():
+        nonlocal done
+        done += 1
+        if progress:
+            progress(min(done / total, 1.0))
+
+    summaries = _run_all(map_chain, map_prompt, chunks, bucket, max_workers, on_done, cache, model_name)
+    if not summaries:
+        return ""
+
+    while len(summaries) > 1:
+        groups = ["\n\n".join(group) for group in _group(summaries, reduce_max_tokens)]
+        summaries = _run_all(reduce_chain, reduce_prompt, groups, bucket, max_workers, None, cache, model_name)
+    return summaries[0]
+
+
+def summarize_document(result, llm, prompt, model_name="", cache=None, progress=None,
+                       context_window=8192, max_output_tokens=1024, bucket=None):
+    """Fill `result.summary`, map-reducing documents that do not fit one chunk budget"""
+    text = result.document.page_content
+    start = time.perf_counter()
+
+    summary_key = cache.summary_key(result.url, text, model_name, prompt) if cache else None
+    cached_summary = cache.get_summary(summary_key) if cache else None
+    if cached_summary is not None:
+        result.summary = cached_summary
+        result.summary_cached = True
+    else:
+        budget = chunk_budget(context_window, CONTEXT_FRACTION,
+                              reserved_tokens=count_tokens(prompt.template) + max_output_tokens)
+        if count_tokens(text) > budget:
+            if result.transcript is not None:
+                # Time windows over the timed segments, generated one at a time
+                chunks = result.transcript.windows(budget)
+                total = result.transcript.estimated_windows(budget)
+            else:
+                chunks, total = chunk_text(text, budget, OVERLAP_TOKENS), None
+            result.summary = map_reduce_summarize(chunks, llm, prompt, progress=progress,
+                                                  cache=cache, model_name=model_name,
+                                                  reduce_max_tokens=budget, total=total, bucket=bucket)
+        else:
+            chain = load_summarize_chain(llm, chain_type="stuff", prompt=prompt)
+            if bucket:
+                bucket.acquire()
+            result.summary = chain.run([result.document])
+        if cache:
+            cache.put_summary(summary_key, result.summary)
+
+    result.timings["summarize"] = time.perf_counter() - start
+    return result
+
+
+#Async akış (streaming) yolu
+"""
+service.py için: LLM çağrıları ainvoke / astream ile yapılır, thread açılmaz.
+Map ve ara reduce adımları asyncio ile eşzamanlı (en fazla max_workers çağrı, en fazla 2 * max_workers parça
+bellekte) çalışır; önbellek anahtarları senkron yolla aynıdır. Son çağrı (kısa dokümanda tek özet çağrısı,
+uzun dokümanda son reduce) astream ile token token akar. Önbelleğin (SQLite) get / put çağrıları
+asyncio.to_thread ile event loop dışında çalışır.
+"""
+def _content(message):
+    return getattr(message, "content", message)
+
+
+async def _arun_all(llm, prompt, texts, bucket, max_workers, on_done=None, cache=None, model_name=""):
+    """Async _run_all: `llm` is called with the formatted prompt for every text, keeping the input order"""
+    semaphore = asyncio.Semaphore(max_workers)
+    results, tasks, pending = [], [], set()
+
+    async def run(i, text):
+        key = cache.chunk_key(text, model_name, prompt) if cache else None
+        summary = await asyncio.to_thread(cache.get_summary, key) if cache else None
+        if summary is None:
+            async with semaphore:
+                await bucket.aacquire()
+                summary = _content(await llm.ainvoke(prompt.format(text=text)))
+            if cache:
+                await asyncio.to_thread(cache.put_summary, key, summary)
+        results[i] = summary
+        if on_done:
+            on_done()
+
+    for i, text in enumerate(texts):
+        results.append(None)
+        if len(pending) >= 2 * max_workers:
+            _, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        task = asyncio.ensure_future(run(i, text))
+        tasks.append(task)
+        pending.add(task)
+    if pending:
+        await asyncio.wait(pending)
+    for task in tasks:
+        task.result()  # re-raise the first failure
+    return results
+
+
+async def astream_summary(result, llm, prompt, model_name="", cache=None, context_window=8192,
+                          max_output_tokens=1024, bucket=None, reduce_prompt=combine_prompt,
+                          max_workers=MAX_WORKERS):
+    """Async summarize_document yielding ("progress", fraction) and ("token", text) events.
+
+    `result.summary` holds the whole summary once the generator is exhausted.
+    """
+    text = result.document.page_content
+    start = time.perf_counter()
+    summary_key = cache.summary_key(result.url, text, model_name, prompt) if cache else None
+    cached_summary = await asyncio.to_thread(cache.get_summary, summary_key) if cache else None
+    if cached_summary is not None:
+        result.summary, result.summary_cached = cached_summary, True
+        result.timings["summarize"] = time.perf_counter() - start
+        yield "token", cached_summary
+        return
+
+    bucket = bucket or TokenBucket(REQUESTS_PER_SECOND, capacity=max_workers)
+    budget = chunk_budget(context_window, CONTEXT_FRACTION,
+                          reserved_tokens=count_tokens(prompt.template) + max_output_tokens)
+    final_prompt, final_text, summary = prompt, text, None
+    if count_tokens(text) > budget:
+        if result.transcript is not None:
+            chunks = result.transcript.windows(budget)
+            total = result.transcript.estimated_windows(budget)
+        else:
+            chunks = chunk_text(text, budget, OVERLAP_TOKENS)
+            total = len(chunks)
+
+        progress = asyncio.Queue()
+        done = 0
+
+        def on_done():
+            nonlocal done
+            done += 1
+            progress.put_nowait(min(done / total, 1.0))
+
+        mapping = asyncio.ensure_future(_arun_all(llm, prompt, chunks, bucket, max_workers, on_done,
+                                                  cache, model_name))
+        while not mapping.done() or not progress.empty():
+            getter = asyncio.ensure_future(progress.get())
+            await asyncio.wait({mapping, getter}, return_when=asyncio.FIRST_COMPLETED)
+            if getter.done():
+                yield "progress", getter.result()
+            else:
+                getter.cancel()
+        summaries = mapping.result()
+
+        groups = _group(summaries, budget)
+        while len(groups) > 1:
+            summaries = await _arun_all(llm, reduce_prompt, ["\n\n".join(group) for group in groups],
+                                        bucket, max_workers, None, cache, model_name)
+            groups = _group(summaries, budget)
+        if len(summaries) <= 1:
+            summary = summaries[0] if summaries else ""
+        else:
+            final_prompt, final_text = reduce_prompt, "\n\n".join(groups[0])
+
+    if summary is None:
+        pieces = []
+        await bucket.aacquire()
+        async for chunk in llm.astream(final_prompt.format(text=final_text)):
+            piece = _content(chunk)
+            if piece:
+                pieces.append(piece)
+                yield "token", piece
+        summary = "".join(pieces)
+    else:
+        yield "token", summary
+
+    result.summary = summary
+    if cache:
+        await asyncio.to_thread(cache.put_summary, summary_key, summary)
+    result.timings["summarize"] = time.perf_counter() - start
@@ -0,0 +1,166 @@
+"""
+Özet önbelleği (content-addressed summary cache)
+
+Çekilen sayfalar ve üretilen özetler yerel bir SQLite dosyasında saklanır.
+
+Sayfa içeriği URL ile saklanır; TTL dolana kadar aynı URL tekrar indirilmez.
+
+Nihai özet anahtarı: URL + normalize edilmiş içerik hash'i + model adı + prompt şablonu hash'i.
+
+Parça (chunk) özetleri URL'den bağımsız olarak parçanın içerik hash'i + model + prompt ile saklanır.
+Böylece değişen bir sayfada sadece değişen parçalar için LLM çağrısı yapılır.
+
+Toplam boyut SUMMARY_CACHE_MAX_MB sınırını aşınca en uzun süredir kullanılmayan kayıtlar silinir (LRU);
+boyut sınırın EVICT_TARGET oranına inene kadar silinir, böylece sınırdaki her put yeniden eviction yapmaz.
+Toplam boyut meta tablosunda trigger'larla tutulur; put başına tüm tabloyu toplayan SUM(size) taraması yok.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+DEFAULT_PATH = os.getenv("SUMMARY_CACHE_PATH", str(Path(__file__).parent / "summary_cache.db"))
+DOCUMENT_TTL = int(os.getenv("SUMMARY_CACHE_DOCUMENT_TTL", "3600"))
+SUMMARY_TTL = int(os.getenv("SUMMARY_CACHE_SUMMARY_TTL", str(7 * 24 * 3600)))
+MAX_BYTES = int(os.getenv("SUMMARY_CACHE_MAX_MB", "256")) * 1024 * 1024
+EVICT_TARGET = 0.9
+EVICT_BATCH = 256
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY, kind TEXT, value TEXT, size INTEGER, created REAL, accessed REAL);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries(accessed);
+CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER);
+INSERT OR IGNORE INTO meta VALUES ('bytes', (SELECT COALESCE(SUM(size), 0) FROM entries));
+CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT ON entries BEGIN
+    UPDATE meta SET value = value + new.size WHERE name = 'bytes'; END;
+CREATE TRIGGER IF NOT EXISTS entries_update AFTER UPDATE OF size ON entries BEGIN
+    UPDATE meta SET value = value + new.size - old.size WHERE name = 'bytes'; END;
+CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE ON entries BEGIN
+    UPDATE meta SET value = value - old.size WHERE name = 'bytes'; END;
+"""
+
+
+def normalize(text):
+    return " ".join(text.split())
+
+
+def content_hash(text):
+    return hashlib.sha256(normalize(text).encode("utf-8")).hexdigest()
+
+
+def prompt_hash(prompt):
+    template = getattr(prompt, "template", prompt)
+    return hashlib.sha256(template.encode("utf-8")).hexdigest()
+
+
+def _key(*parts):
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+
+class SummaryCache:
+    """SQLite-backed cache for fetched documents and summaries with TTL and LRU eviction"""
+
+    def __init__(self, path=DEFAULT_PATH, document_ttl=DOCUMENT_TTL, summary_ttl=SUMMARY_TTL,
+                 max_bytes=MAX_BYTES):
+        self.document_ttl = document_ttl
+        self.summary_ttl = summary_ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        # one transaction, so the running total starts from exactly the rows the triggers will see
+        self.connection.executescript("BEGIN IMMEDIATE;" + SCHEMA + "COMMIT;")
+
+    # Documents
+
+    def get_document(self, url):
+        return self._get("doc:" + url, self.document_ttl)
+
+    def put_document(self, url, content):
+        self._put("doc:" + url, "document", content)
+        return content_hash(content)
+
+    # Summaries
+
+    def summary_key(self, url, text, model_name, prompt):
+        return "sum:" + _key(url, content_hash(text), model_name, prompt_hash(prompt))
+
+    def chunk_key(self, text, model_name, prompt):
+        return "chunk:" + _key(content_hash(text), model_name, prompt_hash(prompt))
+
+    def get_summary(self, key):
+        return self._get(key, self.summary_ttl)
+
+    def put_summary(self, key, summary):
+        self._put(key, "summary", summary)
+
+    def stats(self):
+        with self.lock:
+            entries = self.connection.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            size = self._total()
+        return {"entries": entries, "bytes": size, "hits": self.hits, "misses": self.misses}
+
+    def _get(self, key, ttl):
+        now = time.time()
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT value, created FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > ttl:
+                self.misses += 1
+                return None
+            self.connection.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+            self.connection.commit()
+            self.hits += 1
+            return row[0]
+
+    def _put(self, key, kind, value):
+        now = time.time()
+        with self.lock:
+            # an upsert, not INSERT OR REPLACE: REPLACE deletes without firing the delete trigger
+            self.connection.execute(
+                "INSERT INTO entries (key, kind, value, size, created, accessed) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET kind = excluded.kind, value = excluded.value, "
+                "size = excluded.size, created = excluded.created, accessed = excluded.accessed",
+                (key, kind, value, len(value.encode("utf-8")), now, now),
+            )
+            self._evict()
+            self.connection.commit()
+
+    def _total(self):
+        return self.connection.execute("SELECT value FROM meta WHERE name = 'bytes'").fetchone()[0]
+
+    def _evict(self):
+        total = self._total()
+        if total <= self.max_bytes:
+            return
+        target = self.max_bytes * EVICT_TARGET
+        while total > target:
+            batch = self.connection.execute(
+                "SELECT key, size FROM entries ORDER BY accessed LIMIT ?", (EVICT_BATCH,)
+            ).fetchall()
+            if not batch:
+                break
+            for key, size in batch:
+                self.connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+                total -= size
+                if total <= target:
+                    break
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """Process-wide cache shared by every Streamlit session"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = SummaryCache()
+        return _cache
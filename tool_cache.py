@@ -0,0 +1,134 @@
+"""
+Araç (tool) sonuç önbelleği ve paralel fan-out
+
+Arama agent'ı DuckDuckGo, Arxiv ve Wikipedia araçlarını ReAct adımları içinde tek tek çağırıyordu;
+aynı sorgular farklı turlarda ve kullanıcılarda tekrar tekrar gönderiliyordu.
+
+TTLCache: her aracın önüne konan, süreli (TTL) ve boyut sınırlı (LRU) önbellek.
+Aynı sorgu için eşzamanlı gelen istekler birleştirilir (request coalescing): yukarıya tek çağrı gider,
+diğerleri aynı sonucu bekler.
+
+ToolFanout: bir soru için tüm araçları aynı anda (thread havuzunda) çağırır; sonuçlar önbelleğe
+düştüğü için agent aynı sorguyu tekrar sorduğunda anında cevap alır.
+
+Önceden toplanan sonuçlar agent girdisine (input) eklenmez: ReAct prompt'u girdiyi her adımda tekrar
+gönderdiği için gözlemler her adımda prompt'ta taşınırdı. Bunun yerine prefetched_steps ile agent araçları
+zaten çağırmış gibi scratchpad'in başına bir kez konur (PrefetchAgent); agent aynı aracı tekrar çağırmaz.
+
+Araçlar sıradan fonksiyonlar olarak da verilebildiğinden sahte (fake) backend'lerle test edilebilir.
+"""
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from langchain.agents import Tool, ZeroShotAgent
+from langchain_core.agents import AgentAction
+
+DEFAULT_TTL = 600
+DEFAULT_MAX_ENTRIES = 1024
+
+
+def normalize_query(query):
+    return " ".join(str(query).lower().split())
+
+
+class TTLCache:
+    """Thread-safe TTL + LRU cache that coalesces concurrent calls for the same key"""
+
+    def __init__(self, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # key -> (expires_at, value)
+        self.inflight = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def get_or_call(self, key, fn):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            future = self.inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self.inflight[key] = Future()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not owner:
+            return future.result()
+
+        try:
+            value = fn()
+        except BaseException as e:
+            with self.lock:
+                del self.inflight[key]
+            future.set_exception(e)
+            raise
+
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+            del self.inflight[key]
+        future.set_result(value)
+        return value
+
+    def stats(self):
+        with self.lock:
+            return {"entries": len(self.entries), "hits": self.hits, "misses": self.misses,
+                    "coalesced": self.coalesced}
+
+
+def cached_tool(tool, cache):
+    """Wrap a LangChain tool so identical queries within the TTL hit `cache` instead of upstream"""
+    def run(query):
+        return cache.get_or_call((tool.name, normalize_query(query)), lambda: tool.run(query))
+
+    return Tool(name=tool.name, func=run, description=tool.description)
+
+
+class ToolFanout:
+    """Query every tool concurrently; `tools` may be LangChain tools or a {name: callable} dict"""
+
+    def __init__(self, tools, max_workers=None):
+        if isinstance(tools, dict):
+            self.tools = dict(tools)
+        else:
+            self.tools = {tool.name: tool.run for tool in tools}
+        self.pool = ThreadPoolExecutor(max_workers=max_workers or len(self.tools))
+
+    def prefetch(self, query, timeout=None):
+        """Return {tool name: result or error message} for `query`"""
+        futures = {name: self.pool.submit(run, query) for name, run in self.tools.items()}
+        results = {}
+        for name, future in futures.items():
+            try:
+                results[name] = future.result(timeout=timeout)
+            except Exception as e:
+                results[name] = f"{name} failed: {e}"
+        return results
+
+
+def prefetched_steps(results, query):
+    """ToolFanout results as (action, observation) steps, as if the agent had called each tool with `query`"""
+    return [
+        (AgentAction(tool=name, tool_input=query,
+                     log=f"I should check {name} first.\nAction: {name}\nAction Input: {query}"), str(result))
+        for name, result in results.items()
+    ]
+
+
+class PrefetchAgent(ZeroShotAgent):
+    """ReAct agent whose scratchpad starts with the steps passed in the "prefetched" input"""
+
+    def get_full_inputs(self, intermediate_steps, **kwargs):
+        prefetched = kwargs.pop("prefetched", None) or []
+        return super().get_full_inputs([*prefetched, *intermediate_steps], **kwargs)
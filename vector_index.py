@@ -0,0 +1,313 @@
+"""
+Yerel, kalıcı vektör indeksi (PDF soru-cevap için)
+
+PDFQuery_LangChain.ipynb parçaları uzaktaki bir Astra/Cassandra vektör deposuna gönderiyor ve sadece
+texts[:50]'yi ekliyordu: her sorgu bir ağ turu, dokümanın büyük kısmı da sessizce atılıyordu.
+
+VectorIndex diskteki bir klasörde tutulur:
+    index.faiss    FAISS IndexIDMap2(IndexFlatIP): normalize edilmiş vektörler, yani kosinüs benzerliği;
+                   her parçanın kalıcı bir int64 ID'si var
+    chunks.db      SQLite: ID -> kaynak, sayfa, parça numarası, metin (sorguda sadece ilk k satır okunur)
+    manifest.json  hangi dokümanın (dosya yolu, sha256, sayfa sayısı, ID aralığı) indekslendiği,
+                   embedding modeli, boyut ve parçalama ayarları
+
+    - artımlı ekleme / silme: add_pdf aynı içerikli dosyayı atlar, değişmişse eski parçaları silip yeniden
+      ekler; remove(source) ID aralığını FAISS'ten ve SQLite'tan siler. Tüm PDF indekslenir, kırpma yok.
+    - hızlı açılış: index.faiss mmap ile (IO_FLAG_MMAP) açılır, dosya belleğe kopyalanmaz; ilk değişiklikte
+      indeks yazılabilir olarak yeniden okunur
+    - kayıt sırası: önce chunks.db, sonra index.faiss (geçici dosya + os.replace), en son manifest.json;
+      manifest'te olmayan bir doküman yarım kalmış sayılır ve bir sonraki add_pdf'te temizlenir
+
+Parçalama chunker ile token bazlıdır (sayfa sayfa, cümle sınırlarında); varsayılan embedding modeli
+yerel sentence-transformers modelidir (VECTOR_INDEX_EMBEDDING_MODEL), sorgular yerelde milisaniyeler sürer.
+
+Kullanım:
+    python vector_index.py add apjspeech.pdf
+    python vector_index.py query "What did Kalam say about the vision for India?" -k 4
+    python vector_index.py ask "What are the three visions?"      # GROQ_API_KEY gerekir
+    python vector_index.py list
+    python vector_index.py remove apjspeech.pdf
+"""
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import faiss
+import numpy as np
+from langchain_core.documents import Document
+
+import resources
+from chunker import chunk_text
+
+DEFAULT_PATH = os.getenv("VECTOR_INDEX_PATH", str(Path(__file__).parent / "vector_index"))
+EMBEDDING_MODEL = os.getenv("VECTOR_INDEX_EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+CHUNK_TOKENS = int(os.getenv("VECTOR_INDEX_CHUNK_TOKENS", "200"))  # MiniLM reads at most 256 word pieces
+OVERLAP_TOKENS = 40
+EMBED_BATCH = 64
+
+SCHEMA = """
+create table if not exists chunks(id integer primary key, source text, page integer, chunk integer, text text);
+create index if not exists chunks_source on chunks(source);
+"""
+
+
+def default_embeddings(model_name=EMBEDDING_MODEL):
+    """Local sentence-transformers model, shared per process"""
+    def build():
+        from langchain_huggingface import HuggingFaceEmbeddings
+        return HuggingFaceEmbeddings(model_name=model_name)
+
+    return resources.get_or_create(("embeddings", model_name), build)
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_pdf(path):
+    """Yield (page number, text) for every page with text"""
+    from pypdf import PdfReader
+
+    for number, page in enumerate(PdfReader(path).pages, 1):
+        text = page.extract_text() or ""
+        if text.strip():
+            yield number, text
+
+
+def _normalized(vectors):
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+def _write_json(path, data):
+    temporary = path.with_name(path.name + ".tmp")
+    temporary.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(temporary, path)
+
+
+class VectorIndex:
+    """FAISS index of document chunks persisted in `path`, with a manifest of indexed documents"""
+
+    def __init__(self, path=DEFAULT_PATH, embeddings=None, model_name=EMBEDDING_MODEL,
+                 chunk_tokens=CHUNK_TOKENS, overlap_tokens=OVERLAP_TOKENS):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.path / "index.faiss"
+        self.manifest_path = self.path / "manifest.json"
+        self._embeddings = embeddings
+        self.lock = threading.RLock()
+        self.connection = sqlite3.connect(self.path / "chunks.db", check_same_thread=False)
+        self.connection.executescript(SCHEMA)
+
+        if self.manifest_path.exists():
+            self.manifest = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+            if self.manifest["embedding_model"] != model_name:
+                raise ValueError(f"{self.path} was built with {self.manifest['embedding_model']}, not {model_name}")
+        else:
+            self.manifest = {"embedding_model": model_name, "dimension": None, "chunk_tokens": chunk_tokens,
+                             "overlap_tokens": overlap_tokens, "next_id": 0, "documents": {}}
+
+        self.index = None
+        self.mapped = False
+        if self.index_path.exists():
+            # Memory-mapped: startup cost does not grow with the index size
+            self.index = faiss.read_index(str(self.index_path), faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+            self.mapped = True
+
+    @property
+    def embeddings(self):
+        if self._embeddings is None:
+            self._embeddings = default_embeddings(self.manifest["embedding_model"])
+        return self._embeddings
+
+    def __len__(self):
+        return self.index.ntotal if self.index is not None else 0
+
+    def _writable(self, dimension):
+        if self.index is None:
+            self.index = faiss.IndexIDMap2(faiss.IndexFlatIP(dimension))
+            self.manifest["dimension"] = dimension
+        elif self.mapped:
+            self.index = faiss.read_index(str(self.index_path))
+            self.mapped = False
+        return self.index
+
+    def _save(self):
+        self.connection.commit()
+        if self.index is not None and not self.mapped:
+            temporary = self.index_path.with_name("index.faiss.tmp")
+            faiss.write_index(self.index, str(temporary))
+            os.replace(temporary, self.index_path)
+        _write_json(self.manifest_path, self.manifest)
+
+    # Adding and removing
+    def _delete_ids(self, source):
+        rows = self.connection.execute("select id from chunks where source = ?", (source,)).fetchall()
+        if rows and self.index is not None:
+            ids = np.array([row[0] for row in rows], dtype=np.int64)
+            self._writable(self.manifest["dimension"]).remove_ids(faiss.IDSelectorBatch(ids))
+        self.connection.execute("delete from chunks where source = ?", (source,))
+        return len(rows)
+
+    def add_pages(self, source, pages, digest=None):
+        """Chunk, embed and index (page number, text) pairs as document `source`; returns the chunk count"""
+        with self.lock:
+            self._delete_ids(source)  # replaced or half-written earlier
+            self.manifest["documents"].pop(source, None)
+            # Ids of a run that crashed before writing the manifest are never reused
+            last_id = self.connection.execute("select max(id) from chunks").fetchone()[0]
+            first_id = max(self.manifest["next_id"], (last_id if last_id is not None else -1) + 1)
+            batch, count, page_count = [], 0, 0
+
+            def flush():
+                vectors = _normalized(self.embeddings.embed_documents([text for _, _, _, text in batch]))
+                ids = np.array([chunk_id for chunk_id, _, _, _ in batch], dtype=np.int64)
+                self._writable(vectors.shape[1]).add_with_ids(vectors, ids)
+                self.connection.executemany("insert into chunks values (?, ?, ?, ?, ?)",
+                                            [(chunk_id, source, page, number, text)
+                                             for chunk_id, page, number, text in batch])
+                batch.clear()
+
+            for page, text in pages:
+                page_count += 1
+                for number, chunk in enumerate(chunk_text(text, self.manifest["chunk_tokens"],
+                                                          self.manifest["overlap_tokens"])):
+                    batch.append((first_id + count, page, number, chunk))
+                    count += 1
+                    if len(batch) >= EMBED_BATCH:
+                        flush()
+            if batch:
+                flush()
+
+            self.manifest["next_id"] = first_id + count
+            self.manifest["documents"][source] = {
+                "sha256": digest, "pages": page_count, "chunks": count,
+                "ids": [first_id, first_id + count - 1] if count else [], "indexed_at": time.time(),
+            }
+            self._save()
+            return count
+
+    def add_pdf(self, path):
+        """Index every page of the PDF at `path`; unchanged files are skipped. Returns the new chunk count"""
+        source = str(Path(path).resolve())
+        digest = file_hash(path)
+        entry = self.manifest["documents"].get(source)
+        if entry and entry["sha256"] == digest:
+            return 0
+        return self.add_pages(source, read_pdf(path), digest)
+
+    def remove(self, source):
+        """Drop a document's chunks; returns how many were removed"""
+        with self.lock:
+            source = source if source in self.manifest["documents"] else str(Path(source).resolve())
+            removed = self._delete_ids(source)
+            self.manifest["documents"].pop(source, None)
+            self._save()
+            return removed
+
+    # Queries
+    def search(self, query, k=4, min_score=None):
+        """The k most similar chunks as (cosine score, Document) pairs, best first"""
+        if not len(self):
+            return []
+        vector = _normalized([self.embeddings.embed_query(query)])
+        with self.lock:
+            scores, ids = self.index.search(vector, k)
+            hits = [(float(score), int(chunk_id)) for score, chunk_id in zip(scores[0], ids[0]) if chunk_id != -1]
+            if min_score is not None:
+                hits = [hit for hit in hits if hit[0] >= min_score]
+            if not hits:
+                return []
+            marks = ",".join("?" * len(hits))
+            rows = {row[0]: row[1:] for row in self.connection.execute(
+                f"select id, source, page, chunk, text from chunks where id in ({marks})",
+                [chunk_id for _, chunk_id in hits])}
+        results = []
+        for score, chunk_id in hits:
+            if chunk_id not in rows:
+                continue  # vector of a removal that crashed before the index was saved
+            source, page, chunk, text = rows[chunk_id]
+            metadata = {"source": source, "page": page, "chunk": chunk, "id": chunk_id}
+            results.append((score, Document(page_content=text, metadata=metadata)))
+        return results
+
+
+#1. Soru-cevap
+"""
+Notebook'taki VectorStoreIndexWrapper.query yerine: en alakalı parçalar prompt'a konur, LLM sadece onlardan
+cevap verir. Hiçbir parça min_score'u geçmezse LLM çağrılmaz (PDF dışı soru).
+"""
+qa_template = """Answer the question using only the context from the document below.
+If the context does not contain the answer, say that the document does not cover it.
+
+Context:
+{context}
+
+Question: {question}
+Answer:"""
+
+
+def answer(index, question, llm, k=4, min_score=0.2):
+    hits = index.search(question, k, min_score)
+    if not hits:
+        return "The document does not seem to cover this question.", hits
+    context = "\n\n".join(f"[page {document.metadata['page']}] {document.page_content}" for _, document in hits)
+    response = llm.invoke(qa_template.format(context=context, question=question))
+    return getattr(response, "content", response).strip(), hits
+
+
+#2. Komut satırı
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local FAISS index for PDF question answering")
+    parser.add_argument("--index", default=DEFAULT_PATH, help="index directory")
+    commands = parser.add_subparsers(dest="command", required=True)
+    add = commands.add_parser("add", help="index (or re-index) PDF files")
+    add.add_argument("pdfs", nargs="+")
+    query = commands.add_parser("query", help="show the most similar chunks")
+    query.add_argument("text")
+    query.add_argument("-k", type=int, default=4)
+    ask = commands.add_parser("ask", help="answer a question from the indexed documents (needs GROQ_API_KEY)")
+    ask.add_argument("text")
+    ask.add_argument("-k", type=int, default=4)
+    ask.add_argument("--model", default="llama3-8b-8192")
+    commands.add_parser("list", help="show the manifest")
+    remove = commands.add_parser("remove", help="drop a document from the index")
+    remove.add_argument("source")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = VectorIndex(args.index)
+    print(f"opened {len(index)} vectors in {(time.perf_counter() - start) * 1000:.1f} ms")
+    if args.command == "add":
+        for pdf in args.pdfs:
+            start = time.perf_counter()
+            added = index.add_pdf(pdf)
+            print(f"{pdf}: {added} chunks in {time.perf_counter() - start:.1f}s" if added else f"{pdf}: unchanged")
+    elif args.command == "query":
+        index.search(args.text, 1)  # load the embedding model before timing
+        start = time.perf_counter()
+        hits = index.search(args.text, args.k)
+        print(f"{len(hits)} hits in {(time.perf_counter() - start) * 1000:.1f} ms")
+        for score, document in hits:
+            print(f"    [{score:0.4f}] p{document.metadata['page']} \"{document.page_content[:84]} ...\"")
+    elif args.command == "ask":
+        llm = resources.get_llm("groq", args.model, os.environ["GROQ_API_KEY"])
+        text, hits = answer(index, args.text, llm, args.k)
+        print(f"ANSWER: {text}\n")
+        for score, document in hits:
+            print(f"    [{score:0.4f}] p{document.metadata['page']} \"{document.page_content[:84]} ...\"")
+    elif args.command == "list":
+        for source, entry in index.manifest["documents"].items():
+            print(f"{source}: {entry['pages']} pages, {entry['chunks']} chunks, ids {entry['ids']}")
+    else:
+        print(f"removed {index.remove(args.source)} chunks")
@@ -0,0 +1,198 @@
+"""
+YouTube transcript alt sistemi
+
+Eski get_youtube_transcript tüm transcript'i çekip birleştiriyor, sonra ilk 5000 karaktere kırpıyordu:
+uzun bir videonun büyük kısmı özetlenmeden atılıyordu. Hata olduğunda da çıplak bir except ile izleme
+sayfasına düşüyordu (yeni youtube-transcript-api sürümlerinde get_transcript hiç yok, yani her seferinde).
+
+Burada:
+    - video_id(url): watch?v=, youtu.be/, /shorts/, /embed/, /live/ adreslerinden 11 karakterlik ID
+    - Transcript: zamanlı segmentlerin tamamı, kompakt biçimde: tek bir metin + başlangıç/bitiş (ms) ve
+      metin ofsetleri için array('I') dizileri (segment başına dict/nesne yok)
+    - disk önbelleği: video ID ve dil başına bir gzip'li JSON dosyası (YOUTUBE_TRANSCRIPT_CACHE_DIR);
+      aynı video ikinci kez YouTube'dan çekilmez
+    - windows(max_tokens): segmentleri zaman pencerelerine ("[0:10:00 - 0:19:58] ...") toplayan generator;
+      pencere en fazla WINDOW_SECONDS sürer ve max_tokens'ı aşmaz. Özetleyici pencereleri tek tek tüketir,
+      böylece bir saatlik video baştan sona, sınırlı bellekle özetlenir.
+
+TranscriptUnavailable (altyazı kapalı, video yok, IP engeli vb.) dışındaki hatalar çağırana iletilir.
+"""
+import gzip
+import json
+import logging
+import math
+import os
+import re
+import threading
+from array import array
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+from youtube_transcript_api import CouldNotRetrieveTranscript, YouTubeTranscriptApi
+
+from chunker import count_tokens, count_unit_tokens
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = Path(os.getenv("YOUTUBE_TRANSCRIPT_CACHE_DIR", str(Path(__file__).parent / "transcript_cache")))
+LANGUAGES = [code.strip() for code in os.getenv("YOUTUBE_TRANSCRIPT_LANGUAGES", "en,tr").split(",") if code.strip()]
+WINDOW_SECONDS = float(os.getenv("YOUTUBE_TRANSCRIPT_WINDOW_SECONDS", "600"))
+HEADER_TOKENS = 16  # room for the "[h:mm:ss - h:mm:ss]" prefix of a window
+
+TranscriptUnavailable = CouldNotRetrieveTranscript
+
+_VIDEO_ID = re.compile(r"^[\w-]{11}$")
+_PATH_PREFIXES = ("shorts", "embed", "live", "v")
+
+
+def video_id(url):
+    """The 11-character video ID of a YouTube URL"""
+    parsed = urlparse(url if "//" in url else "https://" + url)
+    query = parse_qs(parsed.query)
+    parts = [part for part in parsed.path.split("/") if part]
+    if parsed.netloc.lower().endswith("youtu.be") and parts:
+        candidate = parts[0]
+    elif "v" in query:
+        candidate = query["v"][0]
+    elif len(parts) >= 2 and parts[0] in _PATH_PREFIXES:
+        candidate = parts[1]
+    else:
+        candidate = ""
+    if not _VIDEO_ID.match(candidate):
+        raise ValueError(f"No YouTube video ID in {url}")
+    return candidate
+
+
+def _timestamp(milliseconds):
+    seconds = milliseconds // 1000
+    return f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+class Transcript:
+    """A video's timed segments: one text plus start/end (ms) and text offset arrays"""
+
+    def __init__(self, video_id, language, starts, ends, texts):
+        self.video_id = video_id
+        self.language = language
+        self.starts = array("I", starts)
+        self.ends = array("I", ends)
+        self.offsets = array("I", [0])
+        for text in texts:
+            self.offsets.append(self.offsets[-1] + len(text) + 1)
+        self.text = " ".join(texts)
+
+    def __len__(self):
+        return len(self.starts)
+
+    @property
+    def duration(self):
+        return self.ends[-1] / 1000 if len(self) else 0.0
+
+    def segment(self, i):
+        return self.text[self.offsets[i]:self.offsets[i + 1] - 1]
+
+    def segments(self):
+        """Yield (start seconds, end seconds, text) for every segment"""
+        for i in range(len(self)):
+            yield self.starts[i] / 1000, self.ends[i] / 1000, self.segment(i)
+
+    def _window(self, first, last):
+        text = self.text[self.offsets[first]:self.offsets[last] - 1]
+        return f"[{_timestamp(self.starts[first])} - {_timestamp(self.ends[last - 1])}] {text}"
+
+    def windows(self, max_tokens=None, window_seconds=WINDOW_SECONDS):
+        """Yield consecutive time windows of at most `window_seconds` and about `max_tokens` tokens"""
+        budget = max_tokens - HEADER_TOKENS if max_tokens else None
+        first, size = 0, 0
+        for i in range(len(self)):
+            tokens = count_unit_tokens(self.segment(i))
+            span = (self.ends[i] - self.starts[first]) / 1000
+            if i > first and (span > window_seconds or (budget and size + tokens > budget)):
+                yield self._window(first, i)
+                first, size = i, 0
+            size += tokens
+        if len(self):
+            yield self._window(first, len(self))
+
+    def estimated_windows(self, max_tokens=None, window_seconds=WINDOW_SECONDS):
+        """Lower bound on how many windows windows() yields, for progress reporting"""
+        by_time = math.ceil(self.duration / window_seconds) if window_seconds else 1
+        by_tokens = math.ceil(count_tokens(self.text) / max_tokens) if max_tokens else 1
+        return max(by_time, by_tokens, 1)
+
+    def to_dict(self):
+        return {"video_id": self.video_id, "language": self.language, "starts": self.starts.tolist(),
+                "ends": self.ends.tolist(), "text": "\n".join(segment for _, _, segment in self.segments())}
+
+    @classmethod
+    def from_dict(cls, data):
+        texts = data["text"].split("\n") if data["starts"] else []
+        return cls(data["video_id"], data["language"], data["starts"], data["ends"], texts)
+
+    @classmethod
+    def from_entries(cls, video_id, language, entries):
+        """Build from (start seconds, duration seconds, text) entries, dropping empty captions"""
+        starts, ends, texts = [], [], []
+        for start, duration, text in entries:
+            text = " ".join(text.split())
+            if text:
+                starts.append(int(start * 1000))
+                ends.append(int((start + duration) * 1000))
+                texts.append(text)
+        return cls(video_id, language, starts, ends, texts)
+
+
+#1. Disk önbelleği
+"""
+Dosya adı: <video_id>.<dil>.json.gz. Segment metinleri tek bir "\\n" ile ayrılmış string olarak saklanır.
+Yazma geçici dosya + os.replace ile yapılır; eşzamanlı iki istek yarım dosya göremez.
+"""
+def _cache_path(video_id, language, cache_dir):
+    return Path(cache_dir) / f"{video_id}.{language}.json.gz"
+
+
+def load_cached(video_id, language, cache_dir=CACHE_DIR):
+    path = _cache_path(video_id, language, cache_dir)
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            return Transcript.from_dict(json.load(f))
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning("Ignoring unreadable transcript cache %s: %s", path, e)
+        return None
+
+
+def save(transcript, cache_dir=CACHE_DIR):
+    path = _cache_path(transcript.video_id, transcript.language, cache_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with gzip.open(temporary, "wt", encoding="utf-8") as f:
+        json.dump(transcript.to_dict(), f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(temporary, path)
+
+
+#2. YouTube'dan çekme
+"""
+youtube-transcript-api 1.x örnek (instance) API'sini, eski sürümlerde list_transcripts'i kullanır.
+İstenen dillerden ilk bulunan transcript alınır.
+"""
+def _fetch(video_id, languages):
+    """(language code, [(start, duration, text)]) from YouTube"""
+    if hasattr(YouTubeTranscriptApi, "fetch"):  # youtube-transcript-api >= 1.0
+        fetched = YouTubeTranscriptApi().fetch(video_id, languages=languages)
+        return fetched.language_code, [(s.start, s.duration, s.text) for s in fetched]
+    transcript = YouTubeTranscriptApi.list_transcripts(video_id).find_transcript(languages)
+    return transcript.language_code, [(e["start"], e["duration"], e["text"]) for e in transcript.fetch()]
+
+
+def get_transcript(video_id, languages=LANGUAGES, cache_dir=CACHE_DIR):
+    """Return (Transcript, came from the disk cache); raises TranscriptUnavailable"""
+    for language in languages:
+        transcript = load_cached(video_id, language, cache_dir)
+        if transcript is not None:
+            return transcript, True
+    language, entries = _fetch(video_id, list(languages))
+    transcript = Transcript.from_entries(video_id, language, entries)
+    save(transcript, cache_dir)
+    return transcript, False